@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Succès déclaratifs : règles de seuils sur les compteurs de statistiques,
+indexées par compteur et évaluées à chaque incrément
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+ACHIEVEMENTS_FILE = "achievements.json"
+
+@dataclass(frozen=True)
+class AchievementRule:
+    """Succès débloqué quand tous ses compteurs atteignent leur seuil"""
+    name: str
+    description: str
+    conditions: Tuple[Tuple[str, float], ...]  # (compteur pointé, seuil)
+
+def load_achievement_rules(filename: str = ACHIEVEMENTS_FILE) -> List[AchievementRule]:
+    """Charger les règles de succès depuis le fichier JSON"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rules = []
+    for rule in data["achievements"]:
+        if not rule["conditions"]:
+            raise ValueError(f"Succès sans condition: {rule['name']}")
+        rules.append(AchievementRule(rule["name"], rule.get("description", ""),
+                                     tuple(rule["conditions"].items())))
+    return rules
+
+_achievement_rules: Optional[List[AchievementRule]] = None
+
+def get_achievement_rules() -> List[AchievementRule]:
+    """Obtenir les règles de succès (chargées au premier appel)"""
+    global _achievement_rules
+    if _achievement_rules is None:
+        _achievement_rules = load_achievement_rules()
+    return _achievement_rules
+
+def reload_achievement_rules() -> List[AchievementRule]:
+    """Recharger les règles (après une modification du fichier de données)"""
+    global _achievement_rules
+    _achievement_rules = None
+    return get_achievement_rules()
+
+class AchievementEngine:
+    """Évaluation incrémentale des règles de succès
+    
+    Les conditions sont rangées par compteur et triées par seuil. Les
+    compteurs ne faisant que croître, chaque compteur garde la position de
+    son premier seuil non atteint : une mise à jour ne regarde que les
+    conditions qui viennent d'être franchies, quel que soit le nombre de règles.
+    """
+    
+    def __init__(self, rules: Iterable[AchievementRule], unlocked: Iterable[str] = ()):
+        self.rules: Dict[str, AchievementRule] = {rule.name: rule for rule in rules}
+        self.unlocked: Set[str] = set(unlocked)
+        self._remaining: Dict[str, int] = {}  # Conditions non remplies des succès verrouillés
+        self._thresholds: Dict[str, List[Tuple[float, str]]] = {}  # Compteur -> (seuil, succès) triés
+        self._next: Dict[str, int] = {}  # Compteur -> premier seuil non atteint
+        for rule in self.rules.values():
+            if rule.name in self.unlocked:
+                continue
+            self._remaining[rule.name] = len(rule.conditions)
+            for counter, threshold in rule.conditions:
+                self._thresholds.setdefault(counter, []).append((threshold, rule.name))
+        for counter, entries in self._thresholds.items():
+            entries.sort()
+            self._next[counter] = 0
+    
+    def update(self, counter: str, value: float) -> List[str]:
+        """Nouvelle valeur d'un compteur ; renvoie les succès débloqués"""
+        entries = self._thresholds.get(counter)
+        if entries is None:
+            return []
+        position = self._next[counter]
+        unlocked = []
+        while position < len(entries) and entries[position][0] <= value:
+            name = entries[position][1]
+            position += 1
+            remaining = self._remaining.get(name)
+            if remaining is None:
+                continue  # Déjà débloqué
+            if remaining == 1:
+                del self._remaining[name]
+                self.unlocked.add(name)
+                unlocked.append(name)
+            else:
+                self._remaining[name] = remaining - 1
+        self._next[counter] = position
+        return unlocked
+    
+    def evaluate(self, counters: Dict[str, float]) -> List[str]:
+        """Évaluer des valeurs de compteurs (au chargement des statistiques)"""
+        unlocked = []
+        for counter, value in counters.items():
+            unlocked.extend(self.update(counter, value))
+        return unlocked
+    
+    def unlock(self, name: str) -> bool:
+        """Débloquer un succès à la main ; False s'il l'était déjà"""
+        if name in self.unlocked:
+            return False
+        self.unlocked.add(name)
+        self._remaining.pop(name, None)
+        return True
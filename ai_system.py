@@ -4,11 +4,18 @@
 Système d'IA pour les ennemis et NPCs du RPG
 """
 
+import json
 import math
 import random
-from typing import List, Tuple, Optional
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, FrozenSet, Iterator, List, NamedTuple, Tuple, Optional
 from enum import Enum
+import numpy as np
 from ursina import Vec3
+from config import get_enemy_aggression, get_enemy_detection_range, get_enemy_speed
+from crowd_steering import CrowdSteering
+from ai_worker import AIWorkerBridge, STATE_NAMES, FLAG_PASSIVE
 
 class AIState(Enum):
     """États possibles de l'IA"""
@@ -19,24 +26,198 @@ class AIState(Enum):
     FLEE = "flee"
     DEAD = "dead"
 
+# Adaptateurs uniformes (contrôleur, position du joueur, distance, delta) -> comportement
+def _run_idle(controller, player_position, distance_to_player, delta_time):
+    controller.idle_behavior(distance_to_player)
+
+def _run_patrol(controller, player_position, distance_to_player, delta_time):
+    controller.patrol_behavior(distance_to_player)
+
+def _run_chase(controller, player_position, distance_to_player, delta_time):
+    controller.chase_behavior(player_position, distance_to_player)
+
+def _run_attack(controller, player_position, distance_to_player, delta_time):
+    controller.attack_behavior(player_position, distance_to_player, delta_time)
+
+def _run_flee(controller, player_position, distance_to_player, delta_time):
+    controller.flee_behavior(player_position)
+
+def _run_nothing(controller, player_position, distance_to_player, delta_time):
+    pass
+
+STATE_HANDLERS = {
+    AIState.IDLE: _run_idle,
+    AIState.PATROL: _run_patrol,
+    AIState.CHASE: _run_chase,
+    AIState.ATTACK: _run_attack,
+    AIState.FLEE: _run_flee,
+}
+
+ARCHETYPES_FILE = "ai_archetypes.json"
+
+@dataclass(frozen=True)
+class AIArchetype:
+    """Archétype d'IA compilé : statistiques finales et table de dispatch"""
+    name: str
+    category: Optional[str]
+    health: float
+    damage: float
+    speed: float
+    detection_range: float
+    attack_range: float
+    attack_cooldown: float
+    passive: bool
+    allowed_states: FrozenSet[AIState]
+    state_map: Dict[AIState, AIState]
+    dispatch: Dict[AIState, Callable]
+    leash_multiplier: float
+    flee_health_ratio: float
+    patrol_chance: float
+    flee_recovery_chance: float
+    
+    @property
+    def can_flee(self) -> bool:
+        return AIState.FLEE in self.allowed_states
+
+def _redirect(target: AIState, handler: Callable) -> Callable:
+    """Créer un gestionnaire qui remplace un état interdit par son état cible"""
+    def run(controller, player_position, distance_to_player, delta_time):
+        controller.state = target
+        handler(controller, player_position, distance_to_player, delta_time)
+    return run
+
+def compile_archetype(name: str, data: dict, defaults: dict) -> AIArchetype:
+    """Compiler un archétype : fusion des valeurs par défaut, multiplicateurs
+    de configuration et table de dispatch par état"""
+    merged = dict(defaults)
+    merged.update(data)
+    
+    passive = merged["passive"]
+    allowed = frozenset(AIState(state) for state in merged["states"])
+    transitions = {AIState(src): AIState(dst) for src, dst in merged["transitions"].items()}
+    
+    # Chaque état se résout vers un état autorisé (transition déclarée ou veille)
+    state_map = {AIState.DEAD: AIState.DEAD}
+    dispatch = {AIState.DEAD: _run_nothing}
+    for state in STATE_HANDLERS:
+        if state in allowed:
+            target = state
+        else:
+            target = transitions.get(state, AIState.IDLE)
+            if target not in allowed:
+                target = AIState.IDLE
+        state_map[state] = target
+        
+        if passive:
+            dispatch[state] = _run_nothing
+        elif target == state:
+            dispatch[state] = STATE_HANDLERS[state]
+        else:
+            dispatch[state] = _redirect(target, STATE_HANDLERS[target])
+            
+    # Multiplicateurs de configuration appliqués une seule fois
+    detection_range = merged["detection_range"]
+    speed = merged["speed"]
+    attack_cooldown = merged["attack_cooldown"]
+    if merged["category"] == "enemy":
+        detection_range *= get_enemy_detection_range()
+        speed *= get_enemy_speed()
+        aggression = get_enemy_aggression()
+        if aggression > 0:
+            attack_cooldown /= aggression
+            
+    return AIArchetype(
+        name=name,
+        category=merged["category"],
+        health=merged["health"],
+        damage=merged["damage"],
+        speed=speed,
+        detection_range=detection_range,
+        attack_range=merged["attack_range"],
+        attack_cooldown=attack_cooldown,
+        passive=passive,
+        allowed_states=allowed,
+        state_map=state_map,
+        dispatch=dispatch,
+        leash_multiplier=merged["leash_multiplier"],
+        flee_health_ratio=merged["flee_health_ratio"],
+        patrol_chance=merged["patrol_chance"],
+        flee_recovery_chance=merged["flee_recovery_chance"]
+    )
+
+def load_archetypes(filename: str = ARCHETYPES_FILE) -> Dict[str, AIArchetype]:
+    """Charger et compiler les archétypes depuis le fichier JSON"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+        
+    defaults = data.pop("default")
+    archetypes = {"default": compile_archetype("default", {}, defaults)}
+    for name, archetype_data in data.items():
+        archetypes[name] = compile_archetype(name, archetype_data, defaults)
+    return archetypes
+
+_archetypes: Optional[Dict[str, AIArchetype]] = None
+
+def get_archetypes() -> Dict[str, AIArchetype]:
+    """Obtenir les archétypes compilés (compilés au premier appel)"""
+    global _archetypes
+    if _archetypes is None:
+        _archetypes = load_archetypes()
+    return _archetypes
+
+def reload_archetypes() -> Dict[str, AIArchetype]:
+    """Recompiler les archétypes (après une modification des données ou de la configuration)"""
+    global _archetypes
+    _archetypes = None
+    return get_archetypes()
+
+def get_archetype(ai_type: str) -> AIArchetype:
+    """Obtenir l'archétype d'un type d'IA (archétype par défaut si inconnu)"""
+    archetypes = get_archetypes()
+    return archetypes.get(ai_type, archetypes["default"])
+
 class AIController:
-    """Contrôleur d'IA de base"""
+    """Contrôleur d'IA piloté par un archétype compilé"""
+    
+    __slots__ = (
+        "entity", "ai_type", "archetype", "state", "target", "patrol_points",
+        "current_patrol_index", "detection_range", "attack_range", "speed",
+        "health", "max_health", "damage", "last_attack_time",
+        "attack_cooldown", "handle", "worker_slot", "player_visible",
+        "perception_stamp", "steering"
+    )
     
-    def __init__(self, entity, ai_type: str = "basic"):
+    def __init__(self, entity, ai_type: str = "basic", archetype: Optional[AIArchetype] = None):
+        if archetype is None:
+            archetype = get_archetype(ai_type)
         self.entity = entity
         self.ai_type = ai_type
+        self.archetype = archetype
         self.state = AIState.IDLE
         self.target = None
         self.patrol_points = []
         self.current_patrol_index = 0
-        self.detection_range = 10
-        self.attack_range = 2
-        self.speed = 2
-        self.health = 100
-        self.max_health = 100
-        self.damage = 10
+        self.detection_range = archetype.detection_range
+        self.attack_range = archetype.attack_range
+        self.speed = archetype.speed
+        self.health = archetype.health
+        self.max_health = archetype.health
+        self.damage = archetype.damage
         self.last_attack_time = 0
-        self.attack_cooldown = 1.0  # secondes
+        self.attack_cooldown = archetype.attack_cooldown  # secondes
+        self.handle = None
+        self.worker_slot = None
+        self.player_visible = True  # Mis à jour par le système de perception
+        self.perception_stamp = None
+        self.steering = None  # Direction de poursuite corrigée par la foule
+        
+    @property
+    def runs_state_machine(self) -> bool:
+        return not self.archetype.passive
+        
+    @property
+    def can_flee(self) -> bool:
+        return self.archetype.can_flee
         
     def update(self, player_position, delta_time: float):
         """Mettre à jour l'IA"""
@@ -46,28 +227,19 @@ class AIController:
             
         distance_to_player = self.get_distance_to_player(player_position)
         
-        # Machine à états
-        if self.state == AIState.IDLE:
-            self.idle_behavior(distance_to_player)
-        elif self.state == AIState.PATROL:
-            self.patrol_behavior(distance_to_player)
-        elif self.state == AIState.CHASE:
-            self.chase_behavior(player_position, distance_to_player)
-        elif self.state == AIState.ATTACK:
-            self.attack_behavior(player_position, distance_to_player, delta_time)
-        elif self.state == AIState.FLEE:
-            self.flee_behavior(player_position)
+        # Machine à états précompilée
+        self.archetype.dispatch[self.state](self, player_position, distance_to_player, delta_time)
             
     def idle_behavior(self, distance_to_player: float):
         """Comportement en mode veille"""
-        if distance_to_player <= self.detection_range:
+        if distance_to_player <= self.detection_range and self.player_visible:
             self.state = AIState.CHASE
-        elif random.random() < 0.01:  # 1% de chance de commencer à patrouiller
+        elif random.random() < self.archetype.patrol_chance:
             self.state = AIState.PATROL
             
     def patrol_behavior(self, distance_to_player: float):
         """Comportement de patrouille"""
-        if distance_to_player <= self.detection_range:
+        if distance_to_player <= self.detection_range and self.player_visible:
             self.state = AIState.CHASE
             return
             
@@ -88,11 +260,15 @@ class AIController:
         """Comportement de poursuite"""
         if distance_to_player <= self.attack_range:
             self.state = AIState.ATTACK
-        elif distance_to_player > self.detection_range * 1.5:
+        elif distance_to_player > self.detection_range * self.archetype.leash_multiplier:
             self.state = AIState.PATROL
         else:
-            # Se diriger vers le joueur
-            direction = (player_position - self.entity.position).normalized()
+            # Se diriger vers le joueur (en tenant compte du groupe si calculé)
+            if self.steering is not None:
+                direction = self.steering
+                self.steering = None
+            else:
+                direction = (player_position - self.entity.position).normalized()
             self.entity.position += direction * self.speed * 0.016
             
     def attack_behavior(self, player_position, distance_to_player: float, delta_time: float):
@@ -113,7 +289,7 @@ class AIController:
         self.entity.position += direction * self.speed * 0.016
         
         # Arrêter de fuir après un certain temps
-        if random.random() < 0.01:
+        if random.random() < self.archetype.flee_recovery_chance:
             self.state = AIState.IDLE
             
     def perform_attack(self):
@@ -126,8 +302,9 @@ class AIController:
         self.health -= damage
         if self.health <= 0:
             self.state = AIState.DEAD
-        elif self.health < self.max_health * 0.3:  # Fuir si santé faible
-            self.state = AIState.FLEE
+        elif self.health < self.max_health * self.archetype.flee_health_ratio:
+            # Fuir si santé faible (ou état de remplacement de l'archétype)
+            self.state = self.archetype.state_map[AIState.FLEE]
             
     def generate_patrol_points(self):
         """Générer des points de patrouille"""
@@ -146,138 +323,343 @@ class AIController:
     def get_distance_to_point(self, point) -> float:
         """Calculer la distance à un point"""
         return (point - self.entity.position).length()
+        
+    def get_worker_params(self) -> dict:
+        """Paramètres transmis au processus de travail"""
+        flags = 0
+        if not self.runs_state_machine:
+            flags |= FLAG_PASSIVE
+        state_map = self.archetype.state_map
+        return {
+            "state": STATE_NAMES.index(self.state.value),
+            "detection_range": self.detection_range,
+            "attack_range": self.attack_range,
+            "speed": self.speed,
+            "attack_cooldown": self.attack_cooldown,
+            "damage": self.damage,
+            "health": self.health,
+            "max_health": self.max_health,
+            "leash_multiplier": self.archetype.leash_multiplier,
+            "flee_health_ratio": self.archetype.flee_health_ratio,
+            "patrol_chance": self.archetype.patrol_chance,
+            "flee_recovery_chance": self.archetype.flee_recovery_chance,
+            "flags": flags,
+            "state_map": [STATE_NAMES.index(state_map[AIState(name)].value) for name in STATE_NAMES]
+        }
 
+# Alias conservés pour compatibilité : les types d'IA sont décrits dans ai_archetypes.json
 class GoblinAI(AIController):
     """IA spécifique pour les gobelins"""
     
+    __slots__ = ()
+    
     def __init__(self, entity):
         super().__init__(entity, "goblin")
-        self.detection_range = 8
-        self.attack_range = 1.5
-        self.speed = 3
-        self.health = 30
-        self.max_health = 30
-        self.damage = 10
-        self.attack_cooldown = 0.8
-        
-    def perform_attack(self):
-        """Attaque de gobelin"""
-        # Attaque rapide et faible
-        pass
 
 class TrollAI(AIController):
     """IA spécifique pour les trolls"""
     
+    __slots__ = ()
+    
     def __init__(self, entity):
         super().__init__(entity, "troll")
-        self.detection_range = 12
-        self.attack_range = 2.5
-        self.speed = 1.5
-        self.health = 80
-        self.max_health = 80
-        self.damage = 25
-        self.attack_cooldown = 1.5
-        
-    def perform_attack(self):
-        """Attaque de troll"""
-        # Attaque lente mais puissante
-        pass
 
 class MerchantAI(AIController):
     """IA pour le marchand"""
     
+    __slots__ = ()
+    
     def __init__(self, entity):
         super().__init__(entity, "merchant")
-        self.detection_range = 5
-        self.speed = 0  # Le marchand ne bouge pas
-        self.health = 100
-        self.max_health = 100
-        
-    def update(self, player_position, delta_time: float):
-        """Le marchand reste toujours en mode veille"""
-        distance_to_player = self.get_distance_to_player(player_position)
-        
-        if distance_to_player <= self.detection_range:
-            # Le marchand peut interagir avec le joueur
-            pass
 
 class GuardAI(AIController):
     """IA pour les gardes"""
     
+    __slots__ = ()
+    
     def __init__(self, entity):
         super().__init__(entity, "guard")
-        self.detection_range = 15
-        self.attack_range = 2
-        self.speed = 2.5
-        self.health = 60
-        self.max_health = 60
-        self.damage = 15
-        self.attack_cooldown = 1.0
-        
-    def update(self, player_position, delta_time: float):
-        """Les gardes patrouillent et protègent"""
-        super().update(player_position, delta_time)
-        
-        # Les gardes ne fuient jamais
-        if self.state == AIState.FLEE:
-            self.state = AIState.CHASE
 
 class SageAI(AIController):
     """IA pour le sage"""
     
+    __slots__ = ()
+    
     def __init__(self, entity):
         super().__init__(entity, "sage")
-        self.detection_range = 8
-        self.speed = 0  # Le sage ne bouge pas
-        self.health = 50
-        self.max_health = 50
+
+# États dans lesquels un agent peut repérer le joueur
+DETECTION_STATES = (AIState.IDLE, AIState.PATROL)
+
+class ControllerHandle(NamedTuple):
+    """Poignée stable vers un contrôleur (index + génération)"""
+    index: int
+    generation: int
+
+class ControllerStore:
+    """Stockage compact des contrôleurs d'IA
+    
+    Les contrôleurs sont rangés de façon contiguë ; une suppression déplace le
+    dernier élément dans le trou (O(1)). Les poignées restent valides tant
+    que le contrôleur existe et sont invalidées par leur génération ensuite.
+    Les index libérés sont réutilisés du plus ancien au plus récent, et les
+    données associées à un index (emplacement du processus de travail) se
+    résolvent par la poignée complète, jamais par l'index seul.
+    """
+    
+    __slots__ = ("_dense", "_dense_to_index", "_index_to_dense", "_generations", "_free")
+    
+    def __init__(self):
+        self._dense: List[AIController] = []
+        self._dense_to_index: List[int] = []
+        self._index_to_dense: List[int] = []
+        self._generations: List[int] = []
+        self._free: Deque[int] = deque()
         
-    def update(self, player_position, delta_time: float):
-        """Le sage reste toujours en mode veille"""
-        distance_to_player = self.get_distance_to_player(player_position)
+    def __len__(self) -> int:
+        return len(self._dense)
+        
+    def __iter__(self) -> Iterator[AIController]:
+        return iter(self._dense)
+        
+    def __contains__(self, handle) -> bool:
+        return self.get(handle) is not None
+        
+    def add(self, controller: AIController) -> ControllerHandle:
+        """Ajouter un contrôleur et renvoyer sa poignée"""
+        if self._free:
+            index = self._free.popleft()
+        else:
+            index = len(self._index_to_dense)
+            self._index_to_dense.append(-1)
+            self._generations.append(0)
+            
+        self._index_to_dense[index] = len(self._dense)
+        self._dense.append(controller)
+        self._dense_to_index.append(index)
+        
+        handle = ControllerHandle(index, self._generations[index])
+        controller.handle = handle
+        return handle
+        
+    def get(self, handle: ControllerHandle) -> Optional[AIController]:
+        """Obtenir un contrôleur par sa poignée (None si périmée)"""
+        index, generation = handle
+        if index >= len(self._generations) or self._generations[index] != generation:
+            return None
+        return self._dense[self._index_to_dense[index]]
         
-        if distance_to_player <= self.detection_range:
-            # Le sage peut donner des conseils et des quêtes
-            pass
+    def remove(self, handle: ControllerHandle) -> Optional[AIController]:
+        """Retirer un contrôleur en O(1)"""
+        controller = self.get(handle)
+        if controller is None:
+            return None
+            
+        index = handle.index
+        position = self._index_to_dense[index]
+        last = len(self._dense) - 1
+        
+        # Déplacer le dernier contrôleur dans le trou
+        if position != last:
+            moved_index = self._dense_to_index[last]
+            self._dense[position] = self._dense[last]
+            self._dense_to_index[position] = moved_index
+            self._index_to_dense[moved_index] = position
+        self._dense.pop()
+        self._dense_to_index.pop()
+        
+        self._index_to_dense[index] = -1
+        self._generations[index] += 1
+        self._free.append(index)
+        controller.handle = None
+        return controller
+        
+    def remove_many(self, handles) -> int:
+        """Retirer plusieurs contrôleurs, en O(nombre de suppressions)"""
+        removed = 0
+        for handle in handles:
+            if self.remove(handle) is not None:
+                removed += 1
+        return removed
+        
+    @property
+    def capacity(self) -> int:
+        """Nombre d'index alloués (vivants et libres)"""
+        return len(self._index_to_dense)
 
 class AISystem:
     """Système de gestion de l'IA"""
     
     def __init__(self):
-        self.ai_controllers = []
+        self.ai_controllers = ControllerStore()
+        self.archetypes = get_archetypes()
+        self.perception = None
+        self.crowd_steering = CrowdSteering()
+        self.worker = None
         
     def add_ai_controller(self, entity, ai_type: str):
         """Ajouter un contrôleur d'IA"""
-        if ai_type == "goblin":
-            controller = GoblinAI(entity)
-        elif ai_type == "troll":
-            controller = TrollAI(entity)
-        elif ai_type == "merchant":
-            controller = MerchantAI(entity)
-        elif ai_type == "guard":
-            controller = GuardAI(entity)
-        elif ai_type == "sage":
-            controller = SageAI(entity)
-        else:
-            controller = AIController(entity, ai_type)
-            
-        self.ai_controllers.append(controller)
+        controller = AIController(entity, ai_type, self.archetypes.get(ai_type))
+        if self.perception:
+            controller.player_visible = False
+        self.ai_controllers.add(controller)
+        if self.worker:
+            self.attach_to_worker(controller)
         return controller
         
+    def set_perception(self, perception):
+        """Activer (ou désactiver avec None) les lignes de vue pour la détection"""
+        self.perception = perception
+        for controller in self.ai_controllers:
+            controller.player_visible = perception is None
+            controller.perception_stamp = None
+            
+    def refresh_perception(self, player_position):
+        """Recalculer les lignes de vue des agents susceptibles de repérer le joueur"""
+        watching = [
+            controller for controller in self.ai_controllers
+            if controller.state in DETECTION_STATES and controller.runs_state_machine
+        ]
+        self.perception.refresh(watching, player_position)
+        
+    def steer_chasers(self, player_position):
+        """Calculer en un lot les directions de poursuite des agents en chasse
+        
+        Les directions de l'image précédente sont effacées pour tous les
+        agents, y compris ceux qui ont quitté la poursuite entre-temps.
+        """
+        chasers = []
+        for controller in self.ai_controllers:
+            controller.steering = None
+            if controller.state == AIState.CHASE:
+                chasers.append(controller)
+        if len(chasers) < 2:
+            return
+            
+        positions = np.array([tuple(controller.entity.position) for controller in chasers], dtype=np.float64)
+        speeds = np.array([controller.speed for controller in chasers], dtype=np.float64)
+        target = (player_position[0], player_position[1], player_position[2])
+        directions = self.crowd_steering.steer_towards(positions, target, speeds)
+        
+        for controller, (x, y, z) in zip(chasers, directions):
+            controller.steering = Vec3(float(x), float(y), float(z))
+            
+    def start_worker(self, capacity: int = 1024, tick_rate: float = 60.0):
+        """Déporter la simulation de l'IA dans un processus séparé"""
+        if self.worker:
+            return
+        self.worker = AIWorkerBridge(capacity, tick_rate)
+        self.worker.start()
+        for controller in self.ai_controllers:
+            self.attach_to_worker(controller)
+            
+    def stop_worker(self):
+        """Ramener la simulation de l'IA dans le processus principal"""
+        if not self.worker:
+            return
+        self.worker.stop()
+        self.worker = None
+        for controller in self.ai_controllers:
+            controller.worker_slot = None
+            
+    def attach_to_worker(self, controller: AIController):
+        """Associer un contrôleur à l'emplacement partagé de son index"""
+        slot = controller.handle.index
+        if slot >= self.worker.capacity:
+            raise RuntimeError("Capacité du processus d'IA atteinte")
+        controller.worker_slot = slot
+        self.worker.spawn(slot, controller.handle.generation, controller.entity.position,
+                          controller.get_worker_params())
+        
+    def detach_from_worker(self, controller: AIController):
+        """Libérer l'emplacement partagé d'un contrôleur"""
+        slot = controller.worker_slot
+        if slot is None:
+            return
+        self.worker.despawn(slot)
+        controller.worker_slot = None
+        
+    def sync_with_worker(self, player_position):
+        """Publier la position du joueur et relire le dernier état calculé
+
+        N'attend jamais le processus de travail : si aucune nouvelle image n'est
+        prête, la précédente est réutilisée. Les données d'un emplacement ne
+        sont appliquées que si leur génération est celle du contrôleur qui
+        l'occupe (pas celle d'un occupant précédent).
+        """
+        worker = self.worker
+        worker.publish_player(player_position)
+        snapshot = worker.read_snapshot()
+        dead = []
+        
+        if self.perception:
+            self.refresh_perception(player_position)
+            
+        for controller in self.ai_controllers:
+            slot = controller.worker_slot
+            worker.set_health(slot, controller.health)
+            worker.set_visible(slot, controller.player_visible)
+            if snapshot is not None and controller.runs_state_machine:
+                positions, states, generations = snapshot
+                state = AIState(STATE_NAMES[states[slot]])
+                current = generations[slot] == controller.handle.generation
+                if current and (state != AIState.DEAD or controller.health <= 0):
+                    controller.state = state
+                    x, y, z = positions[slot]
+                    controller.entity.position = Vec3(float(x), float(y), float(z))
+            if controller.health <= 0:
+                controller.state = AIState.DEAD
+                dead.append(controller)
+                
+        for controller in dead:
+            self.detach_from_worker(controller)
+            self.ai_controllers.remove(controller.handle)
+            
+        for slot, generation, _ in worker.poll_events():
+            controller = self.ai_controllers.get(ControllerHandle(slot, generation))
+            if controller is not None:
+                controller.perform_attack()
+        
     def update_all(self, player_position, delta_time: float):
         """Mettre à jour tous les contrôleurs d'IA"""
-        for controller in self.ai_controllers[:]:  # Copie pour éviter les erreurs de modification
+        if self.worker:
+            if self.worker.running:
+                self.sync_with_worker(player_position)
+                return
+            # Processus de travail arrêté de lui-même : reprise locale
+            print("Processus d'IA arrêté, simulation reprise dans le processus principal")
+            self.stop_worker()
+            
+        if self.perception:
+            self.refresh_perception(player_position)
+        if self.crowd_steering:
+            self.steer_chasers(player_position)
+            
+        dead = []
+        for controller in self.ai_controllers:
             if controller.state != AIState.DEAD:
                 controller.update(player_position, delta_time)
             else:
-                # Supprimer les entités mortes
-                self.ai_controllers.remove(controller)
+                dead.append(controller.handle)
+                
+        # Supprimer les entités mortes (O(nombre de morts))
+        if dead:
+            self.ai_controllers.remove_many(dead)
+            
+    def remove_ai_controller(self, handle: ControllerHandle) -> Optional[AIController]:
+        """Retirer un contrôleur par sa poignée"""
+        controller = self.ai_controllers.get(handle)
+        if controller is None:
+            return None
+        if self.worker:
+            self.detach_from_worker(controller)
+        return self.ai_controllers.remove(handle)
                 
     def get_nearby_enemies(self, player_position, range: float) -> List[AIController]:
         """Obtenir les ennemis proches du joueur"""
         nearby = []
         for controller in self.ai_controllers:
-            if (controller.ai_type in ["goblin", "troll"] and 
+            if (controller.archetype.category == "enemy" and 
                 controller.get_distance_to_player(player_position) <= range):
                 nearby.append(controller)
         return nearby
@@ -286,7 +668,7 @@ class AISystem:
         """Obtenir les NPCs proches du joueur"""
         nearby = []
         for controller in self.ai_controllers:
-            if (controller.ai_type in ["merchant", "guard", "sage"] and 
+            if (controller.archetype.category == "npc" and 
                 controller.get_distance_to_player(player_position) <= range):
                 nearby.append(controller)
         return nearby 
\ No newline at end of file
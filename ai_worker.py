@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Processus de travail pour l'IA : les agents vivent dans des tableaux en
+mémoire partagée et sont simulés hors du thread de rendu.
+
+Ce module ne doit pas importer Ursina : il est importé par le processus
+enfant, qui n'a pas de fenêtre.
+"""
+
+import time
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from crowd_steering import CrowdSteering
+
+# Codes d'état partagés avec ai_system.AIState (même ordre, mêmes valeurs)
+STATE_NAMES = ("idle", "patrol", "chase", "attack", "flee", "dead")
+IDLE, PATROL, CHASE, ATTACK, FLEE, DEAD = range(len(STATE_NAMES))
+
+# Drapeaux de comportement par agent
+FLAG_PASSIVE = 1  # L'agent ne fait pas tourner la machine à états
+
+def _layout(capacity: int):
+    """Calculer la disposition des tableaux dans le bloc partagé"""
+    fields = [
+        ("player", np.float64, (2, 3)),     # Position du joueur, double tampon
+        ("player_seq", np.int64, (2,)),
+        ("player_front", np.int64, (1,)),
+        ("positions", np.float32, (2, capacity, 3)),  # Transformations, double tampon
+        ("states", np.int8, (2, capacity)),
+        ("generations", np.int64, (2, capacity)),  # Génération de l'occupant de chaque emplacement
+        ("frame_seq", np.int64, (2,)),
+        ("front", np.int64, (1,)),
+        ("health", np.float32, (capacity,)),  # Écrit uniquement par le processus principal
+        ("visible", np.int8, (capacity,)),  # Ligne de vue vers le joueur (idem)
+        ("running", np.int64, (1,)),
+    ]
+    layout = []
+    offset = 0
+    for name, dtype, shape in fields:
+        itemsize = np.dtype(dtype).itemsize
+        offset = (offset + 7) // 8 * 8
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * itemsize
+    return layout, offset
+
+def _map_arrays(buffer, capacity: int):
+    """Créer les vues NumPy sur le bloc partagé"""
+    layout, _ = _layout(capacity)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        for name, dtype, shape, offset in layout
+    }
+
+def _read_player(arrays) -> Optional[np.ndarray]:
+    """Lire la dernière position publiée du joueur sans bloquer"""
+    front = int(arrays["player_front"][0])
+    seq = int(arrays["player_seq"][front])
+    if seq == 0 or seq % 2:
+        return None
+    position = arrays["player"][front].copy()
+    if int(arrays["player_seq"][front]) != seq:
+        return None
+    return position
+
+class _WorkerSimulation:
+    """Machine à états vectorisée exécutée dans le processus de travail"""
+
+    def __init__(self, arrays, capacity: int, events):
+        self.arrays = arrays
+        self.events = events
+        self.rng = np.random.default_rng()
+        self.crowd = CrowdSteering()
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.generation = np.full(capacity, -1, dtype=np.int64)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.position = np.zeros((capacity, 3), dtype=np.float32)
+        self.home = np.zeros((capacity, 3), dtype=np.float32)
+        self.patrol_target = np.zeros((capacity, 3), dtype=np.float32)
+        self.has_patrol_target = np.zeros(capacity, dtype=bool)
+        self.detection_range = np.zeros(capacity, dtype=np.float32)
+        self.attack_range = np.zeros(capacity, dtype=np.float32)
+        self.speed = np.zeros(capacity, dtype=np.float32)
+        self.attack_cooldown = np.zeros(capacity, dtype=np.float32)
+        self.damage = np.zeros(capacity, dtype=np.float32)
+        self.max_health = np.ones(capacity, dtype=np.float32)
+        self.last_health = np.zeros(capacity, dtype=np.float32)
+        self.last_attack = np.zeros(capacity, dtype=np.float64)
+        self.leash_multiplier = np.zeros(capacity, dtype=np.float32)
+        self.flee_health_ratio = np.zeros(capacity, dtype=np.float32)
+        self.patrol_chance = np.zeros(capacity, dtype=np.float32)
+        self.flee_recovery_chance = np.zeros(capacity, dtype=np.float32)
+        self.flags = np.zeros(capacity, dtype=np.int8)
+        # État effectif de chaque état pour l'archétype de l'agent (états interdits redirigés)
+        self.state_map = np.tile(np.arange(len(STATE_NAMES), dtype=np.int8), (capacity, 1))
+
+    def spawn(self, slot: int, generation: int, position, params: dict):
+        """Initialiser un agent dans un emplacement"""
+        self.alive[slot] = True
+        self.generation[slot] = generation
+        self.state_map[slot] = params["state_map"]
+        self.state[slot] = self.state_map[slot, params.get("state", IDLE)]
+        self.position[slot] = position
+        self.home[slot] = position
+        self.has_patrol_target[slot] = False
+        self.detection_range[slot] = params["detection_range"]
+        self.attack_range[slot] = params["attack_range"]
+        self.speed[slot] = params["speed"]
+        self.attack_cooldown[slot] = params["attack_cooldown"]
+        self.damage[slot] = params["damage"]
+        self.max_health[slot] = params["max_health"]
+        self.last_health[slot] = params["health"]
+        self.last_attack[slot] = 0.0
+        self.leash_multiplier[slot] = params["leash_multiplier"]
+        self.flee_health_ratio[slot] = params["flee_health_ratio"]
+        self.patrol_chance[slot] = params["patrol_chance"]
+        self.flee_recovery_chance[slot] = params["flee_recovery_chance"]
+        self.flags[slot] = params["flags"]
+
+    def despawn(self, slot: int):
+        """Libérer un emplacement"""
+        self.alive[slot] = False
+        self.state[slot] = DEAD
+        self.generation[slot] = -1
+
+    def step(self, player, now: float, dt: float):
+        """Avancer la simulation d'un pas"""
+        health = self.arrays["health"]
+        active = self.alive & ((self.flags & FLAG_PASSIVE) == 0)
+
+        # Dégâts reçus depuis le dernier pas (mêmes règles que take_damage)
+        damaged = active & (health < self.last_health)
+        self.last_health[:] = health
+        dead = self.alive & (health <= 0)
+        fleeing = damaged & ~dead & (health < self.max_health * self.flee_health_ratio)
+        self.state[fleeing] = self.state_map[fleeing, FLEE]
+        self.state[dead] = DEAD
+        self.alive[dead] = False
+        active &= ~dead
+
+        if player is None or not active.any():
+            return
+
+        offset = player.astype(np.float32) - self.position
+        distance = np.sqrt((offset * offset).sum(axis=1))
+        in_detection = (distance <= self.detection_range) & (self.arrays["visible"] != 0)
+        state = self.state.copy()
+        roll = self.rng.random(len(state))
+
+        # Veille
+        idle = active & (state == IDLE)
+        self.state[idle & in_detection] = CHASE
+        self.state[idle & ~in_detection & (roll < self.patrol_chance)] = PATROL
+
+        # Patrouille
+        patrol = active & (state == PATROL)
+        self.state[patrol & in_detection] = CHASE
+        walking = patrol & ~in_detection
+        self._pick_patrol_targets(walking & ~self.has_patrol_target)
+        self._move_towards(walking, self.patrol_target, dt)
+        to_target = self.patrol_target - self.position
+        reached = walking & ((to_target * to_target).sum(axis=1) < 1.0)
+        self.has_patrol_target[reached] = False
+
+        # Poursuite
+        chase = active & (state == CHASE)
+        self.state[chase & (distance <= self.attack_range)] = ATTACK
+        lost = chase & (distance > self.attack_range) & (distance > self.detection_range * self.leash_multiplier)
+        self.state[lost] = PATROL
+        pursuing = chase & (distance > self.attack_range) & ~lost
+        if pursuing.any():
+            # Poursuite en groupe : les agents s'écartent au lieu de converger sur un point
+            direction = self.crowd.steer_towards(self.position[pursuing], player, self.speed[pursuing])
+            self.position[pursuing] += direction * (self.speed[pursuing, None] * dt)
+
+        # Attaque
+        attack = active & (state == ATTACK)
+        self.state[attack & (distance > self.attack_range)] = CHASE
+        striking = (attack & (distance <= self.attack_range)
+                    & (now - self.last_attack >= self.attack_cooldown))
+        if striking.any():
+            self.last_attack[striking] = now
+            slots = np.flatnonzero(striking)
+            self.events.put([(int(slot), int(self.generation[slot]), float(self.damage[slot]))
+                             for slot in slots])
+
+        # Fuite
+        flee = active & (state == FLEE)
+        away = self.position - player.astype(np.float32)
+        self._move_along(flee, away, dt)
+        self.state[flee & (roll < self.flee_recovery_chance)] = IDLE
+
+        # Transitions vers un état interdit : état de remplacement de l'archétype
+        slots = np.flatnonzero(active)
+        self.state[slots] = self.state_map[slots, self.state[slots]]
+
+    def _pick_patrol_targets(self, mask):
+        """Choisir un nouveau point de patrouille autour du point d'origine"""
+        count = int(mask.sum())
+        if not count:
+            return
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        radius = self.rng.uniform(5, 15, count)
+        target = self.home[mask].copy()
+        target[:, 0] += radius * np.cos(angle)
+        target[:, 2] += radius * np.sin(angle)
+        self.patrol_target[mask] = target
+        self.has_patrol_target[mask] = True
+
+    def _move_towards(self, mask, target, dt: float):
+        """Déplacer les agents sélectionnés vers une cible"""
+        self._move_along(mask, target - self.position, dt)
+
+    def _move_along(self, mask, direction, dt: float):
+        """Déplacer les agents sélectionnés selon une direction"""
+        if not mask.any():
+            return
+        direction = np.broadcast_to(direction, self.position.shape)[mask]
+        length = np.sqrt((direction * direction).sum(axis=1, keepdims=True))
+        np.divide(direction, length, out=direction, where=length > 0)
+        self.position[mask] += direction * (self.speed[mask, None] * dt)
+
+    def publish(self):
+        """Écrire les transformations dans le tampon arrière puis l'exposer"""
+        arrays = self.arrays
+        back = 1 - int(arrays["front"][0])
+        arrays["frame_seq"][back] += 1  # Impair : écriture en cours
+        arrays["positions"][back] = self.position
+        arrays["states"][back] = self.state
+        arrays["generations"][back] = self.generation
+        arrays["frame_seq"][back] += 1
+        arrays["front"][0] = back
+
+def _worker_main(shm_name: str, capacity: int, commands, events, tick_rate: float):
+    """Point d'entrée du processus de travail"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = simulation = None
+    try:
+        arrays = _map_arrays(shm.buf, capacity)
+        simulation = _WorkerSimulation(arrays, capacity, events)
+        period = 1.0 / tick_rate
+        last = time.perf_counter()
+
+        while arrays["running"][0]:
+            # Appliquer les commandes du processus principal
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command[0] == "spawn":
+                    simulation.spawn(command[1], command[2], command[3], command[4])
+                elif command[0] == "despawn":
+                    simulation.despawn(command[1])
+                elif command[0] == "stop":
+                    arrays["running"][0] = 0
+
+            now = time.perf_counter()
+            simulation.step(_read_player(arrays), now, now - last)
+            simulation.publish()
+            last = now
+
+            remaining = period - (time.perf_counter() - now)
+            if remaining > 0:
+                time.sleep(remaining)
+    finally:
+        del arrays, simulation
+        shm.close()
+
+class AIWorkerBridge:
+    """Interface côté processus principal vers le processus de travail"""
+
+    def __init__(self, capacity: int = 1024, tick_rate: float = 60.0):
+        self.capacity = capacity
+        self.tick_rate = tick_rate
+        self.process = None
+        self.shm = None
+        self.arrays = None
+        self.snapshot: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._last_frame = None
+        self._context = multiprocessing.get_context("spawn")
+        self.commands = None
+        self.events = None
+
+    @property
+    def running(self) -> bool:
+        """Vérifier si le processus de travail tourne"""
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Démarrer le processus de travail"""
+        _, size = _layout(self.capacity)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.arrays = _map_arrays(self.shm.buf, self.capacity)
+        for array in self.arrays.values():
+            array.fill(0)
+        self.arrays["states"].fill(DEAD)
+        self.arrays["generations"].fill(-1)
+        self.arrays["visible"].fill(1)
+        self.arrays["running"][0] = 1
+
+        self.commands = self._context.Queue()
+        self.events = self._context.Queue()
+        self.process = self._context.Process(
+            target=_worker_main,
+            args=(self.shm.name, self.capacity, self.commands, self.events, self.tick_rate),
+            daemon=True
+        )
+        self.process.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Arrêter le processus de travail et libérer la mémoire partagée"""
+        if self.process is not None:
+            self.commands.put(("stop",))
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+            self.process = None
+        if self.shm is not None:
+            self.arrays = None
+            self.snapshot = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def spawn(self, slot: int, generation: int, position, params: dict):
+        """Ajouter un agent au processus de travail
+
+        La génération accompagne les transformations et les attaques de
+        l'emplacement : celles d'un occupant précédent sont reconnaissables.
+        """
+        self.arrays["health"][slot] = params["health"]
+        self.commands.put(("spawn", slot, generation, tuple(position), params))
+
+    def despawn(self, slot: int):
+        """Retirer un agent du processus de travail"""
+        self.commands.put(("despawn", slot))
+
+    def set_health(self, slot: int, health: float):
+        """Publier la santé d'un agent (lue par le processus de travail)"""
+        self.arrays["health"][slot] = health
+
+    def set_visible(self, slot: int, visible: bool):
+        """Publier la ligne de vue d'un agent vers le joueur"""
+        self.arrays["visible"][slot] = visible
+
+    def publish_player(self, position):
+        """Publier la position du joueur dans le tampon arrière"""
+        arrays = self.arrays
+        back = 1 - int(arrays["player_front"][0])
+        arrays["player_seq"][back] += 1
+        arrays["player"][back] = (position[0], position[1], position[2])
+        arrays["player_seq"][back] += 1
+        arrays["player_front"][0] = back
+
+    def read_snapshot(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Lire les dernières transformations sans jamais attendre le processus de travail
+
+        Renvoie (positions, états, générations). Si le tampon avant est en
+        cours de réécriture, l'image précédente est conservée.
+        """
+        arrays = self.arrays
+        front = int(arrays["front"][0])
+        seq = int(arrays["frame_seq"][front])
+        if (front, seq) == self._last_frame or seq % 2:
+            return self.snapshot
+
+        positions = arrays["positions"][front].copy()
+        states = arrays["states"][front].copy()
+        generations = arrays["generations"][front].copy()
+        if int(arrays["frame_seq"][front]) == seq:
+            self.snapshot = (positions, states, generations)
+            self._last_frame = (front, seq)
+        return self.snapshot
+
+    def poll_events(self) -> List[Tuple[int, int, float]]:
+        """Récupérer les attaques produites depuis le dernier appel (emplacement, génération, dégâts)"""
+        attacks = []
+        while True:
+            try:
+                attacks.extend(self.events.get_nowait())
+            except queue.Empty:
+                return attacks
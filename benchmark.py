@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesures de performance des systèmes du RPG Aventure 3D
+"""
+
+import time
+import numpy as np
+from crowd_steering import CrowdSteering
+from inventory_system import Inventory, ItemFactory
+from loot_system import LootSystem
+
+def measure(function, repeat: int = 20) -> float:
+    """Mesurer le temps moyen d'un appel (en millisecondes)"""
+    function()  # Échauffement
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def benchmark_crowd_steering():
+    """Pilotage de foule selon le nombre d'agents et leur densité"""
+    print("👥 PILOTAGE DE FOULE")
+    print("=" * 50)
+    print(f"  {'Agents':>8} {'Côté (m)':>9} {'Voisins/agent':>14} {'Temps (ms)':>11}")
+    
+    steering = CrowdSteering()
+    rng = np.random.default_rng(42)
+    
+    for count in (100, 300, 1000):
+        for area in (10, 30, 100):
+            positions = np.zeros((count, 3))
+            positions[:, [0, 2]] = rng.uniform(-area / 2, area / 2, (count, 2))
+            speeds = np.full(count, 3.0)
+            
+            owners, _ = steering.neighbour_pairs(positions)
+            elapsed = measure(lambda: steering.steer_towards(positions, (0, 0, 0), speeds))
+            print(f"  {count:>8} {area:>9} {len(owners) / count:>14.1f} {elapsed:>11.3f}")
+            
+    print()
+
+def benchmark_loot_tables():
+    """Tirages de butin unitaires et par lots"""
+    print("💰 TABLES DE BUTIN")
+    print("=" * 50)
+    print(f"  {'Table':>14} {'Mode':>8} {'Tirages':>9} {'Tirages/s':>12}")
+    
+    loot = LootSystem(seed=42)
+    
+    for table in ("goblin", "troll", "world_pickups"):
+        draws = 1000
+        elapsed = measure(lambda: [loot.roll(table, 10) for _ in range(draws)], repeat=5)
+        print(f"  {table:>14} {'unitaire':>8} {draws:>9} {draws / elapsed * 1000:>12,.0f}")
+        
+        draws = 100000
+        elapsed = measure(lambda: loot.roll_many(table, draws, 10), repeat=5)
+        print(f"  {table:>14} {'lot':>8} {draws:>9} {draws / elapsed * 1000:>12,.0f}")
+        
+    print()
+
+def benchmark_inventory_columns():
+    """Agrégats en colonnes et équipement automatique sur un grand inventaire"""
+    print("🎒 INVENTAIRE EN COLONNES")
+    print("=" * 50)
+    print(f"  {'Piles':>8} {'Agrégat (ms)':>13} {'Équipement (ms)':>16}")
+    
+    rng = np.random.default_rng(42)
+    for count in (1000, 10000, 50000):
+        inventory = Inventory(max_weight=1e9)
+        levels = rng.integers(1, 30, count)
+        for level, material in zip(levels.tolist(), rng.choice(["wood", "iron", "steel", "magic"], count)):
+            inventory.add_item(ItemFactory.create_weapon("sword", str(material), level))
+        
+        aggregate = measure(lambda: inventory.columns.total_by("rarity"))
+        loadout = measure(lambda: inventory.best_loadout(100, "damage"), repeat=5)
+        print(f"  {len(inventory):>8} {aggregate:>13.3f} {loadout:>16.3f}")
+        
+    print()
+
+def main():
+    """Lancer toutes les mesures"""
+    print("⏱️ MESURES DE PERFORMANCE DU RPG AVENTURE 3D")
+    print("=" * 60)
+    print()
+    
+    benchmark_crowd_steering()
+    benchmark_loot_tables()
+    benchmark_inventory_columns()
+
+if __name__ == "__main__":
+    main()
@@ -49,7 +49,11 @@ class GameConfig:
                 "show_hints": True,
                 "show_minimap": True,
                 "show_health_bars": True,
-                "show_damage_numbers": True
+                "show_damage_numbers": True,
+                "trigger_cell_size": 8.0,  # taille des cellules de la grille des déclencheurs
+                "stats_flush_interval": 5.0,  # secondes entre deux écritures des statistiques
+                "stats_backend": "json",  # json ou sqlite (écritures simultanées de plusieurs processus)
+                "stats_db_file": "game_stats.db"
             },
             
             # Configuration de l'IA
@@ -58,7 +62,9 @@ class GameConfig:
                 "enemy_detection_range": 1.0,
                 "enemy_speed": 1.0,
                 "npc_interaction_range": 3.0,
-                "enemy_respawn_time": 60  # secondes
+                "enemy_respawn_time": 60,  # secondes
+                "perception_query_budget": 32,  # lignes de vue par image
+                "perception_move_threshold": 1.0  # déplacement invalidant le cache
             },
             
             # Configuration de l'interface
@@ -226,6 +232,10 @@ def get_enemy_detection_range():
     """Obtenir la portée de détection des ennemis"""
     return config.get('ai.enemy_detection_range', 1.0)
 
+def get_enemy_speed():
+    """Obtenir le multiplicateur de vitesse des ennemis"""
+    return config.get('ai.enemy_speed', 1.0)
+
 def get_ui_scale():
     """Obtenir l'échelle de l'interface"""
     return config.get('ui.ui_scale', 1.0)
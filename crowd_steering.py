@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pilotage de foule pour les groupes d'ennemis : séparation, cohésion et
+alignement calculés par lots à partir d'une grille de voisinage
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Décalages des 9 cellules voisines (plan XZ)
+_NEIGHBOUR_OFFSETS = np.array([(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)], dtype=np.int64)
+
+def _sum_by_owner(owners: np.ndarray, values: np.ndarray, count: int) -> np.ndarray:
+    """Somme des vecteurs (P, 3) regroupés par agent propriétaire"""
+    return np.stack([np.bincount(owners, weights=values[:, axis], minlength=count)
+                     for axis in range(3)], axis=1)
+
+class CrowdSteering:
+    """Forces de groupe calculées sans boucle Python par paire d'agents"""
+    
+    def __init__(self, neighbour_radius: float = 3.0, separation_radius: float = 1.2,
+                 separation_weight: float = 1.5, cohesion_weight: float = 0.3,
+                 alignment_weight: float = 0.5, max_force: float = 1.0):
+        self.neighbour_radius = neighbour_radius
+        self.separation_radius = separation_radius
+        self.separation_weight = separation_weight
+        self.cohesion_weight = cohesion_weight
+        self.alignment_weight = alignment_weight
+        self.max_force = max_force
+    
+    def neighbour_pairs(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Trouver toutes les paires (i, j) d'agents à moins de neighbour_radius
+        
+        Les agents sont triés par cellule de grille (taille = rayon de voisinage),
+        puis chaque agent est comparé aux agents des 9 cellules voisines.
+        """
+        count = len(positions)
+        if count < 2:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        
+        cells = np.floor(positions[:, [0, 2]] / self.neighbour_radius).astype(np.int64)
+        cells -= cells.min(axis=0)
+        width = int(cells[:, 1].max()) + 3
+        keys = (cells[:, 0] + 1) * width + (cells[:, 1] + 1)
+        
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        
+        # Plage [début, fin) de chaque cellule voisine, pour chaque agent
+        neighbour_keys = (keys[:, None]
+                          + _NEIGHBOUR_OFFSETS[None, :, 0] * width
+                          + _NEIGHBOUR_OFFSETS[None, :, 1]).ravel()
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+        ends = np.searchsorted(sorted_keys, neighbour_keys, side='right')
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        
+        # Développer les plages en paires candidates
+        owners = np.repeat(np.repeat(np.arange(count), len(_NEIGHBOUR_OFFSETS)), lengths)
+        range_offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        candidates = order[np.repeat(starts, lengths) + (np.arange(total) - range_offsets)]
+        
+        delta = positions[owners] - positions[candidates]
+        distance_sq = (delta * delta).sum(axis=1)
+        keep = (owners != candidates) & (distance_sq <= self.neighbour_radius ** 2)
+        return owners[keep], candidates[keep]
+    
+    def compute(self, positions: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+        """Calculer la force de pilotage de chaque agent (plan XZ)
+        
+        positions, velocities : tableaux (N, 3). Renvoie un tableau (N, 3).
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        velocities = np.asarray(velocities, dtype=np.float64)
+        count = len(positions)
+        force = np.zeros((count, 3), dtype=np.float64)
+        
+        owners, others = self.neighbour_pairs(positions)
+        if len(owners) == 0:
+            return force
+        
+        neighbours = np.bincount(owners, minlength=count).astype(np.float64)
+        has_neighbours = neighbours > 0
+        safe_counts = np.where(has_neighbours, neighbours, 1.0)[:, None]
+        
+        delta = positions[owners] - positions[others]
+        distance = np.sqrt((delta * delta).sum(axis=1))
+        
+        # Agents superposés : direction d'écartement arbitraire mais opposée pour chaque paire
+        stacked = distance < 1e-6
+        if stacked.any():
+            angle = np.minimum(owners[stacked], others[stacked]) * 2.399963
+            sign = np.sign(owners[stacked] - others[stacked])
+            delta[stacked, 0] = sign * np.cos(angle) * 1e-3
+            delta[stacked, 2] = sign * np.sin(angle) * 1e-3
+            distance[stacked] = 1e-3
+            
+        # Séparation : s'écarter des voisins trop proches, plus fort quand ils sont près
+        close = distance < self.separation_radius
+        safe_distance = np.where(distance > 1e-6, distance, 1e-6)
+        push = (1.0 - distance / self.separation_radius) / safe_distance
+        push = np.where(close, push, 0.0)[:, None] * delta
+        separation = _sum_by_owner(owners, push, count)
+        
+        # Cohésion : se rapprocher du centre des voisins
+        centre = _sum_by_owner(owners, positions[others], count)
+        cohesion = np.where(has_neighbours[:, None], centre / safe_counts - positions, 0.0)
+        
+        # Alignement : suivre la vitesse moyenne des voisins
+        heading = _sum_by_owner(owners, velocities[others], count)
+        alignment = np.where(has_neighbours[:, None], heading / safe_counts - velocities, 0.0)
+        
+        force = (separation * self.separation_weight
+                 + cohesion * self.cohesion_weight
+                 + alignment * self.alignment_weight)
+        force[:, 1] = 0.0
+        
+        # Limiter l'intensité de la force
+        magnitude = np.sqrt((force * force).sum(axis=1, keepdims=True))
+        scale = np.where(magnitude > self.max_force, self.max_force / np.maximum(magnitude, 1e-9), 1.0)
+        return force * scale
+    
+    def steer_towards(self, positions: np.ndarray, target, speed: np.ndarray) -> np.ndarray:
+        """Directions normalisées vers une cible commune, corrigées par la foule"""
+        positions = np.asarray(positions, dtype=np.float64)
+        desired = np.asarray(target, dtype=np.float64) - positions
+        length = np.sqrt((desired * desired).sum(axis=1, keepdims=True))
+        desired = desired / np.maximum(length, 1e-9)
+        
+        velocities = desired * np.asarray(speed, dtype=np.float64).reshape(-1, 1)
+        direction = desired + self.compute(positions, velocities)
+        length = np.sqrt((direction * direction).sum(axis=1, keepdims=True))
+        return direction / np.maximum(length, 1e-9)
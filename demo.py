@@ -69,7 +69,7 @@ def demo_inventory_system():
     
     material = ItemFactory.create_material("iron", 5)
     print(f"  - {material.name}: {material.description}")
-    print(f"    Quantité: {material.stats['quantity']}, Valeur: {material.value}")
+    print(f"    Quantité: {material.quantity}, Valeur: {material.total_value}")
     
     # Ajouter à l'inventaire
     print("\n📦 Ajout à l'inventaire:")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Système d'équipement : statistiques effectives du joueur (équipement porté
+et effets temporaires des potions), calculées une fois et mises en cache
+"""
+
+import heapq
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from inventory_system import Item
+
+# Emplacement occupé par chaque type d'objet équipable
+EQUIPMENT_SLOTS = {"weapon": "weapon", "armor": "armor", "shield": "shield"}
+
+# Statistiques agrégées (les autres, comme la durabilité, sont ignorées)
+COMBAT_STATS = ("damage", "defense", "block", "strength", "speed")
+
+# Statistiques de potion appliquées comme effets temporaires
+TIMED_STATS = ("strength", "speed")
+DEFAULT_EFFECT_DURATION = 60.0
+
+class Equipment:
+    """Équipement porté et effets actifs d'un personnage
+    
+    Les statistiques effectives sont recalculées uniquement quand l'équipement
+    change, quand un effet est ajouté ou quand le plus proche effet expire ;
+    une lecture coûte sinon une comparaison avec la prochaine expiration.
+    """
+    
+    def __init__(self, base_stats: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_stats = {stat: 0 for stat in COMBAT_STATS}
+        self.base_stats.update(base_stats or {})
+        self.clock = clock
+        self.slots: Dict[str, Item] = {}
+        self._effects: List[Tuple[float, int, str, float]] = []  # Tas (expiration, n°, stat, bonus)
+        self._effect_count = 0
+        self._stats: Optional[Mapping[str, float]] = None
+    
+    def _invalidate(self):
+        self._stats = None
+    
+    def equip(self, item: Item) -> Optional[Item]:
+        """Équiper un objet ; renvoie l'objet remplacé dans le même emplacement"""
+        slot = EQUIPMENT_SLOTS.get(item.item_type)
+        if slot is None:
+            raise ValueError(f"Objet non équipable: {item.id}")
+        previous = self.slots.get(slot)
+        self.slots[slot] = item
+        self._invalidate()
+        return previous
+    
+    def unequip(self, slot: str) -> Optional[Item]:
+        """Retirer l'objet d'un emplacement"""
+        item = self.slots.pop(slot, None)
+        if item is not None:
+            self._invalidate()
+        return item
+    
+    def add_effect(self, stat: str, amount: float, duration: float):
+        """Ajouter un bonus temporaire"""
+        self._effect_count += 1
+        heapq.heappush(self._effects, (self.clock() + duration, self._effect_count, stat, amount))
+        self._invalidate()
+    
+    def use_potion(self, item: Item) -> Dict[str, float]:
+        """Appliquer les effets temporaires d'une potion
+        
+        Renvoie les effets immédiats (soin, mana) que l'appelant doit appliquer.
+        """
+        stats = item.stats
+        duration = stats.get("duration", DEFAULT_EFFECT_DURATION)
+        immediate = {}
+        for stat, amount in stats.items():
+            if stat in TIMED_STATS:
+                self.add_effect(stat, amount, duration)
+            elif stat != "duration":
+                immediate[stat] = amount
+        return immediate
+    
+    def clear_effects(self):
+        """Retirer tous les effets temporaires"""
+        if self._effects:
+            self._effects.clear()
+            self._invalidate()
+    
+    @property
+    def stats(self) -> Mapping[str, float]:
+        """Statistiques effectives (lecture seule)"""
+        if self._effects and self._effects[0][0] <= self.clock():
+            now = self.clock()
+            while self._effects and self._effects[0][0] <= now:
+                heapq.heappop(self._effects)
+            self._invalidate()
+        if self._stats is None:
+            self._stats = self._compute()
+        return self._stats
+    
+    def _compute(self) -> Mapping[str, float]:
+        """Additionner base, équipement et effets"""
+        totals = dict(self.base_stats)
+        for item in self.slots.values():
+            for stat, amount in item.stats.items():
+                if stat in totals:
+                    totals[stat] += amount
+        for _, _, stat, amount in self._effects:
+            if stat in totals:
+                totals[stat] += amount
+        # La force s'ajoute aux dégâts infligés
+        totals["damage"] += totals["strength"]
+        return MappingProxyType(totals)
+    
+    def damage_taken(self, raw_damage: float) -> int:
+        """Dégâts reçus après armure (défense) et bouclier (blocage en %)"""
+        stats = self.stats
+        reduced = (raw_damage - stats["defense"]) * (1 - min(stats["block"], 90) / 100)
+        return max(1, int(round(reduced)))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vue en colonnes (tableaux NumPy) d'un inventaire, maintenue à chaque
+modification : agrégats vectorisés et sac à dos borné pour l'équipement
+automatique et les suggestions de vente
+"""
+
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+# Statistiques copiées dans les colonnes
+KEY_STATS = ("damage", "defense", "block", "heal", "mana", "strength")
+
+# Au-delà de ces tailles (lots, cellules lots × capacité), le sac à dos est
+# résolu par l'heuristique gloutonne au lieu de la programmation dynamique exacte
+EXACT_PIECE_LIMIT = 512
+EXACT_CELL_LIMIT = 1_000_000
+
+def solve_bounded_knapsack(values: np.ndarray, weights: np.ndarray, counts: np.ndarray,
+                           capacity: int) -> np.ndarray:
+    """Nombre d'exemplaires à prendre par ligne pour maximiser la valeur totale
+    
+    weights et capacity sont des entiers (virgule fixe). Résolution exacte par
+    programmation dynamique (décomposition binaire des quantités) quand le
+    problème est petit, sinon glouton par densité complété et comparé au
+    meilleur objet seul (au moins la moitié de l'optimum).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    take = np.zeros(len(values), dtype=np.int64)
+    
+    useful = (values > 0) & (counts > 0) & (weights <= capacity)
+    weightless = useful & (weights <= 0)
+    take[weightless] = counts[weightless]
+    rows = np.flatnonzero(useful & (weights > 0))
+    if len(rows) == 0 or capacity <= 0:
+        return take
+    
+    # Réduire les poids par leur PGCD pour diminuer la capacité de la table
+    divisor = int(np.gcd.reduce(np.append(weights[rows], capacity)))
+    row_weights = weights[rows] // divisor
+    row_counts = np.minimum(counts[rows], capacity // weights[rows])
+    limit = capacity // divisor
+    
+    pieces = int(np.floor(np.log2(row_counts + 1)).sum() + len(rows))
+    if pieces <= EXACT_PIECE_LIMIT and pieces * (limit + 1) <= EXACT_CELL_LIMIT:
+        take[rows] = _knapsack_exact(values[rows], row_weights, row_counts, limit)
+    else:
+        take[rows] = _knapsack_greedy(values[rows], row_weights, row_counts, limit)
+    return take
+
+def _knapsack_exact(values: np.ndarray, weights: np.ndarray, counts: np.ndarray, capacity: int) -> np.ndarray:
+    """Programmation dynamique sur la capacité, un lot 1, 2, 4... exemplaires à la fois"""
+    piece_rows = []
+    piece_sizes = []
+    for row, count in enumerate(counts.tolist()):
+        size = 1
+        while count > 0:
+            piece = min(size, count)
+            piece_rows.append(row)
+            piece_sizes.append(piece)
+            count -= piece
+            size *= 2
+    
+    best = np.zeros(capacity + 1, dtype=np.float64)
+    chosen = np.zeros((len(piece_rows), capacity + 1), dtype=bool)
+    for piece, (row, size) in enumerate(zip(piece_rows, piece_sizes)):
+        weight = int(weights[row]) * size
+        if weight > capacity:
+            continue
+        candidate = best[:capacity + 1 - weight] + values[row] * size
+        improved = candidate > best[weight:]
+        chosen[piece, weight:] = improved
+        best[weight:] = np.where(improved, candidate, best[weight:])
+    
+    take = np.zeros(len(values), dtype=np.int64)
+    remaining = capacity
+    for piece in range(len(piece_rows) - 1, -1, -1):
+        if chosen[piece, remaining]:
+            row = piece_rows[piece]
+            take[row] += piece_sizes[piece]
+            remaining -= int(weights[row]) * piece_sizes[piece]
+    return take
+
+def _knapsack_greedy(values: np.ndarray, weights: np.ndarray, counts: np.ndarray, capacity: int) -> np.ndarray:
+    """Glouton par valeur/poids, complété par les lignes qui tiennent encore"""
+    take = np.zeros(len(values), dtype=np.int64)
+    order = np.argsort(-(values / weights))
+    cumulative = np.cumsum(weights[order] * counts[order])
+    full = int(np.searchsorted(cumulative, capacity, side='right'))
+    take[order[:full]] = counts[order[:full]]
+    remaining = capacity - (int(cumulative[full - 1]) if full else 0)
+    
+    rest = order[full:]
+    rest = rest[weights[rest] <= remaining]
+    if len(rest):
+        smallest = int(weights[rest].min())
+        for row, weight, count in zip(rest.tolist(), weights[rest].tolist(), counts[rest].tolist()):
+            if remaining < smallest:
+                break
+            units = min(count, remaining // weight)
+            if units:
+                take[row] = units
+                remaining -= units * weight
+    
+    # Garantie 1/2 : le meilleur objet seul peut battre le glouton
+    single = values * np.minimum(counts, capacity // weights)
+    best_row = int(np.argmax(single))
+    if single[best_row] > float((values * take).sum()):
+        take[:] = 0
+        take[best_row] = min(int(counts[best_row]), capacity // int(weights[best_row]))
+    return take
+
+class InventoryColumns:
+    """Colonnes NumPy des piles d'un inventaire, une ligne par clé d'entrée
+    
+    Les lignes sont compactes : un retrait déplace la dernière ligne dans le trou.
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+        self._codes: Dict[str, Dict[str, int]] = {"item_type": {}, "rarity": {}}
+        self._allocate(capacity)
+    
+    def _allocate(self, capacity: int):
+        """Créer ou agrandir les tableaux"""
+        old = getattr(self, "keys", None)
+        arrays = {
+            "keys": np.zeros(capacity, dtype=np.int64),
+            "quantity": np.zeros(capacity, dtype=np.int64),
+            "value": np.zeros(capacity, dtype=np.int64),
+            "weight": np.zeros(capacity, dtype=np.int64),  # Virgule fixe (WEIGHT_SCALE)
+            "stats": np.zeros((capacity, len(KEY_STATS)), dtype=np.float64),
+            "item_type": np.zeros(capacity, dtype=np.int16),
+            "rarity": np.zeros(capacity, dtype=np.int16),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, array)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _code(self, group: str, label: str) -> int:
+        codes = self._codes[group]
+        code = codes.get(label)
+        if code is None:
+            code = codes[label] = len(codes)
+        return code
+    
+    def add(self, key: int, item):
+        """Ajouter la ligne d'une pile"""
+        if self._size == len(self.keys):
+            self._allocate(2 * len(self.keys))
+        row = self._size
+        self._size += 1
+        self._rows[key] = row
+        definition = item.definition
+        self.keys[row] = key
+        self.quantity[row] = item.quantity
+        self.value[row] = definition.value
+        self.weight[row] = definition.fixed_weight
+        stats = definition.stats
+        self.stats[row] = [stats.get(stat, 0) for stat in KEY_STATS]
+        self.item_type[row] = self._code("item_type", definition.item_type)
+        self.rarity[row] = self._code("rarity", definition.rarity)
+    
+    def remove(self, key: int):
+        """Retirer la ligne d'une pile"""
+        row = self._rows.pop(key)
+        last = self._size - 1
+        if row != last:
+            for name in ("keys", "quantity", "value", "weight", "stats", "item_type", "rarity"):
+                array = getattr(self, name)
+                array[row] = array[last]
+            self._rows[int(self.keys[row])] = row
+        self._size = last
+    
+    def set_quantity(self, key: int, quantity: int):
+        """Mettre à jour la quantité d'une pile"""
+        self.quantity[self._rows[key]] = quantity
+    
+    def clear(self):
+        """Vider les colonnes"""
+        self._rows.clear()
+        self._size = 0
+    
+    def column(self, name: str) -> np.ndarray:
+        """Colonne d'attribut unitaire (value, weight, quantity ou statistique)"""
+        if name in KEY_STATS:
+            return self.stats[:self._size, KEY_STATS.index(name)]
+        return getattr(self, name)[:self._size]
+    
+    def total(self, name: str = "value") -> float:
+        """Somme d'une colonne pondérée par les quantités"""
+        return float((self.column(name) * self.quantity[:self._size]).sum())
+    
+    def total_by(self, group: str, name: str = "value") -> Dict[str, float]:
+        """Somme d'une colonne (× quantités) par type ou par rareté"""
+        codes = self._codes[group]
+        sums = np.bincount(getattr(self, group)[:self._size],
+                           weights=self.column(name) * self.quantity[:self._size],
+                           minlength=len(codes))
+        return {label: float(sums[code]) for label, code in codes.items() if code < len(sums)}
+    
+    def _objective(self, objective: Union[str, Dict[str, float]]) -> np.ndarray:
+        """Valeur unitaire à maximiser : une colonne ou une combinaison pondérée"""
+        if isinstance(objective, str):
+            return self.column(objective).astype(np.float64)
+        score = np.zeros(self._size, dtype=np.float64)
+        for name, factor in objective.items():
+            score += self.column(name) * factor
+        return score
+    
+    def solve(self, capacity: int, objective: Union[str, Dict[str, float]] = "value",
+              item_types: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Meilleure sélection sous une capacité de poids (virgule fixe)
+        
+        Renvoie les clés d'entrée retenues et le nombre d'exemplaires de chacune.
+        """
+        values = self._objective(objective)
+        counts = self.quantity[:self._size].copy()
+        if item_types is not None:
+            codes = [self._codes["item_type"][t] for t in item_types if t in self._codes["item_type"]]
+            counts[~np.isin(self.item_type[:self._size], codes)] = 0
+        take = solve_bounded_knapsack(values, self.weight[:self._size], counts, capacity)
+        selected = np.flatnonzero(take)
+        return self.keys[selected], take[selected]
@@ -5,12 +5,39 @@ Système d'inventaire et de commerce pour le RPG
 """
 
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import os
+import weakref
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Dict, Any, Mapping, Optional, Set, Tuple, Union
+from dataclasses import dataclass, field, replace
 
-@dataclass
-class Item:
-    """Classe représentant un objet"""
+from inventory_columns import InventoryColumns
+from item_query import SORT_KEYS, ItemIndex, ItemQuery
+from trade_ledger import TradeLedger
+
+# Taille de pile par défaut selon le type d'objet (1 = non empilable)
+DEFAULT_MAX_STACK = {"potion": 20, "material": 99}
+
+SHOP_CATALOG_FILE = "shop_catalog.json"
+INVENTORY_SAVE_FILE = "inventory_save.jsonl"
+LEGACY_INVENTORY_SAVE_FILE = "inventory_save.json"  # Ancien format (un document JSON), migré au chargement
+
+# Le journal de sauvegarde est compacté quand il dépasse JOURNAL_COMPACT_RATIO
+# fois la taille d'un instantané (et au moins JOURNAL_COMPACT_MIN lignes)
+JOURNAL_COMPACT_RATIO = 2
+JOURNAL_COMPACT_MIN = 256
+
+# Les poids sont additionnés en virgule fixe (millièmes) pour éviter la dérive des flottants
+WEIGHT_SCALE = 1000
+
+def to_fixed_weight(weight: float) -> int:
+    """Convertir un poids en entier (millièmes d'unité)"""
+    return int(round(weight * WEIGHT_SCALE))
+
+@dataclass(frozen=True, eq=False)
+class ItemDefinition:
+    """Définition immuable d'un objet, partagée par tous ses exemplaires"""
     id: str
     name: str
     description: str
@@ -18,248 +45,767 @@ class Item:
     value: int
     weight: float
     rarity: str  # common, uncommon, rare, epic, legendary
-    stats: Dict[str, int] | None = None
+    stats: Mapping[str, int] = field(default_factory=dict)
+    max_stack: int = 1
+    fixed_weight: int = field(init=False)
     
     def __post_init__(self):
-        if self.stats is None:
-            self.stats = {}
+        object.__setattr__(self, "stats", MappingProxyType(dict(self.stats or {})))
+        object.__setattr__(self, "fixed_weight", to_fixed_weight(self.weight))
+
+# Définitions internées par ID ; libérées quand plus aucun exemplaire ne les référence
+_definitions: "weakref.WeakValueDictionary[str, ItemDefinition]" = weakref.WeakValueDictionary()
+# IDs internés depuis une sauvegarde : les données courantes (catalogue, fabrique) les remplacent
+_saved_ids: Set[str] = set()
+
+def define_item(id: str, name: str, description: str, item_type: str, value: int,
+                weight: float, rarity: str, stats: Optional[Dict[str, int]] = None,
+                max_stack: Optional[int] = None) -> ItemDefinition:
+    """Obtenir la définition internée d'un objet (créée au premier appel)
+    
+    Un ID déjà interné avec d'autres données lève ValueError, sauf s'il
+    provient d'une sauvegarde (voir saved_definition) : les nouvelles données
+    le remplacent alors, les exemplaires chargés gardant leur définition.
+    """
+    if max_stack is None:
+        max_stack = DEFAULT_MAX_STACK.get(item_type, 1)
+    fields = (name, description, item_type, value, weight, rarity, dict(stats or {}), max_stack)
+    definition = _definitions.get(id)
+    if definition is not None and _definition_fields(definition) != fields:
+        if id not in _saved_ids:
+            raise ValueError(f"Définition différente pour un ID déjà utilisé: {id}")
+        definition = None
+    _saved_ids.discard(id)
+    if definition is None:
+        definition = ItemDefinition(id, name, description, item_type, value,
+                                    weight, rarity, stats or {}, max_stack)
+        _definitions[id] = definition
+    return definition
+
+def saved_definition(id: str, name: str, description: str, item_type: str, value: int,
+                     weight: float, rarity: str, stats: Optional[Dict[str, int]] = None,
+                     max_stack: Optional[int] = None) -> ItemDefinition:
+    """Définition d'un objet relu dans une sauvegarde
+    
+    Si l'ID est déjà interné (données du jeu modifiées depuis la sauvegarde),
+    la définition courante est réutilisée ; sinon les données sauvegardées
+    sont internées et seront remplacées par define_item si elles diffèrent.
+    """
+    definition = _definitions.get(id)
+    if definition is not None:
+        return definition
+    definition = define_item(id, name, description, item_type, value, weight, rarity, stats, max_stack)
+    _saved_ids.add(id)
+    return definition
+
+def _definition_fields(definition: ItemDefinition) -> tuple:
+    """Données d'une définition, hors ID (pour détecter les redéfinitions)"""
+    return (definition.name, definition.description, definition.item_type, definition.value,
+            definition.weight, definition.rarity, dict(definition.stats), definition.max_stack)
+
+def get_definition(item_id: str) -> Optional[ItemDefinition]:
+    """Obtenir une définition déjà internée"""
+    return _definitions.get(item_id)
+
+class Item:
+    """Exemplaire d'objet : une définition partagée, une quantité et l'état propre
+    à l'exemplaire (durabilité)"""
+    
+    __slots__ = ("definition", "quantity", "durability")
+    
+    def __init__(self, definition: ItemDefinition, quantity: int = 1, durability: Optional[int] = None):
+        self.definition = definition
+        self.quantity = quantity
+        if durability is None:
+            durability = definition.stats.get("durability")
+        self.durability = durability
+        
+    def __repr__(self) -> str:
+        return f"Item({self.definition.id!r}, quantity={self.quantity})"
+        
+    @property
+    def id(self) -> str:
+        return self.definition.id
+        
+    @property
+    def name(self) -> str:
+        return self.definition.name
+        
+    @property
+    def description(self) -> str:
+        return self.definition.description
+        
+    @property
+    def item_type(self) -> str:
+        return self.definition.item_type
+        
+    @property
+    def value(self) -> int:
+        """Valeur unitaire"""
+        return self.definition.value
+        
+    @property
+    def weight(self) -> float:
+        """Poids unitaire"""
+        return self.definition.weight
+        
+    @property
+    def rarity(self) -> str:
+        return self.definition.rarity
+        
+    @property
+    def stats(self) -> Mapping[str, int]:
+        return self.definition.stats
+        
+    @property
+    def total_value(self) -> int:
+        """Valeur de la pile entière"""
+        return self.definition.value * self.quantity
+        
+    @property
+    def total_weight(self) -> float:
+        """Poids de la pile entière"""
+        return self.definition.fixed_weight * self.quantity / WEIGHT_SCALE
+        
+    @property
+    def is_stackable(self) -> bool:
+        """Les exemplaires avec un état propre (durabilité) ne s'empilent pas"""
+        return self.definition.max_stack > 1 and self.durability is None
+        
+    @property
+    def stack_room(self) -> int:
+        """Nombre d'exemplaires que la pile peut encore recevoir"""
+        if not self.is_stackable:
+            return 0
+        return max(0, self.definition.max_stack - self.quantity)
+        
+    def can_stack_with(self, other: "Item") -> bool:
+        """Vérifier si deux exemplaires peuvent être fusionnés"""
+        return self.definition is other.definition and self.is_stackable and other.is_stackable
+        
+    def split(self, count: int) -> "Item":
+        """Détacher count exemplaires dans une nouvelle pile"""
+        if not 0 < count < self.quantity:
+            raise ValueError(f"Impossible de séparer {count} exemplaire(s) d'une pile de {self.quantity}")
+        self.quantity -= count
+        return Item(self.definition, count, self.durability)
+        
+    def merge(self, other: "Item") -> int:
+        """Verser autant que possible de other dans cette pile ; renvoie la quantité déplacée"""
+        if not self.can_stack_with(other):
+            return 0
+        moved = min(self.stack_room, other.quantity)
+        self.quantity += moved
+        other.quantity -= moved
+        return moved
+
+class _SaveJournal:
+    """État du fichier de sauvegarde associé à un inventaire"""
+    
+    __slots__ = ("filename", "keys", "definitions", "max_weight", "lines")
+    
+    def __init__(self, filename: str, max_weight: float):
+        self.filename = filename
+        self.keys: Set[int] = set()  # Clés d'entrées présentes dans le fichier
+        self.definitions: Set[str] = set()  # Définitions déjà écrites
+        self.max_weight = max_weight
+        self.lines = 0
+        
+    def needs_compaction(self) -> bool:
+        """Le journal est-il devenu trop long par rapport à un instantané ?"""
+        snapshot_lines = 1 + len(self.definitions) + len(self.keys)
+        return self.lines > max(JOURNAL_COMPACT_MIN, JOURNAL_COMPACT_RATIO * snapshot_lines)
+
+def _ends_with_newline(filename: str) -> bool:
+    """Le fichier est-il vide ou terminé par un saut de ligne ? (sinon une écriture a été interrompue)"""
+    with open(filename, 'rb') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def _definition_record(definition: ItemDefinition) -> list:
+    """Ligne de journal décrivant une définition"""
+    return ["def", definition.id, definition.name, definition.description, definition.item_type,
+            definition.value, definition.weight, definition.rarity, dict(definition.stats),
+            definition.max_stack]
 
 class Inventory:
-    """Système d'inventaire"""
+    """Système d'inventaire
+    
+    Chaque pile est rangée sous une clé d'entrée unique. Des index par ID, type
+    et rareté ainsi que les totaux de valeur et de poids sont maintenus à chaque
+    ajout ou retrait, en O(1) ; les vues triées des requêtes (voir item_query)
+    sont construites à la demande.
+    Les quantités et durabilités des piles ne doivent être modifiées que via
+    l'inventaire (voir set_durability).
+    """
     
     def __init__(self, max_weight: float = 100.0):
-        self.items = []
         self.max_weight = max_weight
-        self.current_weight = 0.0
+        self._entries: Dict[int, Item] = {}
+        self._next_key = 0
+        self._by_id: Dict[str, Dict[int, Item]] = {}
+        self._index = ItemIndex()
+        self._columns = InventoryColumns()
+        self._total_value = 0
+        self._total_weight = 0  # Virgule fixe, voir WEIGHT_SCALE
+        self._changed: Set[int] = set()  # Clés modifiées depuis la dernière sauvegarde
+        self._journal: Optional[_SaveJournal] = None
         
-    def add_item(self, item: Item) -> bool:
-        """Ajouter un objet à l'inventaire"""
-        if self.current_weight + item.weight <= self.max_weight:
-            self.items.append(item)
-            self.current_weight += item.weight
-            return True
+    @property
+    def items(self) -> List[Item]:
+        """Piles de l'inventaire, dans l'ordre d'ajout"""
+        return list(self._entries.values())
+        
+    @property
+    def columns(self) -> InventoryColumns:
+        """Vue en colonnes NumPy, pour les agrégats vectorisés"""
+        return self._columns
+        
+    @property
+    def current_weight(self) -> float:
+        """Poids actuel de l'inventaire"""
+        return self._total_weight / WEIGHT_SCALE
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+        
+    def _insert(self, item: Item, key: Optional[int] = None) -> int:
+        """Ranger une pile et mettre à jour les index (sans contrôle du poids)"""
+        if key is None:
+            key = self._next_key
+        self._next_key = max(self._next_key, key + 1)
+        self._changed.add(key)
+        self._entries[key] = item
+        self._by_id.setdefault(item.id, {})[key] = item
+        self._index.add(key, item)
+        self._columns.add(key, item)
+        self._total_value += item.total_value
+        self._total_weight += item.definition.fixed_weight * item.quantity
+        return key
+        
+    def _discard(self, key: int) -> Item:
+        """Retirer une pile et mettre à jour les index"""
+        item = self._entries.pop(key)
+        self._changed.add(key)
+        bucket = self._by_id[item.id]
+        del bucket[key]
+        if not bucket:
+            del self._by_id[item.id]
+        self._index.remove(key)
+        self._columns.remove(key)
+        self._total_value -= item.total_value
+        self._total_weight -= item.definition.fixed_weight * item.quantity
+        return item
+        
+    def _change_quantity(self, key: int, delta: int):
+        """Modifier la quantité d'une pile rangée et les totaux"""
+        item = self._entries[key]
+        item.quantity += delta
+        self._changed.add(key)
+        self._columns.set_quantity(key, item.quantity)
+        self._total_value += item.definition.value * delta
+        self._total_weight += item.definition.fixed_weight * delta
+        
+    def set_durability(self, item: Item, durability: Optional[int]) -> bool:
+        """Modifier la durabilité d'une pile rangée (enregistrée à la prochaine sauvegarde)"""
+        for key, stack in self._by_id.get(item.id, {}).items():
+            if stack is item:
+                item.durability = durability
+                self._changed.add(key)
+                return True
         return False
         
-    def remove_item(self, item_id: str) -> Optional[Item]:
-        """Retirer un objet de l'inventaire"""
-        for i, item in enumerate(self.items):
-            if item.id == item_id:
-                removed_item = self.items.pop(i)
-                self.current_weight -= removed_item.weight
-                return removed_item
-        return None
+    def clear(self):
+        """Vider l'inventaire"""
+        self._changed.update(self._entries)
+        self._entries.clear()
+        self._by_id.clear()
+        self._index.clear()
+        self._columns.clear()
+        self._total_value = 0
+        self._total_weight = 0
+        
+    def can_carry(self, weight: float) -> bool:
+        """Vérifier si un poids supplémentaire peut être porté"""
+        return self._total_weight + to_fixed_weight(weight) <= to_fixed_weight(self.max_weight)
+        
+    def add_item(self, item: Item) -> bool:
+        """Ajouter un objet à l'inventaire (fusionné dans les piles existantes si possible)
+        
+        L'objet passé n'est pas modifié ; s'il n'est pas entièrement fusionné,
+        le reste est rangé dans de nouvelles piles d'au plus max_stack
+        exemplaires (un par pile pour les objets non empilables).
+        """
+        if item.quantity <= 0:
+            return False
+        added_weight = item.definition.fixed_weight * item.quantity
+        if self._total_weight + added_weight > to_fixed_weight(self.max_weight):
+            return False
+            
+        remaining = item.quantity
+        if item.is_stackable:
+            for key, stack in self._by_id.get(item.id, {}).items():
+                moved = min(stack.stack_room, remaining) if stack.can_stack_with(item) else 0
+                if moved:
+                    self._change_quantity(key, moved)
+                    remaining -= moved
+                    if not remaining:
+                        return True
+                        
+        # Nouvelles piles (jamais l'objet passé, que les fusions suivantes modifieraient)
+        stack_size = item.definition.max_stack if item.is_stackable else 1
+        while remaining:
+            count = min(remaining, stack_size)
+            self._insert(Item(item.definition, count, item.durability))
+            remaining -= count
+        return True
+        
+    def remove_item(self, item_id: str, quantity: Optional[int] = None) -> Optional[Item]:
+        """Retirer un objet de l'inventaire
+        
+        Sans quantité, la première pile est retirée en entier. Avec une quantité,
+        les exemplaires sont prélevés sur les piles et renvoyés dans une seule
+        pile ; les exemplaires non empilables (durabilité propre) ne peuvent pas
+        être regroupés : au-delà d'un, utiliser remove_items.
+        """
+        bucket = self._by_id.get(item_id)
+        if not bucket:
+            return None
+        if quantity is None:
+            return self._discard(next(iter(bucket)))
+        if quantity <= 0:
+            return None
+            
+        if quantity > 1:
+            needed = quantity
+            for stack in bucket.values():
+                if not stack.is_stackable:
+                    return None
+                needed -= stack.quantity
+                if needed <= 0:
+                    break
+                    
+        removed = self.remove_items(item_id, quantity)
+        if removed is None:
+            return None
+        if len(removed) == 1:
+            return removed[0]
+        return Item(removed[0].definition, quantity)
+        
+    def remove_items(self, item_id: str, quantity: int) -> Optional[List[Item]]:
+        """Retirer quantity exemplaires d'un objet, prélevés sur les piles dans l'ordre
+        
+        Renvoie les piles retirées (ou la partie prélevée), chacune avec son
+        état propre ; None si l'inventaire n'en contient pas assez.
+        """
+        bucket = self._by_id.get(item_id)
+        if not bucket or quantity <= 0:
+            return None
+        if sum(stack.quantity for stack in bucket.values()) < quantity:
+            return None
+            
+        removed = []
+        for key in list(bucket):
+            stack = bucket[key]
+            taken = min(stack.quantity, quantity)
+            if taken == stack.quantity:
+                removed.append(self._discard(key))
+            else:
+                self._change_quantity(key, -taken)
+                removed.append(Item(stack.definition, taken, stack.durability))
+            quantity -= taken
+            if not quantity:
+                break
+        return removed
+        
+    def snapshot(self, item_ids: Iterable[str]) -> Dict[str, Dict[int, Tuple[Item, int]]]:
+        """État des piles de quelques objets (clé, pile, quantité), pour restore()"""
+        return {item_id: {key: (stack, stack.quantity) for key, stack in self._by_id.get(item_id, {}).items()}
+                for item_id in item_ids}
+                
+    def restore(self, snapshot: Dict[str, Dict[int, Tuple[Item, int]]]):
+        """Remettre les piles de ces objets exactement dans l'état de snapshot()
+        
+        Les piles apparues depuis sont retirées, les piles retirées sont
+        rangées de nouveau sous leur clé (mêmes objets, donc même durabilité)
+        et les quantités sont rétablies ; les autres piles ne sont pas touchées.
+        """
+        reinserted = False
+        for item_id, stacks in snapshot.items():
+            for key, stack in list(self._by_id.get(item_id, {}).items()):
+                if key not in stacks or stacks[key][0] is not stack:
+                    self._discard(key)
+            for key, (stack, quantity) in stacks.items():
+                if key in self._entries:
+                    if stack.quantity != quantity:
+                        self._change_quantity(key, quantity - stack.quantity)
+                else:
+                    stack.quantity = quantity
+                    self._insert(stack, key)
+                    reinserted = True
+            if item_id in self._by_id:
+                self._by_id[item_id] = dict(sorted(self._by_id[item_id].items()))
+        if reinserted:
+            # Les clés croissent avec l'ordre d'ajout : rétablir cet ordre
+            self._entries = dict(sorted(self._entries.items()))
+            
+    def split_stack(self, item_id: str, count: int) -> Optional[Item]:
+        """Séparer count exemplaires de la première pile dans une nouvelle pile de l'inventaire"""
+        bucket = self._by_id.get(item_id)
+        if not bucket:
+            return None
+        key = next(iter(bucket))
+        if not 0 < count < bucket[key].quantity:
+            return None
+        self._change_quantity(key, -count)
+        part = Item(bucket[key].definition, count, bucket[key].durability)
+        self._insert(part)
+        return part
+        
+    def merge_stacks(self, item_id: str) -> int:
+        """Regrouper les piles d'un objet ; renvoie le nombre de piles supprimées"""
+        bucket = self._by_id.get(item_id)
+        if not bucket or len(bucket) < 2:
+            return 0
+            
+        removed = 0
+        keys = list(bucket)
+        for i, target_key in enumerate(keys):
+            target = self._entries.get(target_key)
+            if target is None or not target.stack_room:
+                continue
+            for source_key in keys[i + 1:]:
+                source = self._entries.get(source_key)
+                if source is None or not target.can_stack_with(source):
+                    continue
+                moved = min(target.stack_room, source.quantity)
+                self._change_quantity(target_key, moved)
+                if moved == source.quantity:
+                    self._discard(source_key)
+                    removed += 1
+                else:
+                    self._change_quantity(source_key, -moved)
+                if not target.stack_room:
+                    break
+        return removed
         
     def get_item(self, item_id: str) -> Optional[Item]:
         """Obtenir un objet par son ID"""
-        for item in self.items:
-            if item.id == item_id:
-                return item
-        return None
+        bucket = self._by_id.get(item_id)
+        if not bucket:
+            return None
+        return next(iter(bucket.values()))
         
     def get_items_by_type(self, item_type: str) -> List[Item]:
         """Obtenir tous les objets d'un certain type"""
-        return [item for item in self.items if item.item_type == item_type]
+        return self._index.items_of_type(item_type)
+        
+    def get_items_by_rarity(self, rarity: str) -> List[Item]:
+        """Obtenir tous les objets d'une certaine rareté"""
+        return self._index.items_of_rarity(rarity)
+        
+    def query(self, query: ItemQuery) -> List[Item]:
+        """Rechercher des piles selon plusieurs critères, triées et paginées"""
+        return self._index.query(query)
         
     def has_item(self, item_id: str) -> bool:
         """Vérifier si l'inventaire contient un objet"""
-        return any(item.id == item_id for item in self.items)
+        return item_id in self._by_id
+        
+    def count_item(self, item_id: str) -> int:
+        """Compter les exemplaires d'un objet (toutes piles confondues)"""
+        return sum(stack.quantity for stack in self._by_id.get(item_id, {}).values())
         
     def get_total_value(self) -> int:
         """Calculer la valeur totale de l'inventaire"""
-        return sum(item.value for item in self.items)
-        
-    def save_inventory(self, filename: str = "inventory_save.json"):
-        """Sauvegarder l'inventaire"""
-        save_data = {
-            "max_weight": self.max_weight,
-            "current_weight": self.current_weight,
-            "items": [
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "description": item.description,
-                    "item_type": item.item_type,
-                    "value": item.value,
-                    "weight": item.weight,
-                    "rarity": item.rarity,
-                    "stats": item.stats
-                }
-                for item in self.items
-            ]
-        }
+        return self._total_value
+        
+    def best_loadout(self, max_weight: Optional[float] = None, objective: Union[str, Dict[str, float]] = "value",
+                     item_types: Optional[Iterable[str]] = None) -> List[Tuple[Item, int]]:
+        """Meilleure sélection de piles sous une limite de poids
         
-        with open(filename, 'w') as f:
-            json.dump(save_data, f)
+        objective : colonne à maximiser (value ou statistique, ex. "damage") ou
+        combinaison pondérée ({"damage": 1.0, "defense": 0.5}).
+        Renvoie des couples (pile, nombre d'exemplaires retenus).
+        """
+        if max_weight is None:
+            max_weight = self.max_weight
+        keys, counts = self._columns.solve(to_fixed_weight(max_weight), objective, item_types)
+        return [(self._entries[key], count) for key, count in zip(keys.tolist(), counts.tolist())]
+        
+    def suggest_sales(self, target_weight: float) -> List[Tuple[Item, int]]:
+        """Exemplaires à vendre pour descendre sous target_weight en perdant le moins de valeur"""
+        kept = {id(item): count for item, count in self.best_loadout(target_weight)}
+        suggestions = []
+        for item in self._entries.values():
+            surplus = item.quantity - kept.get(id(item), 0)
+            if surplus > 0:
+                suggestions.append((item, surplus))
+        return suggestions
+        
+    def save_inventory(self, filename: str = INVENTORY_SAVE_FILE, compact: bool = False):
+        """Sauvegarder l'inventaire
+        
+        Le fichier est un journal (une ligne JSON par opération) : seules les
+        piles modifiées depuis la dernière sauvegarde sont ajoutées. Un
+        instantané complet remplace le journal au premier enregistrement dans
+        un fichier, quand compact est demandé ou quand le journal devient trop long.
+        """
+        journal = self._journal
+        if (compact or journal is None or journal.filename != filename
+                or not os.path.exists(filename) or journal.needs_compaction()):
+            self._write_snapshot(filename)
+            return
             
-    def load_inventory(self, filename: str = "inventory_save.json"):
-        """Charger l'inventaire"""
-        try:
-            with open(filename, 'r') as f:
-                save_data = json.load(f)
-                
-            self.max_weight = save_data["max_weight"]
-            self.current_weight = save_data["current_weight"]
-            self.items = []
+        records = []
+        if self.max_weight != journal.max_weight:
+            records.append(["max_weight", self.max_weight])
+            journal.max_weight = self.max_weight
+        for key in sorted(self._changed):
+            item = self._entries.get(key)
+            if item is None:
+                if key in journal.keys:
+                    journal.keys.discard(key)
+                    records.append(["del", key])
+                continue
+            if item.id not in journal.definitions:
+                journal.definitions.add(item.id)
+                records.append(_definition_record(item.definition))
+            journal.keys.add(key)
+            records.append(["put", key, item.id, item.quantity, item.durability])
+        self._changed.clear()
+        if not records:
+            return
             
-            for item_data in save_data["items"]:
-                item = Item(
-                    id=item_data["id"],
-                    name=item_data["name"],
-                    description=item_data["description"],
-                    item_type=item_data["item_type"],
-                    value=item_data["value"],
-                    weight=item_data["weight"],
-                    rarity=item_data["rarity"],
-                    stats=item_data["stats"]
-                )
-                self.items.append(item)
-                
+        # Une ligne coupée par un arrêt brutal est terminée pour ne pas absorber la suivante
+        prefix = '' if _ends_with_newline(filename) else '\n'
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(prefix + ''.join(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n'
+                                     for record in records))
+        journal.lines += len(records)
+        
+    def _write_snapshot(self, filename: str):
+        """Réécrire le fichier de sauvegarde avec l'état complet (remplacement atomique)"""
+        journal = _SaveJournal(filename, self.max_weight)
+        records = [["max_weight", self.max_weight]]
+        for key, item in self._entries.items():
+            if item.id not in journal.definitions:
+                journal.definitions.add(item.id)
+                records.append(_definition_record(item.definition))
+            journal.keys.add(key)
+            records.append(["put", key, item.id, item.quantity, item.durability])
+            
+        temporary = filename + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+        os.replace(temporary, filename)
+        
+        journal.lines = len(records)
+        self._journal = journal
+        self._changed.clear()
+        
+    def load_inventory(self, filename: str = INVENTORY_SAVE_FILE):
+        """Charger l'inventaire en rejouant le journal ligne par ligne
+        
+        Sans journal, une sauvegarde de l'ancien format (LEGACY_INVENTORY_SAVE_FILE)
+        est chargée puis réécrite en journal ; l'ancien fichier est conservé.
+        """
+        try:
+            f = open(filename, 'r', encoding='utf-8')
         except FileNotFoundError:
-            pass  # Pas de sauvegarde existante
+            if filename == INVENTORY_SAVE_FILE and os.path.exists(LEGACY_INVENTORY_SAVE_FILE):
+                self._migrate_legacy_save(LEGACY_INVENTORY_SAVE_FILE, filename)
+            return  # Pas de sauvegarde existante
+            
+        self.clear()
+        self._next_key = 0
+        journal = _SaveJournal(filename, self.max_weight)
+        definitions: Dict[str, ItemDefinition] = {}
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Ligne vide ou écriture interrompue
+                journal.lines += 1
+                operation = record[0]
+                if operation == "put":
+                    _, key, item_id, quantity, durability = record
+                    current = self._entries.get(key)
+                    if current is not None and current.id == item_id:
+                        self._change_quantity(key, quantity - current.quantity)
+                        current.durability = durability
+                    else:
+                        if current is not None:
+                            self._discard(key)
+                        self._insert(Item(definitions[item_id], quantity, durability), key)
+                elif operation == "del":
+                    if record[1] in self._entries:
+                        self._discard(record[1])
+                elif operation == "def":
+                    definition = saved_definition(*record[1:])
+                    definitions[definition.id] = definition
+                    journal.definitions.add(definition.id)
+                elif operation == "max_weight":
+                    self.max_weight = journal.max_weight = record[1]
+                    
+        journal.keys = set(self._entries)
+        self._journal = journal
+        self._changed.clear()
+        
+    def _migrate_legacy_save(self, legacy_filename: str, filename: str):
+        """Charger une sauvegarde de l'ancien format (un exemplaire par objet) et l'écrire en journal"""
+        with open(legacy_filename, 'r', encoding='utf-8') as f:
+            save_data = json.load(f)
+        self.clear()
+        self._next_key = 0
+        self.max_weight = save_data["max_weight"]
+        for item_data in save_data["items"]:
+            self._insert(Item(saved_definition(item_data["id"], item_data["name"], item_data["description"],
+                                               item_data["item_type"], item_data["value"], item_data["weight"],
+                                               item_data["rarity"], item_data["stats"])))
+        self._write_snapshot(filename)
 
-class Shop:
-    """Système de boutique"""
+class ShopCatalog:
+    """Catalogue des objets en vente, partagé en lecture seule par toutes les boutiques"""
     
-    def __init__(self):
-        self.available_items = []
-        self.load_shop_items()
-        
-    def load_shop_items(self):
-        """Charger les objets disponibles dans la boutique"""
-        shop_items = [
-            {
-                "id": "sword_iron",
-                "name": "Épée en Fer",
-                "description": "Une épée solide en fer forgé",
-                "item_type": "weapon",
-                "value": 100,
-                "weight": 2.0,
-                "rarity": "common",
-                "stats": {"damage": 15, "durability": 100}
-            },
-            {
-                "id": "sword_steel",
-                "name": "Épée en Acier",
-                "description": "Une épée tranchante en acier",
-                "item_type": "weapon",
-                "value": 250,
-                "weight": 2.5,
-                "rarity": "uncommon",
-                "stats": {"damage": 25, "durability": 150}
-            },
-            {
-                "id": "armor_leather",
-                "name": "Armure en Cuir",
-                "description": "Une armure légère en cuir",
-                "item_type": "armor",
-                "value": 80,
-                "weight": 3.0,
-                "rarity": "common",
-                "stats": {"defense": 10, "weight": 3}
-            },
-            {
-                "id": "armor_chain",
-                "name": "Cotte de Mailles",
-                "description": "Une armure en mailles de fer",
-                "item_type": "armor",
-                "value": 200,
-                "weight": 8.0,
-                "rarity": "uncommon",
-                "stats": {"defense": 25, "weight": 8}
-            },
-            {
-                "id": "potion_health",
-                "name": "Potion de Vie",
-                "description": "Restaure 50 points de vie",
-                "item_type": "potion",
-                "value": 30,
-                "weight": 0.5,
-                "rarity": "common",
-                "stats": {"heal": 50}
-            },
-            {
-                "id": "potion_mana",
-                "name": "Potion de Mana",
-                "description": "Restaure 50 points de mana",
-                "item_type": "potion",
-                "value": 25,
-                "weight": 0.5,
-                "rarity": "common",
-                "stats": {"mana": 50}
-            },
-            {
-                "id": "potion_strength",
-                "name": "Potion de Force",
-                "description": "Augmente temporairement la force",
-                "item_type": "potion",
-                "value": 50,
-                "weight": 0.5,
-                "rarity": "uncommon",
-                "stats": {"strength": 10, "duration": 300}
-            },
-            {
-                "id": "shield_wooden",
-                "name": "Bouclier en Bois",
-                "description": "Un bouclier simple en bois",
-                "item_type": "shield",
-                "value": 40,
-                "weight": 2.0,
-                "rarity": "common",
-                "stats": {"defense": 5, "block": 15}
-            },
-            {
-                "id": "shield_iron",
-                "name": "Bouclier en Fer",
-                "description": "Un bouclier solide en fer",
-                "item_type": "shield",
-                "value": 120,
-                "weight": 4.0,
-                "rarity": "uncommon",
-                "stats": {"defense": 15, "block": 25}
-            }
-        ]
-        
-        for item_data in shop_items:
-            item = Item(
-                id=item_data["id"],
-                name=item_data["name"],
-                description=item_data["description"],
-                item_type=item_data["item_type"],
-                value=item_data["value"],
-                weight=item_data["weight"],
-                rarity=item_data["rarity"],
-                stats=item_data["stats"]
-            )
-            self.available_items.append(item)
+    def __init__(self, items: Iterable[Item]):
+        self.items: Tuple[Item, ...] = tuple(items)
+        self._by_id = MappingProxyType({item.id: item for item in self.items})
+        self._positions = {item.id: position for position, item in enumerate(self.items)}
+        self._index = ItemIndex()
+        for position, item in enumerate(self.items):
+            self._index.add(position, item)
             
+    @classmethod
+    def load(cls, filename: str = SHOP_CATALOG_FILE) -> "ShopCatalog":
+        """Charger le catalogue depuis un fichier de données"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(Item(define_item(**item_data)) for item_data in data["items"])
+        
+    def __len__(self) -> int:
+        return len(self.items)
+        
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._by_id
+        
+    def get_item(self, item_id: str) -> Optional[Item]:
+        """Obtenir un objet par son ID"""
+        return self._by_id.get(item_id)
+        
+    def get_items_by_type(self, item_type: str) -> Tuple[Item, ...]:
+        """Obtenir tous les objets d'un certain type"""
+        return tuple(self._index.items_of_type(item_type))
+        
+    def get_items_by_rarity(self, rarity: str) -> Tuple[Item, ...]:
+        """Obtenir tous les objets d'une certaine rareté"""
+        return tuple(self._index.items_of_rarity(rarity))
+        
+    def query(self, query: ItemQuery, predicate: Optional[Callable[[Item], bool]] = None) -> List[Item]:
+        """Rechercher des objets selon plusieurs critères, triés et paginés"""
+        return self._index.query(query, predicate)
+
+_shop_catalog: Optional[ShopCatalog] = None
+
+def get_shop_catalog() -> ShopCatalog:
+    """Obtenir le catalogue partagé (chargé au premier appel)"""
+    global _shop_catalog
+    if _shop_catalog is None:
+        _shop_catalog = ShopCatalog.load()
+    return _shop_catalog
+
+def reload_shop_catalog() -> ShopCatalog:
+    """Recharger le catalogue (après une modification du fichier de données)"""
+    global _shop_catalog
+    _shop_catalog = None
+    return get_shop_catalog()
+
+class _PricedItem:
+    """Objet du catalogue vu au prix d'une boutique (pour évaluer une requête)"""
+    __slots__ = ("item", "value")
+    
+    def __init__(self, item: Item, value: int):
+        self.item = item
+        self.value = value
+        
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.item, name)
+
+def _basket(lines: Iterable) -> List[Tuple[str, int]]:
+    """Normaliser les lignes d'un panier en couples (ID, quantité)"""
+    return [(line, 1) if isinstance(line, str) else (line[0], int(line[1])) for line in lines]
+
+class Shop:
+    """Boutique d'un marchand : vue sur le catalogue partagé avec son propre
+    assortiment, ses stocks et ses prix"""
+    
+    def __init__(self, item_ids: Optional[Iterable[str]] = None, stock: Optional[Dict[str, int]] = None,
+                 prices: Optional[Dict[str, int]] = None, catalog: Optional[ShopCatalog] = None,
+                 merchant: str = "boutique"):
+        self.catalog = catalog or get_shop_catalog()
+        self.merchant = merchant
+        # None : tout le catalogue est proposé
+        self.item_ids = frozenset(item_ids) if item_ids is not None else None
+        # Objets absents de stock : quantité illimitée
+        self.stock: Dict[str, int] = dict(stock or {})
+        self.prices: Dict[str, int] = dict(prices or {})
+        
+    def sells(self, item_id: str) -> bool:
+        """Vérifier si la boutique propose un objet (et s'il est en stock)"""
+        if item_id not in self.catalog:
+            return False
+        if self.item_ids is not None and item_id not in self.item_ids:
+            return False
+        return self.stock.get(item_id, 1) > 0
+        
+    @property
+    def available_items(self) -> List[Item]:
+        """Objets actuellement proposés par la boutique"""
+        return [item for item in self.catalog.items if self.sells(item.id)]
+        
+    def get_price(self, item: Item) -> int:
+        """Prix d'achat d'un objet dans cette boutique"""
+        return self.prices.get(item.id, item.value)
+        
     def buy_item(self, player_inventory: Inventory, player_gold: int, item_id: str) -> Dict[str, Any]:
         """Acheter un objet"""
         item = self.get_item(item_id)
         if not item:
             return {"success": False, "message": "Objet non trouvé"}
             
-        if player_gold < item.value:
+        price = self.get_price(item)
+        if player_gold < price:
             return {"success": False, "message": "Pas assez d'or"}
             
-        if not player_inventory.add_item(item):
+        if not player_inventory.add_item(Item(item.definition)):
             return {"success": False, "message": "Inventaire plein"}
             
+        if item_id in self.stock:
+            self.stock[item_id] -= 1
+            
         return {
             "success": True,
             "item": item,
-            "cost": item.value,
+            "cost": price,
             "message": f"Acheté: {item.name}"
         }
         
     def sell_item(self, player_inventory: Inventory, item_id: str) -> Dict[str, Any]:
         """Vendre un objet"""
-        item = player_inventory.remove_item(item_id)
+        item = player_inventory.remove_item(item_id, 1)
         if not item:
             return {"success": False, "message": "Objet non trouvé dans l'inventaire"}
             
         # Le prix de vente est la moitié du prix d'achat
-        sell_price = item.value // 2
+        sell_price = self.get_price(item) // 2
         
+        if item_id in self.stock:
+            self.stock[item_id] += 1
+            
         return {
             "success": True,
             "item": item,
@@ -267,94 +813,256 @@ class Shop:
             "message": f"Vendu: {item.name} pour {sell_price} or"
         }
         
+    def trade(self, player_inventory: Inventory, player_gold: int, buy: Iterable = (), sell: Iterable = (),
+              ledger: Optional[TradeLedger] = None) -> Dict[str, Any]:
+        """Acheter et vendre un panier d'objets en une seule opération atomique
+        
+        buy et sell contiennent des IDs ou des couples (ID, quantité). Les ventes
+        sont traitées avant les achats. Si une ligne échoue, les piles des
+        objets concernés et le stock sont remis exactement dans leur état
+        initial et l'or n'est pas modifié.
+        En cas de succès, la transaction est ajoutée au journal.
+        """
+        sells, buys = _basket(sell), _basket(buy)
+        if any(quantity <= 0 for _, quantity in sells + buys):
+            return {"success": False, "gold": player_gold, "message": "Quantité invalide"}
+            
+        gold = player_gold
+        lines: List[Tuple[str, int, int]] = []
+        item_ids = {item_id for item_id, _ in sells + buys}
+        saved_stacks = player_inventory.snapshot(item_ids)
+        saved_stock = {item_id: self.stock[item_id] for item_id in item_ids if item_id in self.stock}
+        
+        def rollback(message: str) -> Dict[str, Any]:
+            player_inventory.restore(saved_stacks)
+            self.stock.update(saved_stock)
+            return {"success": False, "gold": player_gold, "message": message}
+            
+        for item_id, quantity in sells:
+            removed = player_inventory.remove_items(item_id, quantity)
+            if removed is None:
+                return rollback(f"Objet non trouvé dans l'inventaire: {item_id}")
+            price = self.get_price(removed[0]) // 2 * quantity
+            gold += price
+            if item_id in self.stock:
+                self.stock[item_id] += quantity
+            lines.append((item_id, -quantity, price))
+            
+        for item_id, quantity in buys:
+            item = self.get_item(item_id)
+            if not item:
+                return rollback(f"Objet non trouvé: {item_id}")
+            if self.stock.get(item_id, quantity) < quantity:
+                return rollback(f"Stock insuffisant: {item.name}")
+            cost = self.get_price(item) * quantity
+            if gold < cost:
+                return rollback("Pas assez d'or")
+            if not player_inventory.add_item(Item(item.definition, quantity)):
+                return rollback("Inventaire plein")
+            gold -= cost
+            if item_id in self.stock:
+                self.stock[item_id] -= quantity
+            lines.append((item_id, quantity, cost))
+            
+        if ledger is not None and lines:
+            ledger.record(self.merchant, gold - player_gold, lines)
+        return {
+            "success": True,
+            "gold": gold,
+            "lines": lines,
+            "message": f"Échange effectué: {len(lines)} ligne(s), {gold - player_gold:+d} or"
+        }
+        
     def get_item(self, item_id: str) -> Optional[Item]:
         """Obtenir un objet par son ID"""
-        for item in self.available_items:
-            if item.id == item_id:
-                return item
-        return None
+        return self.catalog.get_item(item_id) if self.sells(item_id) else None
         
     def get_items_by_type(self, item_type: str) -> List[Item]:
         """Obtenir tous les objets d'un certain type"""
-        return [item for item in self.available_items if item.item_type == item_type]
+        return [item for item in self.catalog.get_items_by_type(item_type) if self.sells(item.id)]
         
     def get_items_by_rarity(self, rarity: str) -> List[Item]:
         """Obtenir tous les objets d'une certaine rareté"""
-        return [item for item in self.available_items if item.rarity == rarity]
+        return [item for item in self.catalog.get_items_by_rarity(rarity) if self.sells(item.id)]
+        
+    def query(self, query: ItemQuery) -> List[Item]:
+        """Rechercher parmi les objets proposés (critères de valeur et tri sur les prix de la boutique)
+        
+        Les objets au prix du catalogue sont servis par l'index jusqu'à la fin
+        de la page ; ceux dont le prix est modifié sont évalués à ce prix, puis
+        les deux listes sont fusionnées dans l'ordre du tri.
+        """
+        repriced = [item_id for item_id in self.prices if self.sells(item_id)]
+        if not repriced:
+            return self.catalog.query(query, lambda item: self.sells(item.id))
+        if query.limit is not None and query.limit <= 0:
+            return []
+        excluded = frozenset(repriced)
+        stop = None if query.limit is None else query.offset + query.limit
+        head = self.catalog.query(replace(query, offset=0, limit=stop),
+                                  lambda item: item.id not in excluded and self.sells(item.id))
+        sort_key = SORT_KEYS[query.sort_by]
+        positions = self.catalog._positions
+        rows = [(sort_key(item), positions[item.id], item) for item in head]
+        for item_id in repriced:
+            item = self.catalog.get_item(item_id)
+            priced = _PricedItem(item, self.prices[item_id])
+            if query.matches(priced):
+                rows.append((sort_key(priced), positions[item_id], item))
+        rows.sort(key=lambda row: row[:2], reverse=query.descending)
+        return [row[2] for row in rows[query.offset:stop]]
+
+# Tables de la fabrique d'objets
+WEAPON_BASE_DAMAGE = {"sword": 10, "axe": 15, "mace": 12, "dagger": 8}
+MATERIAL_MULTIPLIER = {"wood": 0.5, "iron": 1.0, "steel": 1.5, "magic": 2.0}
+POTION_DATA = {
+    "health": {"name": "Potion de Vie", "stat": "heal", "base_value": 20},
+    "mana": {"name": "Potion de Mana", "stat": "mana", "base_value": 15},
+    "strength": {"name": "Potion de Force", "stat": "strength", "base_value": 5},
+    "speed": {"name": "Potion de Vitesse", "stat": "speed", "base_value": 3}
+}
+MATERIAL_DATA = {
+    "iron": {"name": "Minerai de Fer", "value": 5},
+    "gold": {"name": "Minerai d'Or", "value": 15},
+    "wood": {"name": "Bois", "value": 2},
+    "leather": {"name": "Cuir", "value": 3},
+    "cloth": {"name": "Tissu", "value": 1}
+}
+
+# Nombre maximal de définitions générées gardées en cache par type d'objet
+FACTORY_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=FACTORY_CACHE_SIZE)
+def _weapon_definition(weapon_type: str, material: str, level: int) -> ItemDefinition:
+    """Définition d'une arme (mise en cache par arguments)"""
+    damage = int(WEAPON_BASE_DAMAGE.get(weapon_type, 10) * MATERIAL_MULTIPLIER.get(material, 1.0) * level)
+    value = damage * 5
+    
+    return define_item(
+        id=f"{weapon_type}_{material}_{level}",
+        name=f"{weapon_type.title()} en {material.title()}",
+        description=f"Une {weapon_type} en {material} de niveau {level}",
+        item_type="weapon",
+        value=value,
+        weight=2.0,
+        rarity="common",
+        stats={"damage": damage, "level": level}
+    )
+
+@lru_cache(maxsize=FACTORY_CACHE_SIZE)
+def _potion_definition(potion_type: str, power: int) -> Optional[ItemDefinition]:
+    """Définition d'une potion (mise en cache par arguments)"""
+    if potion_type not in POTION_DATA:
+        return None
+        
+    data = POTION_DATA[potion_type]
+    stat_value = data["base_value"] * power
+    
+    return define_item(
+        id=f"potion_{potion_type}_{power}",
+        name=data["name"],
+        description=f"Restaure {stat_value} points de {potion_type}",
+        item_type="potion",
+        value=stat_value * 2,
+        weight=0.5,
+        rarity="common",
+        stats={data["stat"]: stat_value}
+    )
+
+@lru_cache(maxsize=FACTORY_CACHE_SIZE)
+def _material_definition(material_type: str) -> Optional[ItemDefinition]:
+    """Définition d'un matériau (mise en cache par type)"""
+    if material_type not in MATERIAL_DATA:
+        return None
+        
+    data = MATERIAL_DATA[material_type]
+    
+    # Une seule définition par matériau : la quantité est portée par la pile
+    return define_item(
+        id=f"material_{material_type}",
+        name=data["name"],
+        description=f"Une unité de {data['name'].lower()}",
+        item_type="material",
+        value=data["value"],
+        weight=0.1,
+        rarity="common"
+    )
 
 class ItemFactory:
-    """Fabrique d'objets pour créer des objets dynamiquement"""
+    """Fabrique d'objets pour créer des objets dynamiquement
+    
+    Les définitions générées sont mises en cache (LRU) : seuls les exemplaires
+    sont créés à chaque appel.
+    """
     
     @staticmethod
     def create_weapon(weapon_type: str, material: str, level: int = 1) -> Item:
         """Créer une arme"""
-        base_damage = {"sword": 10, "axe": 15, "mace": 12, "dagger": 8}
-        material_multiplier = {"wood": 0.5, "iron": 1.0, "steel": 1.5, "magic": 2.0}
-        
-        damage = int(base_damage.get(weapon_type, 10) * material_multiplier.get(material, 1.0) * level)
-        value = damage * 5
-        
-        return Item(
-            id=f"{weapon_type}_{material}_{level}",
-            name=f"{weapon_type.title()} en {material.title()}",
-            description=f"Une {weapon_type} en {material} de niveau {level}",
-            item_type="weapon",
-            value=value,
-            weight=2.0,
-            rarity="common",
-            stats={"damage": damage, "level": level}
-        )
+        return Item(_weapon_definition(weapon_type, material, level))
         
     @staticmethod
     def create_potion(potion_type: str, power: int = 1) -> Item | None:
         """Créer une potion"""
-        potion_data = {
-            "health": {"name": "Potion de Vie", "stat": "heal", "base_value": 20},
-            "mana": {"name": "Potion de Mana", "stat": "mana", "base_value": 15},
-            "strength": {"name": "Potion de Force", "stat": "strength", "base_value": 5},
-            "speed": {"name": "Potion de Vitesse", "stat": "speed", "base_value": 3}
-        }
-        
-        if potion_type not in potion_data:
+        definition = _potion_definition(potion_type, power)
+        if definition is None:
             return None
-            
-        data = potion_data[potion_type]
-        stat_value = data["base_value"] * power
-        
-        return Item(
-            id=f"potion_{potion_type}_{power}",
-            name=data["name"],
-            description=f"Restaure {stat_value} points de {potion_type}",
-            item_type="potion",
-            value=stat_value * 2,
-            weight=0.5,
-            rarity="common",
-            stats={data["stat"]: stat_value}
-        )
+        return Item(definition)
         
     @staticmethod
     def create_material(material_type: str, quantity: int = 1) -> Item | None:
         """Créer un matériau"""
-        material_data = {
-            "iron": {"name": "Minerai de Fer", "value": 5},
-            "gold": {"name": "Minerai d'Or", "value": 15},
-            "wood": {"name": "Bois", "value": 2},
-            "leather": {"name": "Cuir", "value": 3},
-            "cloth": {"name": "Tissu", "value": 1}
-        }
-        
-        if material_type not in material_data:
+        definition = _material_definition(material_type)
+        if definition is None:
             return None
-            
-        data = material_data[material_type]
-        
-        return Item(
-            id=f"material_{material_type}_{quantity}",
-            name=f"{data['name']} x{quantity}",
-            description=f"{quantity} unité(s) de {data['name'].lower()}",
-            item_type="material",
-            value=data["value"] * quantity,
-            weight=0.1 * quantity,
-            rarity="common",
-            stats={"quantity": quantity}
-        ) 
\ No newline at end of file
+        return Item(definition, quantity)
+        
+    @staticmethod
+    def create_weapons(specs: Iterable[Tuple[str, str, int]]) -> List[Item]:
+        """Créer une arme par triplet (type, matériau, niveau), en une passe
+        
+        Les triplets peuvent être des tuples, des listes ou des lignes de
+        tableau ; le cache de la fabrique partage les définitions identiques.
+        """
+        return [Item(_weapon_definition(str(weapon_type), str(material), int(level)))
+                for weapon_type, material, level in specs]
+                
+    @staticmethod
+    def create_potions(specs: Iterable[Tuple[str, int]]) -> List[Item | None]:
+        """Créer une potion par couple (type, puissance), en une passe"""
+        items = []
+        for potion_type, power in specs:
+            definition = _potion_definition(str(potion_type), int(power))
+            items.append(Item(definition) if definition is not None else None)
+        return items
+        
+    @staticmethod
+    def create_materials(specs: Iterable[Tuple[str, int]]) -> List[Item | None]:
+        """Créer un matériau par couple (type, quantité), en une passe"""
+        items = []
+        for material_type, quantity in specs:
+            definition = _material_definition(str(material_type))
+            items.append(Item(definition, int(quantity)) if definition is not None else None)
+        return items
+        
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, int]]:
+        """Statistiques du cache de définitions (succès, échecs, taille)"""
+        stats = {}
+        for name, builder in (("weapons", _weapon_definition),
+                              ("potions", _potion_definition),
+                              ("materials", _material_definition)):
+            info = builder.cache_info()
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "size": info.currsize,
+                "max_size": info.maxsize
+            }
+        return stats
+        
+    @staticmethod
+    def clear_cache():
+        """Vider le cache de définitions"""
+        _weapon_definition.cache_clear()
+        _potion_definition.cache_clear()
+        _material_definition.cache_clear()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Requêtes multi-critères sur les objets (boutique, inventaire) servies par
+des index secondaires triés, avec pagination
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+def _value_per_weight(item) -> float:
+    return item.value / item.weight if item.weight else math.inf
+
+# Ordres de tri disponibles (valeurs unitaires)
+SORT_KEYS: Dict[str, Callable[[Any], Any]] = {
+    "value": lambda item: item.value,
+    "weight": lambda item: item.weight,
+    "value_per_weight": _value_per_weight,
+    "name": lambda item: item.name,
+}
+
+# En dessous de 1/SELECTIVE_RATIO de la collection, les candidats sont triés
+# directement au lieu de parcourir l'index de tri
+SELECTIVE_RATIO = 8
+
+@dataclass
+class ItemQuery:
+    """Critères, ordre de tri et page d'une requête"""
+    item_type: Optional[str] = None
+    rarity: Optional[str] = None
+    min_value: Optional[int] = None
+    max_value: Optional[int] = None
+    min_stats: Dict[str, int] = field(default_factory=dict)  # ex. {"damage": 20}
+    sort_by: str = "value"
+    descending: bool = False
+    offset: int = 0
+    limit: Optional[int] = None
+    
+    def matches(self, item) -> bool:
+        """Vérifier qu'un objet satisfait tous les critères"""
+        if self.item_type is not None and item.item_type != self.item_type:
+            return False
+        if self.rarity is not None and item.rarity != self.rarity:
+            return False
+        if self.min_value is not None and item.value < self.min_value:
+            return False
+        if self.max_value is not None and item.value > self.max_value:
+            return False
+        stats = item.stats
+        for stat, threshold in self.min_stats.items():
+            if stats.get(stat, -math.inf) < threshold:
+                return False
+        return True
+
+class ItemIndex:
+    """Index d'une collection d'objets rangés sous des clés entières uniques
+    
+    Les objets sont indexés par type et rareté (dans l'ordre d'ajout) en O(1).
+    Les vues triées (par ordre de SORT_KEYS et par statistique) sont
+    construites à la première requête qui en a besoin ; ensuite, les ajouts et
+    retraits sont notés en O(1) et fusionnés dans les vues existantes à la
+    requête suivante. Les attributs indexés ne doivent pas changer tant que
+    l'objet est dans l'index.
+    """
+    
+    def __init__(self):
+        self._items: Dict[int, Any] = {}
+        self._by_type: Dict[str, Dict[int, Any]] = {}
+        self._by_rarity: Dict[str, Dict[int, Any]] = {}
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {}  # Vues construites, par ordre de tri
+        self._stats: Dict[str, List[Tuple[Any, int]]] = {}  # Vues construites, par statistique
+        self._added: Set[int] = set()  # Clés pas encore fusionnées dans les vues
+        self._removed: Set[int] = set()  # Clés à retirer des vues
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def add(self, key: int, item):
+        """Indexer un objet"""
+        self._items[key] = item
+        self._by_type.setdefault(item.item_type, {})[key] = item
+        self._by_rarity.setdefault(item.rarity, {})[key] = item
+        if self._sorted or self._stats:
+            self._added.add(key)
+    
+    def remove(self, key: int):
+        """Retirer un objet de l'index"""
+        item = self._items.pop(key)
+        for index, value in ((self._by_type, item.item_type), (self._by_rarity, item.rarity)):
+            bucket = index[value]
+            del bucket[key]
+            if not bucket:
+                del index[value]
+        if self._sorted or self._stats:
+            self._added.discard(key)
+            self._removed.add(key)
+    
+    def clear(self):
+        """Vider l'index"""
+        self._items.clear()
+        self._by_type.clear()
+        self._by_rarity.clear()
+        self._sorted.clear()
+        self._stats.clear()
+        self._added.clear()
+        self._removed.clear()
+    
+    def _refresh(self):
+        """Fusionner les ajouts et retraits en attente dans les vues construites"""
+        if not self._added and not self._removed:
+            return
+        removed, added = self._removed, [(key, self._items[key]) for key in self._added]
+        for name, entries in self._sorted.items():
+            sort_key = SORT_KEYS[name]
+            if removed:
+                entries[:] = [entry for entry in entries if entry[1] not in removed]
+            entries.extend((sort_key(item), key) for key, item in added)
+            entries.sort()  # Une suite déjà triée suivie des ajouts : fusion en O(n + k log k)
+        for stat, entries in self._stats.items():
+            if removed:
+                entries[:] = [entry for entry in entries if entry[1] not in removed]
+            entries.extend((item.stats[stat], key) for key, item in added if stat in item.stats)
+            entries.sort()
+        self._added.clear()
+        self._removed.clear()
+    
+    def _sorted_view(self, name: str) -> List[Tuple[Any, int]]:
+        """Entrées (valeur, clé) triées selon un ordre de SORT_KEYS"""
+        self._refresh()
+        entries = self._sorted.get(name)
+        if entries is None:
+            sort_key = SORT_KEYS[name]
+            entries = self._sorted[name] = sorted((sort_key(item), key) for key, item in self._items.items())
+        return entries
+    
+    def _stat_view(self, stat: str) -> List[Tuple[Any, int]]:
+        """Entrées (valeur, clé) triées des objets ayant une statistique"""
+        self._refresh()
+        entries = self._stats.get(stat)
+        if entries is None:
+            entries = self._stats[stat] = sorted((item.stats[stat], key) for key, item in self._items.items()
+                                                 if stat in item.stats)
+        return entries
+    
+    def items_of_type(self, item_type: str) -> List:
+        """Objets d'un type, dans l'ordre d'ajout"""
+        return list(self._by_type.get(item_type, {}).values())
+    
+    def items_of_rarity(self, rarity: str) -> List:
+        """Objets d'une rareté, dans l'ordre d'ajout"""
+        return list(self._by_rarity.get(rarity, {}).values())
+    
+    @staticmethod
+    def _range(entries: List[Tuple[Any, int]], low=None, high=None) -> Tuple[int, int]:
+        """Bornes [début, fin) des entrées dont la valeur est dans [low, high]"""
+        start = bisect_left(entries, (low, -1)) if low is not None else 0
+        end = bisect_right(entries, (high, math.inf)) if high is not None else len(entries)
+        return start, max(start, end)
+    
+    def _smallest_candidates(self, query: ItemQuery):
+        """Source de candidats la plus sélective : (taille, générateur de clés)"""
+        sources = []
+        if query.item_type is not None:
+            bucket = self._by_type.get(query.item_type, {})
+            sources.append((len(bucket), lambda bucket=bucket: bucket.keys()))
+        if query.rarity is not None:
+            bucket = self._by_rarity.get(query.rarity, {})
+            sources.append((len(bucket), lambda bucket=bucket: bucket.keys()))
+        if query.min_value is not None or query.max_value is not None:
+            entries = self._sorted_view("value")
+            start, end = self._range(entries, query.min_value, query.max_value)
+            sources.append((end - start, lambda e=entries, s=start, f=end: (key for _, key in e[s:f])))
+        for stat, threshold in query.min_stats.items():
+            entries = self._stat_view(stat)
+            start, end = self._range(entries, threshold)
+            sources.append((end - start, lambda e=entries, s=start, f=end: (key for _, key in e[s:f])))
+        return min(sources, key=lambda source: source[0]) if sources else None
+    
+    def query(self, query: ItemQuery, predicate: Optional[Callable[[Any], bool]] = None) -> List:
+        """Objets satisfaisant la requête, triés et paginés
+        
+        Si un critère est très sélectif, ses candidats sont filtrés puis triés ;
+        sinon l'index de tri est parcouru dans l'ordre et le parcours s'arrête
+        dès que la page est remplie.
+        """
+        if query.sort_by not in SORT_KEYS:
+            raise ValueError(f"Ordre de tri inconnu: {query.sort_by}")
+        if query.limit is not None and query.limit <= 0:
+            return []
+        
+        def accept(item) -> bool:
+            return query.matches(item) and (predicate is None or predicate(item))
+        
+        stop = None if query.limit is None else query.offset + query.limit
+        candidates = self._smallest_candidates(query)
+        
+        if candidates is not None and candidates[0] * SELECTIVE_RATIO < len(self._items):
+            sort_key = SORT_KEYS[query.sort_by]
+            rows = [(sort_key(item), key, item)
+                    for key, item in ((key, self._items[key]) for key in candidates[1]())
+                    if accept(item)]
+            rows.sort(key=lambda row: row[:2], reverse=query.descending)
+            return [row[2] for row in rows[query.offset:stop]]
+        
+        entries = self._sorted_view(query.sort_by)
+        start, end = 0, len(entries)
+        if query.sort_by == "value":
+            start, end = self._range(entries, query.min_value, query.max_value)
+        positions = range(end - 1, start - 1, -1) if query.descending else range(start, end)
+        
+        page = []
+        skipped = 0
+        for position in positions:
+            item = self._items[entries[position][1]]
+            if not accept(item):
+                continue
+            if skipped < query.offset:
+                skipped += 1
+                continue
+            page.append(item)
+            if len(page) == query.limit:
+                break
+        return page
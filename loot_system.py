@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Système de butin : tables pondérées par rareté, tables imbriquées et
+progression selon le niveau, échantillonnées par la méthode des alias
+"""
+
+import json
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from inventory_system import (FACTORY_CACHE_SIZE, Item, ItemDefinition, ItemFactory,
+                              define_item, get_shop_catalog)
+
+LOOT_TABLES_FILE = "loot_tables.json"
+
+@dataclass(frozen=True)
+class LootEntry:
+    """Entrée d'une table de butin"""
+    kind: str  # gold, weapon, potion, material, catalog, table, nothing
+    args: Tuple = ()
+    rarity: str = "common"
+    weight: float = 1.0
+    min_level: int = 1
+
+@dataclass
+class LootResult:
+    """Résultat d'un ou plusieurs tirages"""
+    gold: int = 0
+    items: List[Item] = field(default_factory=list)
+
+@lru_cache(maxsize=FACTORY_CACHE_SIZE)
+def with_rarity(definition: ItemDefinition, rarity: str) -> ItemDefinition:
+    """Définition d'un objet portant la rareté de l'entrée de butin qui l'a produit
+    
+    Une rareté différente de celle de la définition de base donne une
+    définition distincte, internée sous l'ID suffixé par la rareté.
+    """
+    if definition.rarity == rarity:
+        return definition
+    return define_item(f"{definition.id}_{rarity}", definition.name, definition.description,
+                       definition.item_type, definition.value, definition.weight, rarity,
+                       dict(definition.stats), definition.max_stack)
+
+def _stamp_rarity(items: Iterable[Optional[Item]], rarity: str) -> List[Item]:
+    """Donner aux objets tirés la rareté de leur entrée (objets absents ignorés)"""
+    stamped = []
+    for item in items:
+        if item is None:
+            continue
+        if item.rarity != rarity:
+            item.definition = with_rarity(item.definition, rarity)
+        stamped.append(item)
+    return stamped
+
+class AliasTable:
+    """Table des alias de Vose : tirage pondéré en O(1)"""
+    
+    __slots__ = ("probability", "alias", "probability_array", "alias_array", "size")
+    
+    def __init__(self, weights: List[float]):
+        size = len(weights)
+        total = float(sum(weights))
+        if size == 0 or total <= 0:
+            raise ValueError("Une table de butin doit avoir au moins une entrée de poids positif")
+        
+        scaled = [weight * size / total for weight in weights]
+        probability = [0.0] * size
+        alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        for i in small + large:
+            probability[i] = 1.0
+        
+        self.probability = probability
+        self.alias = alias
+        self.probability_array = np.array(probability, dtype=np.float64)
+        self.alias_array = np.array(alias, dtype=np.int64)
+        self.size = size
+    
+    def draw(self, rng: random.Random) -> int:
+        """Tirer un indice"""
+        u = rng.random() * self.size
+        index = int(u)
+        return index if u - index < self.probability[index] else self.alias[index]
+    
+    def draw_many(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Tirer count indices d'un coup"""
+        index = rng.integers(0, self.size, count)
+        accept = rng.random(count) < self.probability_array[index]
+        return np.where(accept, index, self.alias_array[index])
+
+def _parse_entry(data: Dict[str, Any]) -> LootEntry:
+    """Construire une entrée à partir de sa description JSON"""
+    for kind in ("gold", "weapon", "potion", "material", "catalog", "table"):
+        if kind in data:
+            args = data[kind]
+            args = tuple(args) if isinstance(args, list) else (args,)
+            break
+    else:
+        kind, args = "nothing", ()
+    
+    rarity = data.get("rarity")
+    if rarity is None and kind == "catalog":
+        catalog_item = get_shop_catalog().get_item(args[0])
+        rarity = catalog_item.rarity if catalog_item else "common"
+    return LootEntry(kind, args, rarity or "common", data.get("weight", 1.0), data.get("min_level", 1))
+
+class LootSystem:
+    """Tables de butin compilées en tables d'alias, par niveau"""
+    
+    def __init__(self, filename: str = LOOT_TABLES_FILE, seed: Optional[int] = None):
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self.rarity_weights = data["rarity_weights"]
+        self.rarity_level_bonus = data.get("rarity_level_bonus", {})
+        self.gold_level_bonus = data.get("gold_level_bonus", 0.0)
+        self.max_level = data.get("max_level", 50)
+        self.tables: Dict[str, List[LootEntry]] = {
+            name: [_parse_entry(entry) for entry in entries]
+            for name, entries in data["tables"].items()
+        }
+        self._check_references()
+        
+        self._compiled: Dict[Tuple[str, int], Optional[AliasTable]] = {}
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+    
+    def _check_references(self):
+        """Vérifier que les tables imbriquées existent et ne forment pas de cycle"""
+        visiting, done = set(), set()
+        
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle dans les tables de butin: {name}")
+            visiting.add(name)
+            for entry in self.tables[name]:
+                if entry.kind == "table":
+                    if entry.args[0] not in self.tables:
+                        raise ValueError(f"Table de butin inconnue: {entry.args[0]}")
+                    visit(entry.args[0])
+            visiting.discard(name)
+            done.add(name)
+        
+        for name in self.tables:
+            visit(name)
+    
+    def entry_weight(self, entry: LootEntry, level: int) -> float:
+        """Poids effectif d'une entrée à un niveau donné"""
+        if level < entry.min_level:
+            return 0.0
+        bonus = self.rarity_level_bonus.get(entry.rarity, 0.0)
+        return entry.weight * self.rarity_weights.get(entry.rarity, 1) * (1 + bonus * (level - 1))
+    
+    def compiled(self, table: str, level: int) -> Optional[AliasTable]:
+        """Table d'alias d'une table de butin pour un niveau (compilée une fois)
+        
+        None si aucune entrée n'est accessible à ce niveau (butin vide).
+        """
+        level = max(1, min(level, self.max_level))
+        key = (table, level)
+        if key not in self._compiled:
+            weights = [self.entry_weight(entry, level) for entry in self.tables[table]]
+            self._compiled[key] = AliasTable(weights) if any(weight > 0 for weight in weights) else None
+        return self._compiled[key]
+    
+    def _gold_range(self, entry: LootEntry, level: int) -> Tuple[int, int]:
+        """Bornes de la quantité d'or selon le niveau (plafonné à max_level comme les tables)"""
+        level = max(1, min(level, self.max_level))
+        scale = 1 + self.gold_level_bonus * (level - 1)
+        return int(entry.args[0] * scale), int(entry.args[1] * scale)
+    
+    def _create_item(self, entry: LootEntry, level: int, rng: random.Random) -> Optional[Item]:
+        """Créer l'objet décrit par une entrée (avec la rareté de l'entrée)"""
+        item = None
+        if entry.kind == "weapon":
+            item = ItemFactory.create_weapon(entry.args[0], entry.args[1], max(1, min(level, self.max_level)))
+        elif entry.kind == "potion":
+            item = ItemFactory.create_potion(*entry.args)
+        elif entry.kind == "material":
+            low, high = entry.args[1]
+            item = ItemFactory.create_material(entry.args[0], rng.randint(low, high))
+        elif entry.kind == "catalog":
+            catalog_item = get_shop_catalog().get_item(entry.args[0])
+            item = Item(catalog_item.definition) if catalog_item else None
+        if item is not None and item.rarity != entry.rarity:
+            item.definition = with_rarity(item.definition, entry.rarity)
+        return item
+    
+    def roll(self, table: str, level: int = 1, result: Optional[LootResult] = None) -> LootResult:
+        """Effectuer un tirage (O(1) par niveau d'imbrication)"""
+        if result is None:
+            result = LootResult()
+        alias_table = self.compiled(table, level)
+        if alias_table is None:
+            return result
+        entry = self.tables[table][alias_table.draw(self.rng)]
+        
+        if entry.kind == "table":
+            return self.roll(entry.args[0], level, result)
+        if entry.kind == "gold":
+            low, high = self._gold_range(entry, level)
+            result.gold += self.rng.randint(low, high)
+        elif entry.kind != "nothing":
+            item = self._create_item(entry, level, self.rng)
+            if item is not None:
+                result.items.append(item)
+        return result
+    
+    def roll_many(self, table: str, count: int, level: int = 1, result: Optional[LootResult] = None) -> LootResult:
+        """Effectuer count tirages d'un coup (victoires de masse)"""
+        if result is None:
+            result = LootResult()
+        if count <= 0:
+            return result
+        
+        alias_table = self.compiled(table, level)
+        if alias_table is None:
+            return result
+        entries = self.tables[table]
+        indices = alias_table.draw_many(self.np_rng, count)
+        counts = np.bincount(indices, minlength=len(entries))
+        
+        for index in np.flatnonzero(counts):
+            entry = entries[index]
+            hits = int(counts[index])
+            if entry.kind == "table":
+                self.roll_many(entry.args[0], hits, level, result)
+            elif entry.kind == "gold":
+                low, high = self._gold_range(entry, level)
+                result.gold += int(self.np_rng.integers(low, high + 1, hits).sum())
+            elif entry.kind == "weapon":
+                level_arg = max(1, min(level, self.max_level))
+                weapons = ItemFactory.create_weapons([(entry.args[0], entry.args[1], level_arg)] * hits)
+                result.items.extend(_stamp_rarity(weapons, entry.rarity))
+            elif entry.kind == "potion":
+                potions = ItemFactory.create_potions([tuple(entry.args)] * hits)
+                result.items.extend(_stamp_rarity(potions, entry.rarity))
+            elif entry.kind == "material":
+                low, high = entry.args[1]
+                quantities = self.np_rng.integers(low, high + 1, hits)
+                materials = ItemFactory.create_materials(
+                    (entry.args[0], int(quantity)) for quantity in quantities)
+                result.items.extend(_stamp_rarity(materials, entry.rarity))
+            elif entry.kind == "catalog":
+                catalog_item = get_shop_catalog().get_item(entry.args[0])
+                if catalog_item:
+                    definition = with_rarity(catalog_item.definition, entry.rarity)
+                    result.items.extend(Item(definition) for _ in range(hits))
+        return result
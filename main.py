@@ -11,6 +11,16 @@ import random
 from pathlib import Path
 from ursina import *
 from ursina.prefabs.first_person_controller import FirstPersonController
+from equipment_system import Equipment
+from inventory_system import Inventory, ItemFactory, Shop
+from loot_system import LootSystem
+from quest_system import QuestSystem
+from stats import GameStats
+from trade_ledger import TradeLedger
+from trigger_system import ENTER, TriggerSystem
+
+# Expérience nécessaire pour chaque niveau
+EXP_PER_LEVEL = 100
 
 class RPGGame(Ursina):
     def __init__(self):
@@ -36,9 +46,21 @@ class RPGGame(Ursina):
         self.player_level = 1
         self.player_exp = 0
         self.player_gold = 50
-        self.inventory = []
+        self.inventory = Inventory()  # Objets portés (sauvegardés dans le journal d'inventaire)
         self.quests = []
         self.current_quest = None
+        self.game_over_text = None  # Affiché tant que le joueur est mort
+        self.loot = LootSystem()
+        # Dégâts à mains nues ; une arme s'y ajoute (armé, le joueur abat un gobelin d'un coup)
+        self.equipment = Equipment(base_stats={"damage": 20})
+        self.quest_system = QuestSystem(player_level=self.player_level)
+        self.accept_quests(quest.id for quest in self.quest_system.get_available_quests())
+        self.triggers = TriggerSystem()
+        self.stats = GameStats()
+        self.stats.update_session_count()
+        self.shop = Shop(merchant="marchand")
+        self.trade_ledger = TradeLedger()
+        self.keys_down = set()
         
         # Création du monde
         self.create_world()
@@ -121,6 +143,7 @@ class RPGGame(Ursina):
             color=color.blue,
             collider='cylinder'
         )
+        self.triggers.add_sphere("fountain", self.fountain.position, 8)
         
     def create_dungeon(self):
         """Création du donjon"""
@@ -134,6 +157,8 @@ class RPGGame(Ursina):
             collider='box'
         )
         
+        self.triggers.add_box("dungeon", self.dungeon_entrance.position, (8, 6, 8))
+        
         # Porte du donjon
         self.dungeon_door = Entity(
             model='cube',
@@ -221,6 +246,7 @@ class RPGGame(Ursina):
             color=color.green,
             collider='sphere'
         )
+        self.triggers.add_sphere("merchant", self.merchant.position, 3)
         
         # Garde
         self.guard = Entity(
@@ -256,6 +282,8 @@ class RPGGame(Ursina):
             goblin.health = 30
             goblin.damage = 10
             goblin.speed = 2
+            goblin.loot_table = "goblin"
+            goblin.enemy_type = "goblin"
             self.enemies.append(goblin)
         
         # Trolls
@@ -270,37 +298,39 @@ class RPGGame(Ursina):
             troll.health = 80
             troll.damage = 25
             troll.speed = 1
+            troll.loot_table = "troll"
+            troll.enemy_type = "troll"
             self.enemies.append(troll)
             
     def create_items(self):
-        """Création des objets"""
+        """Création des objets : 10 potions de vie (+20 PV) et 3 épées (15 dégâts)"""
         self.items = []
         
-        # Potions de vie
-        for i in range(10):
-            potion = Entity(
-                model='sphere',
-                position=(random.randint(-40, 40), 0.5, random.randint(-40, 40)),
-                scale=(0.2, 0.2, 0.2),
-                color=color.pink,
-                collider='sphere'
-            )
-            potion.type = "potion"
-            potion.value = 20
-            self.items.append(potion)
-        
-        # Épées
-        for i in range(3):
-            sword = Entity(
-                model='cube',
-                position=(random.randint(-40, 40), 0.5, random.randint(-40, 40)),
-                scale=(0.1, 0.5, 0.1),
-                color=color.gray,
-                collider='box'
-            )
-            sword.type = "weapon"
-            sword.damage = 15
-            self.items.append(sword)
+        pickups = ItemFactory.create_potions([("health", 1)] * 10)
+        pickups += ItemFactory.create_weapons([("sword", "steel", 1)] * 3)
+        for item in pickups:
+            position = (random.randint(-40, 40), 0.5, random.randint(-40, 40))
+            if item.item_type == "weapon":
+                # Épées
+                pickup = Entity(
+                    model='cube',
+                    position=position,
+                    scale=(0.1, 0.5, 0.1),
+                    color=color.gray,
+                    collider='box'
+                )
+            else:
+                # Potions et autres objets
+                pickup = Entity(
+                    model='sphere',
+                    position=position,
+                    scale=(0.2, 0.2, 0.2),
+                    color=color.pink,
+                    collider='sphere'
+                )
+            pickup.type = item.item_type
+            pickup.item = item
+            self.items.append(pickup)
             
     def show_menu(self):
         """Afficher le menu principal"""
@@ -322,12 +352,13 @@ class RPGGame(Ursina):
             'player_level': self.player_level,
             'player_exp': self.player_exp,
             'player_gold': self.player_gold,
-            'inventory': self.inventory,
             'position': [self.player.position.x, self.player.position.y, self.player.position.z]
         }
         
         with open('save_game.json', 'w') as f:
             json.dump(save_data, f)
+        self.inventory.save_inventory()
+        self.stats.add_save()
             
     def load_game(self):
         """Charger le jeu"""
@@ -337,9 +368,10 @@ class RPGGame(Ursina):
                 
             self.player_health = save_data['player_health']
             self.player_level = save_data['player_level']
+            self.accept_quests(self.quest_system.set_player_level(self.player_level))
             self.player_exp = save_data['player_exp']
             self.player_gold = save_data['player_gold']
-            self.inventory = save_data['inventory']
+            self.inventory.load_inventory()
             
             # Position du joueur
             pos = save_data['position']
@@ -369,20 +401,37 @@ class RPGGame(Ursina):
             if distance(self.player.position, item.position) < 1:
                 self.pickup_item(item)
                 
+    def update_triggers(self):
+        """Mettre à jour les zones occupées par le joueur et les ennemis"""
+        for event in self.triggers.update("player", self.player.position):
+            if event.kind == ENTER:
+                self.complete_quests(self.quest_system.notify("reach", event.trigger))
+        for enemy in self.enemies:
+            self.triggers.update(enemy, enemy.position)
+                
     def combat(self, enemy):
         """Système de combat"""
         # Attaque du joueur
-        enemy.health -= 20
+        enemy.health -= self.equipment.stats["damage"]
         
         # Attaque de l'ennemi
-        self.player_health -= enemy.damage
+        self.player_health -= self.equipment.damage_taken(enemy.damage)
         
         # Vérifier si l'ennemi est mort
         if enemy.health <= 0:
+            zone = self.triggers.zone_of(enemy)
+            self.triggers.forget(enemy)
             self.enemies.remove(enemy)
             destroy(enemy)
-            self.player_exp += 50
-            self.player_gold += random.randint(10, 30)
+            self.gain_experience(50)
+            loot = self.loot.roll(enemy.loot_table, self.player_level)
+            self.player_gold += loot.gold
+            self.stats.add_enemy_defeated(f"{enemy.enemy_type}s")
+            self.stats.add_gold_earned(loot.gold)
+            for item in loot.items:
+                if self.store_item(item):
+                    self.accept_quests(self.quest_system.item_acquired(item.id, item.quantity))
+            self.complete_quests(self.quest_system.notify("kill", enemy.enemy_type, zone=zone))
             
         # Vérifier si le joueur est mort
         if self.player_health <= 0:
@@ -391,19 +440,77 @@ class RPGGame(Ursina):
         self.update_ui()
         
     def pickup_item(self, item):
-        """Ramasser un objet"""
+        """Ramasser un objet (item.item : l'objet tiré de la table de butin)"""
         if item.type == "potion":
-            self.player_health = min(self.player_max_health, self.player_health + item.value)
+            effects = self.equipment.use_potion(item.item)
+            self.player_health = min(self.player_max_health, self.player_health + effects.get("heal", 0))
         elif item.type == "weapon":
-            self.inventory.append(item)
+            # Équiper l'arme ramassée si l'emplacement est vide ou si elle est meilleure
+            current = self.equipment.slots.get("weapon")
+            if current is None or item.item.stats.get("damage", 0) > current.stats.get("damage", 0):
+                if current is not None and not self.store_item(current):
+                    return  # L'ancienne arme ne rentre pas : l'objet reste au sol
+                self.equipment.equip(item.item)
+            elif not self.store_item(item.item):
+                return
+        elif not self.store_item(item.item):
+            return
             
+        self.complete_quests(self.quest_system.notify("collect", item.type))
         self.items.remove(item)
         destroy(item)
         self.update_ui()
         
+    def complete_quests(self, quest_ids):
+        """Terminer les quêtes dont les objectifs viennent d'être atteints"""
+        for quest_id in quest_ids:
+            result = self.quest_system.complete_quest(quest_id)
+            if result:
+                self.player_gold += result["rewards"].get("gold", 0)
+                self.stats.add_quest_completed(result["quest"].title)
+                self.stats.add_gold_earned(result["rewards"].get("gold", 0))
+                self.accept_quests(result["unlocked"])
+                self.gain_experience(result["rewards"].get("exp", 0))
+                
+    def gain_experience(self, amount):
+        """Ajouter de l'expérience et passer les niveaux atteints"""
+        self.player_exp += amount
+        self.stats.add_experience(amount)
+        level = 1 + self.player_exp // EXP_PER_LEVEL
+        if level <= self.player_level:
+            return
+        for _ in range(level - self.player_level):
+            self.stats.add_level()
+        self.player_level = level
+        self.accept_quests(self.quest_system.set_player_level(self.player_level))
+        
+    def store_item(self, item):
+        """Ranger un objet dans l'inventaire du joueur (faux s'il est trop lourd)"""
+        if self.inventory.add_item(item):
+            return True
+        print(f"Inventaire plein: {item.name}")
+        return False
+        
+    def trade_with_merchant(self):
+        """Acheter une potion de vie au marchand (échange inscrit au journal)"""
+        result = self.shop.trade(self.inventory, self.player_gold, buy=["potion_health"], ledger=self.trade_ledger)
+        print(result["message"])
+        if result["success"]:
+            self.stats.add_gold_spent(self.player_gold - result["gold"])
+            self.player_gold = result["gold"]
+            self.update_ui()
+            
+    def accept_quests(self, quest_ids):
+        """Accepter les quêtes qui viennent de devenir disponibles"""
+        for quest_id in quest_ids:
+            self.quest_system.accept_quest(quest_id)
+        
     def game_over(self):
-        """Fin de partie"""
-        game_over_text = Text(
+        """Fin de partie (la mort n'est comptée qu'au passage à 0 point de vie)"""
+        if self.game_over_text is not None:
+            return
+        self.stats.add_death()
+        self.game_over_text = Text(
             text="GAME OVER\n\nAppuyez sur R pour recommencer",
             position=(0, 0, 0),
             scale=3,
@@ -412,26 +519,45 @@ class RPGGame(Ursina):
         
     def update(self):
         """Boucle principale du jeu"""
+        self.update_triggers()
         self.check_collisions()
         
         # Contrôles
-        if held_keys['r']:
+        if self.key_pressed('r'):
             self.restart_game()
             
-        if held_keys['f5']:
+        if self.key_pressed('f5'):
             self.save_game()
             
-        if held_keys['f9']:
+        if self.key_pressed('f9'):
             self.load_game()
             
+        if self.key_pressed('b') and "merchant" in self.triggers.zones_of("player"):
+            self.trade_with_merchant()
+            
+    def key_pressed(self, key):
+        """Vrai une seule fois par appui (held_keys reste vrai tant que la touche est enfoncée)"""
+        if not held_keys[key]:
+            self.keys_down.discard(key)
+            return False
+        if key in self.keys_down:
+            return False
+        self.keys_down.add(key)
+        return True
+        
     def restart_game(self):
         """Redémarrer le jeu"""
         self.player_health = self.player_max_health
         self.player_level = 1
+        self.quest_system.set_player_level(self.player_level)
         self.player_exp = 0
         self.player_gold = 50
-        self.inventory = []
+        self.inventory.clear()
+        self.equipment = Equipment(base_stats={"damage": 20})
         self.player.position = Vec3(0, 2, 0)
+        if self.game_over_text is not None:
+            destroy(self.game_over_text)
+            self.game_over_text = None
         self.update_ui()
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Système de perception : lignes de vue entre les agents et le joueur,
+testées par lots contre les collisions statiques du monde
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from config import config
+
+# Hauteur des yeux au-dessus de la position des entités
+EYE_HEIGHT = 0.5
+
+def _as_tuple(position):
+    """Convertir une position (Vec3, liste, tuple) en triplet de flottants"""
+    return (float(position[0]), float(position[1]), float(position[2]))
+
+class PerceptionSystem:
+    """Lignes de vue mises en cache et calculées par lots"""
+    
+    def __init__(self, move_threshold: Optional[float] = None, query_budget: Optional[int] = None):
+        if move_threshold is None:
+            move_threshold = config.get('ai.perception_move_threshold', 1.0)
+        if query_budget is None:
+            query_budget = config.get('ai.perception_query_budget', 32)
+        self.move_threshold = move_threshold
+        self.query_budget = query_budget
+        self.box_min = np.empty((0, 3), dtype=np.float32)
+        self.box_max = np.empty((0, 3), dtype=np.float32)
+        self._pending_boxes = []
+        self.queries_last_tick = 0
+    
+    def add_box(self, center, size):
+        """Ajouter une boîte de collision statique (centre, dimensions)"""
+        cx, cy, cz = _as_tuple(center)
+        sx, sy, sz = _as_tuple(size)
+        half = (abs(sx) / 2, abs(sy) / 2, abs(sz) / 2)
+        self._pending_boxes.append((
+            (cx - half[0], cy - half[1], cz - half[2]),
+            (cx + half[0], cy + half[1], cz + half[2])
+        ))
+    
+    def add_entities(self, entities: Iterable):
+        """Ajouter les boîtes englobantes d'entités statiques"""
+        for entity in entities:
+            center = getattr(entity, 'world_position', entity.position)
+            size = getattr(entity, 'world_scale', entity.scale)
+            self.add_box(center, size)
+    
+    def clear(self):
+        """Retirer toutes les collisions statiques"""
+        self.box_min = np.empty((0, 3), dtype=np.float32)
+        self.box_max = np.empty((0, 3), dtype=np.float32)
+        self._pending_boxes = []
+    
+    def _commit_boxes(self):
+        """Regrouper les boîtes ajoutées dans les tableaux"""
+        if not self._pending_boxes:
+            return
+        mins = np.array([box[0] for box in self._pending_boxes], dtype=np.float32)
+        maxs = np.array([box[1] for box in self._pending_boxes], dtype=np.float32)
+        self.box_min = np.concatenate([self.box_min, mins])
+        self.box_max = np.concatenate([self.box_max, maxs])
+        self._pending_boxes = []
+    
+    def segments_clear(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Tester un lot de segments contre toutes les boîtes (méthode des dalles)
+        
+        Renvoie un tableau booléen : True si le segment n'est bloqué par aucune boîte.
+        """
+        self._commit_boxes()
+        count = len(starts)
+        if count == 0 or len(self.box_min) == 0:
+            return np.ones(count, dtype=bool)
+        
+        direction = ends - starts
+        direction = np.where(np.abs(direction) < 1e-9, 1e-9, direction)
+        inverse = 1.0 / direction
+        
+        # (segments, boîtes, axes)
+        t1 = (self.box_min[None, :, :] - starts[:, None, :]) * inverse[:, None, :]
+        t2 = (self.box_max[None, :, :] - starts[:, None, :]) * inverse[:, None, :]
+        t_enter = np.minimum(t1, t2).max(axis=2)
+        t_exit = np.maximum(t1, t2).min(axis=2)
+        
+        blocked = (t_exit >= np.maximum(t_enter, 0.0)) & (t_enter <= 1.0)
+        return ~blocked.any(axis=1)
+    
+    def refresh(self, controllers: Iterable, player_position):
+        """Mettre à jour la visibilité du joueur pour les agents donnés
+        
+        Un résultat reste valide tant que ni l'agent ni le joueur ne se sont
+        déplacés de plus de move_threshold. Au plus query_budget lignes de vue
+        sont recalculées par appel ; les autres gardent leur ancien résultat.
+        """
+        px, py, pz = _as_tuple(player_position)
+        threshold_sq = self.move_threshold * self.move_threshold
+        never_seen: List = []
+        stale: List = []
+        
+        for controller in controllers:
+            ax, ay, az = _as_tuple(controller.entity.position)
+            # Inutile de tester la ligne de vue hors de la portée de détection
+            detection_sq = controller.detection_range * controller.detection_range
+            if (ax - px) ** 2 + (ay - py) ** 2 + (az - pz) ** 2 > detection_sq:
+                continue
+            stamp = controller.perception_stamp
+            if stamp is None:
+                never_seen.append((controller, ax, ay, az))
+                continue
+            sax, say, saz, spx, spy, spz = stamp
+            agent_moved = (ax - sax) ** 2 + (ay - say) ** 2 + (az - saz) ** 2
+            player_moved = (px - spx) ** 2 + (py - spy) ** 2 + (pz - spz) ** 2
+            if agent_moved > threshold_sq or player_moved > threshold_sq:
+                stale.append((controller, ax, ay, az))
+        
+        # Les agents sans résultat sont servis en premier ; hors budget ils ne voient rien
+        queue = never_seen + stale
+        batch = queue[:self.query_budget]
+        for controller, _, _, _ in never_seen[self.query_budget:]:
+            controller.player_visible = False
+        self.queries_last_tick = len(batch)
+        if not batch:
+            return
+        
+        starts = np.array([(ax, ay + EYE_HEIGHT, az) for _, ax, ay, az in batch], dtype=np.float32)
+        ends = np.empty_like(starts)
+        ends[:] = (px, py + EYE_HEIGHT, pz)
+        visible = self.segments_clear(starts, ends)
+        
+        for (controller, ax, ay, az), is_visible in zip(batch, visible):
+            controller.player_visible = bool(is_visible)
+            controller.perception_stamp = (ax, ay, az, px, py, pz)
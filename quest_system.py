@@ -4,10 +4,45 @@
 Système de quêtes pour le RPG Aventure 3D
 """
 
+import hashlib
 import json
+import os
 import random
-from dataclasses import dataclass
-from typing import List, Dict, Any
+import struct
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple
+
+QUESTS_DIR = "quests"
+QUEST_CACHE_FILE = "quest_cache.bin"
+
+# En-tête du cache : magie, version, signature des fichiers, empreinte du
+# contenu, nombre de quêtes, taille de l'index
+CACHE_MAGIC = b"QSTC"
+CACHE_VERSION = 2
+CACHE_HEADER = struct.Struct("<4sH32s32sII")
+
+# Cible d'un objectif qui accepte n'importe quel sujet d'événement
+ANY = "*"
+
+# Objectifs non liés à un événement : avancés par update_quest_progress
+CUSTOM = "custom"
+
+@dataclass(frozen=True)
+class Objective:
+    """Objectif typé : tuer N ennemis, ramasser N objets, atteindre une zone"""
+    kind: str  # kill, collect, reach, custom
+    target: str = ANY
+    count: int = 1
+    zone: Optional[str] = None  # Zone où l'événement doit avoir lieu
+
+def parse_objectives(quest_data: Dict[str, Any]) -> List[Objective]:
+    """Objectifs typés d'une quête (un objectif libre de 3 actions par défaut)"""
+    goals = quest_data.get("goals")
+    if not goals:
+        return [Objective(CUSTOM, count=3)]
+    return [Objective(goal["kind"], goal.get("target", ANY), goal.get("count", 1), goal.get("zone"))
+            for goal in goals]
 
 @dataclass
 class Quest:
@@ -20,172 +55,548 @@ class Quest:
     required_level: int
     is_completed: bool = False
     is_active: bool = False
+    goals: List[Objective] = field(default_factory=list)
+    prerequisites: List[str] = field(default_factory=list)  # Quêtes à terminer avant
+    required_items: List[str] = field(default_factory=list)  # Objets à posséder
+    
+    @property
+    def max_progress(self) -> int:
+        """Nombre total d'actions nécessaires"""
+        return sum(goal.count for goal in self.goals)
+
+class QuestHeader(NamedTuple):
+    """En-tête d'une quête, chargé au démarrage"""
+    id: str
+    title: str
+    required_level: int
+    prerequisites: Tuple[str, ...]
+    required_items: Tuple[str, ...]
+    offset: int  # Position du corps dans le cache
+    length: int
+
+def _data_files(data_dir: str) -> List[str]:
+    """Fichiers de données de quêtes, dans un ordre stable"""
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(os.path.join(data_dir, name) for name in os.listdir(data_dir) if name.endswith(".json"))
+
+def _files_signature(files: List[str]) -> bytes:
+    """Signature rapide (noms, tailles, dates) des fichiers de données"""
+    digest = hashlib.sha256()
+    for path in files:
+        info = os.stat(path)
+        digest.update(f"{path}\0{info.st_size}\0{info.st_mtime_ns}\n".encode("utf-8"))
+    return digest.digest()
+
+def _content_digest(files: List[str]) -> bytes:
+    """Empreinte du contenu des fichiers de données"""
+    digest = hashlib.sha256()
+    for path in files:
+        with open(path, 'rb') as f:
+            digest.update(path.encode("utf-8") + b"\0" + f.read() + b"\0")
+    return digest.digest()
+
+def compile_quest_cache(data_dir: str = QUESTS_DIR, cache_file: str = QUEST_CACHE_FILE):
+    """Compiler les fichiers de quêtes en un cache binaire
+    
+    Le cache contient un index compact (ID, titre, niveau, position du corps)
+    suivi du corps JSON de chaque quête.
+    """
+    files = _data_files(data_dir)
+    index = []
+    bodies = []
+    offset = 0
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for quest_data in json.load(f)["quests"]:
+                body = json.dumps(quest_data, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+                index.append([quest_data["id"], quest_data["title"], quest_data["required_level"],
+                              quest_data.get("prerequisites", []), quest_data.get("required_items", []),
+                              offset, len(body)])
+                bodies.append(body)
+                offset += len(body)
+    
+    index_blob = json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+    header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, _files_signature(files),
+                               _content_digest(files), len(index), len(index_blob))
+    temporary = cache_file + ".tmp"
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        f.write(index_blob)
+        f.writelines(bodies)
+    os.replace(temporary, cache_file)
+
+def check_prerequisites(headers: Dict[str, QuestHeader]):
+    """Vérifier que les prérequis existent et forment un graphe sans cycle"""
+    remaining = {}
+    dependents: Dict[str, List[str]] = {}
+    for quest_id, header in headers.items():
+        for prerequisite in header.prerequisites:
+            if prerequisite not in headers:
+                raise ValueError(f"Prérequis inconnu pour {quest_id}: {prerequisite}")
+            dependents.setdefault(prerequisite, []).append(quest_id)
+        remaining[quest_id] = len(header.prerequisites)
+    
+    # Tri topologique : les quêtes jamais libérées appartiennent à un cycle
+    ready = [quest_id for quest_id, count in remaining.items() if count == 0]
+    while ready:
+        for dependent in dependents.get(ready.pop(), ()):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    cycle = sorted(quest_id for quest_id, count in remaining.items() if count > 0)
+    if cycle:
+        raise ValueError(f"Cycle dans les prérequis de quêtes: {', '.join(cycle)}")
+
+class QuestDatabase:
+    """Base de quêtes en lecture seule : en-têtes chargés au démarrage,
+    corps lus dans le cache au premier accès"""
+    
+    def __init__(self, data_dir: str = QUESTS_DIR, cache_file: str = QUEST_CACHE_FILE):
+        self.data_dir = data_dir
+        self.cache_file = cache_file
+        if not self._open_cache():
+            compile_quest_cache(data_dir, cache_file)
+            if not self._open_cache():
+                raise RuntimeError(f"Cache de quêtes illisible: {cache_file}")
+    
+    def _open_cache(self) -> bool:
+        """Lire l'index du cache s'il correspond aux fichiers de données"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                raw_header = f.read(CACHE_HEADER.size)
+                if len(raw_header) < CACHE_HEADER.size:
+                    return False
+                magic, version, signature, digest, count, index_length = CACHE_HEADER.unpack(raw_header)
+                if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                    return False
+                
+                files = _data_files(self.data_dir)
+                current_signature = _files_signature(files)
+                if signature != current_signature:
+                    # Fichiers touchés : le cache reste valide si le contenu n'a pas changé
+                    if digest != _content_digest(files):
+                        return False
+                    self._update_signature(current_signature)
+                
+                index = json.loads(f.read(index_length))
+        except (OSError, ValueError, struct.error):
+            return False
+        
+        self._body_start = CACHE_HEADER.size + index_length
+        self.headers: Dict[str, QuestHeader] = {
+            quest_id: QuestHeader(quest_id, title, level, tuple(prerequisites), tuple(items), offset, length)
+            for quest_id, title, level, prerequisites, items, offset, length in index
+        }
+        return len(self.headers) == count
+    
+    def _update_signature(self, signature: bytes):
+        """Réécrire la signature des fichiers dans l'en-tête du cache"""
+        with open(self.cache_file, 'r+b') as f:
+            f.seek(len(CACHE_MAGIC) + 2)
+            f.write(signature)
+    
+    def __len__(self) -> int:
+        return len(self.headers)
+    
+    def __contains__(self, quest_id: str) -> bool:
+        return quest_id in self.headers
+    
+    def load(self, quest_id: str) -> Dict[str, Any]:
+        """Lire le corps complet d'une quête"""
+        header = self.headers[quest_id]
+        with open(self.cache_file, 'rb') as f:
+            f.seek(self._body_start + header.offset)
+            return json.loads(f.read(header.length))
+
+_quest_database: Optional[QuestDatabase] = None
+
+def get_quest_database() -> QuestDatabase:
+    """Obtenir la base de quêtes partagée (ouverte au premier appel)"""
+    global _quest_database
+    if _quest_database is None:
+        _quest_database = QuestDatabase()
+    return _quest_database
+
+def reload_quest_database() -> QuestDatabase:
+    """Rouvrir la base (recompilée si les fichiers de données ont changé)"""
+    global _quest_database
+    _quest_database = None
+    return get_quest_database()
 
 class QuestSystem:
-    """Système de gestion des quêtes"""
+    """Système de gestion des quêtes
+    
+    Les quêtes sont rangées par ID et construites depuis la base au premier
+    accès ; les quêtes actives et terminées sont tenues à jour à chaque
+    transition.
     
-    def __init__(self):
-        self.available_quests = []
-        self.active_quests = []
-        self.completed_quests = []
+    La disponibilité suit un graphe de prérequis (quêtes, niveau, objets) :
+    chaque quête non terminée compte ses exigences non remplies, et un
+    changement (niveau, quête terminée, objet obtenu ou perdu) ne met à jour
+    que les quêtes qui en dépendent.
+    """
+    
+    def __init__(self, database: Optional[QuestDatabase] = None, player_level: int = 1):
+        self.database = database if database is not None else get_quest_database()
+        self._quests: Dict[str, Quest] = {}  # Quêtes déjà construites
+        self._active: Dict[str, Quest] = {}
+        self._completed: Dict[str, Quest] = {}
+        self._open: List[Tuple[int, str]] = []  # (niveau requis, ID) des quêtes non terminées
+        self.player_level = player_level
+        self.held_items: Dict[str, int] = {}  # Objets possédés, pour les conditions d'objets
+        self._unmet: Dict[str, int] = {}  # Exigences non remplies des quêtes non terminées
+        self._unlocked: List[Tuple[int, str]] = []  # (niveau requis, ID) des quêtes disponibles
+        self._dependents: Dict[str, List[str]] = {}  # Quête -> quêtes qui l'exigent
+        self._item_gates: Dict[str, List[str]] = {}  # Objet -> quêtes qui l'exigent
         self.quest_progress = {}
+        self.objective_progress: Dict[str, List[int]] = {}
+        self.ready_quests: Set[str] = set()  # Quêtes actives dont tous les objectifs sont atteints
+        # (événement, cible) -> objectifs en cours qui l'attendent, indexés par (quête, n° d'objectif)
+        self._listeners: Dict[Tuple[str, str], Dict[Tuple[str, int], Quest]] = {}
         
         self.load_quests()
-        
-    def load_quests(self):
-        """Charger les quêtes depuis le fichier JSON"""
-        quests_data = {
-            "quests": [
-                {
-                    "id": "quest_001",
-                    "title": "Les Gobelins du Bois",
-                    "description": "Éliminez 3 gobelins qui terrorisent le village",
-                    "objectives": ["Tuer 3 gobelins"],
-                    "rewards": {"exp": 100, "gold": 50, "item": "Épée en fer"},
-                    "required_level": 1
-                },
-                {
-                    "id": "quest_002", 
-                    "title": "Le Trésor du Donjon",
-                    "description": "Explorez le donjon et trouvez le trésor caché",
-                    "objectives": ["Entrer dans le donjon", "Trouver le trésor"],
-                    "rewards": {"exp": 200, "gold": 100, "item": "Armure en cuir"},
-                    "required_level": 3
-                },
-                {
-                    "id": "quest_003",
-                    "title": "Le Troll des Montagnes",
-                    "description": "Défiez le troll qui vit dans les montagnes",
-                    "objectives": ["Trouver le troll", "Vaincre le troll"],
-                    "rewards": {"exp": 300, "gold": 150, "item": "Épée magique"},
-                    "required_level": 5
-                },
-                {
-                    "id": "quest_004",
-                    "title": "Les Potions du Sage",
-                    "description": "Récupérez 5 potions pour le sage du village",
-                    "objectives": ["Trouver 5 potions"],
-                    "rewards": {"exp": 80, "gold": 30, "item": "Potion de force"},
-                    "required_level": 2
-                },
-                {
-                    "id": "quest_005",
-                    "title": "Le Gardien de la Fontaine",
-                    "description": "Protégez la fontaine du village des créatures",
-                    "objectives": ["Défendre la fontaine", "Tuer 5 ennemis près de la fontaine"],
-                    "rewards": {"exp": 150, "gold": 75, "item": "Bouclier"},
-                    "required_level": 4
-                }
-            ]
-        }
-        
-        for quest_data in quests_data["quests"]:
-            quest = Quest(
+    
+    def __len__(self) -> int:
+        return len(self.database)
+    
+    @property
+    def available_quests(self) -> List[Quest]:
+        """Toutes les quêtes connues (construites si nécessaire)"""
+        return [self._quest(quest_id) for quest_id in self.database.headers]
+    
+    @property
+    def active_quests(self) -> List[Quest]:
+        """Quêtes en cours, dans l'ordre d'acceptation"""
+        return list(self._active.values())
+    
+    @property
+    def completed_quests(self) -> List[Quest]:
+        """Quêtes terminées, dans l'ordre de complétion"""
+        return list(self._completed.values())
+    
+    def get_quest(self, quest_id: str) -> Optional[Quest]:
+        """Obtenir une quête par son ID"""
+        if quest_id not in self.database:
+            return None
+        return self._quest(quest_id)
+    
+    def _quest(self, quest_id: str) -> Quest:
+        """Construire une quête depuis la base au premier accès"""
+        quest = self._quests.get(quest_id)
+        if quest is None:
+            quest_data = self.database.load(quest_id)
+            quest = self._quests[quest_id] = Quest(
                 id=quest_data["id"],
                 title=quest_data["title"],
                 description=quest_data["description"],
                 objectives=quest_data["objectives"],
                 rewards=quest_data["rewards"],
-                required_level=quest_data["required_level"]
+                required_level=quest_data["required_level"],
+                goals=parse_objectives(quest_data),
+                prerequisites=quest_data.get("prerequisites", []),
+                required_items=quest_data.get("required_items", [])
             )
-            self.available_quests.append(quest)
-            
-    def get_available_quests(self, player_level: int) -> List[Quest]:
-        """Obtenir les quêtes disponibles pour le niveau du joueur"""
-        return [quest for quest in self.available_quests 
-                if quest.required_level <= player_level and not quest.is_completed]
-                
+        return quest
+    
+    @staticmethod
+    def _discard(entries: List[Tuple[int, str]], entry: Tuple[int, str]):
+        """Retirer une entrée d'une liste triée si elle y est"""
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+    
+    def _close(self, quest: Quest) -> List[str]:
+        """Retirer une quête terminée des index de disponibilité
+        
+        Renvoie les quêtes qui deviennent disponibles grâce à elle.
+        """
+        entry = (quest.required_level, quest.id)
+        self._discard(self._open, entry)
+        self._discard(self._unlocked, entry)
+        unlocked: List[str] = []
+        if self._unmet.pop(quest.id, None) is not None:
+            self._satisfy(self._dependents.get(quest.id, ()), unlocked)
+        return unlocked
+    
+    def load_quests(self):
+        """Construire le graphe de prérequis depuis les en-têtes (sans lire le contenu des quêtes)"""
+        headers = self.database.headers
+        check_prerequisites(headers)
+        self._open = sorted((header.required_level, quest_id)
+                            for quest_id, header in headers.items()
+                            if quest_id not in self._completed)
+        self._dependents = {}
+        self._item_gates = {}
+        self._unmet = {}
+        for _, quest_id in self._open:
+            header = headers[quest_id]
+            unmet = int(header.required_level > self.player_level)
+            for prerequisite in header.prerequisites:
+                self._dependents.setdefault(prerequisite, []).append(quest_id)
+                unmet += prerequisite not in self._completed
+            for item_id in header.required_items:
+                self._item_gates.setdefault(item_id, []).append(quest_id)
+                unmet += self.held_items.get(item_id, 0) <= 0
+            self._unmet[quest_id] = unmet
+        self._unlocked = [entry for entry in self._open if self._unmet[entry[1]] == 0]
+    
+    def _satisfy(self, quest_ids, unlocked: List[str]):
+        """Une exigence de chaque quête vient d'être remplie"""
+        for quest_id in quest_ids:
+            unmet = self._unmet.get(quest_id)
+            if unmet is None:
+                continue  # Quête déjà terminée
+            self._unmet[quest_id] = unmet - 1
+            if unmet == 1:
+                insort(self._unlocked, (self.database.headers[quest_id].required_level, quest_id))
+                unlocked.append(quest_id)
+    
+    def _unsatisfy(self, quest_ids):
+        """Une exigence de chaque quête n'est plus remplie"""
+        for quest_id in quest_ids:
+            unmet = self._unmet.get(quest_id)
+            if unmet is None:
+                continue
+            if unmet == 0:
+                self._discard(self._unlocked, (self.database.headers[quest_id].required_level, quest_id))
+            self._unmet[quest_id] = unmet + 1
+    
+    def set_player_level(self, player_level: int) -> List[str]:
+        """Changer le niveau du joueur ; renvoie les quêtes qui deviennent disponibles
+        
+        Seules les quêtes dont le niveau requis est entre l'ancien et le
+        nouveau niveau sont réévaluées.
+        """
+        previous, self.player_level = self.player_level, player_level
+        low, high = sorted((previous, player_level))
+        start = bisect_left(self._open, (low + 1, ""))
+        end = bisect_left(self._open, (high + 1, ""))
+        quest_ids = [quest_id for _, quest_id in self._open[start:end]]
+        unlocked: List[str] = []
+        if player_level > previous:
+            self._satisfy(quest_ids, unlocked)
+        else:
+            self._unsatisfy(quest_ids)
+        return unlocked
+    
+    def item_acquired(self, item_id: str, quantity: int = 1) -> List[str]:
+        """Signaler l'obtention d'un objet ; renvoie les quêtes qui deviennent disponibles"""
+        held = self.held_items.get(item_id, 0)
+        self.held_items[item_id] = held + quantity
+        unlocked: List[str] = []
+        if held <= 0 < held + quantity:
+            self._satisfy(self._item_gates.get(item_id, ()), unlocked)
+        return unlocked
+    
+    def item_lost(self, item_id: str, quantity: int = 1):
+        """Signaler la perte d'un objet"""
+        held = self.held_items.get(item_id, 0)
+        self.held_items[item_id] = held - quantity
+        if held > 0 >= held - quantity:
+            self._unsatisfy(self._item_gates.get(item_id, ()))
+    
+    def is_available(self, quest_id: str) -> bool:
+        """Toutes les exigences d'une quête non terminée sont-elles remplies ?"""
+        return self._unmet.get(quest_id) == 0
+    
+    def get_available_quests(self, player_level: Optional[int] = None) -> List[Quest]:
+        """Obtenir les quêtes disponibles (non terminées, exigences remplies), par niveau requis
+        
+        Avec player_level, répondre pour ce niveau sans changer celui du
+        système (voir set_player_level).
+        """
+        entries = self._unlocked
+        if player_level is not None and player_level < self.player_level:
+            entries = entries[:bisect_left(entries, (player_level + 1, ""))]
+        elif player_level is not None and player_level > self.player_level:
+            # Quêtes dont seule l'exigence de niveau n'est pas remplie
+            start = bisect_left(self._open, (self.player_level + 1, ""))
+            end = bisect_left(self._open, (player_level + 1, ""))
+            entries = entries + [entry for entry in self._open[start:end] if self._unmet[entry[1]] == 1]
+        return [self._quest(quest_id) for _, quest_id in entries]
+    
     def accept_quest(self, quest_id: str) -> bool:
-        """Accepter une quête"""
-        for quest in self.available_quests:
-            if quest.id == quest_id and not quest.is_active:
-                quest.is_active = True
-                self.active_quests.append(quest)
-                self.quest_progress[quest_id] = 0
-                return True
-        return False
+        """Accepter une quête disponible"""
+        quest = self.get_quest(quest_id)
+        if quest is None or quest.is_active or not self.is_available(quest_id):
+            return False
+        quest.is_active = True
+        self._active[quest_id] = quest
+        self.quest_progress[quest_id] = 0
+        self.objective_progress[quest_id] = [0] * len(quest.goals)
+        self._register(quest)
+        return True
+    
+    def _register(self, quest: Quest):
+        """Inscrire les objectifs inachevés d'une quête active dans l'index d'événements"""
+        progress = self.objective_progress[quest.id]
+        for index, goal in enumerate(quest.goals):
+            if goal.kind != CUSTOM and progress[index] < goal.count:
+                self._listeners.setdefault((goal.kind, goal.target), {})[(quest.id, index)] = quest
+        if self._objectives_done(quest):
+            self.ready_quests.add(quest.id)
+    
+    def _objectives_done(self, quest: Quest) -> bool:
+        """Tous les objectifs d'une quête active sont-ils atteints ?"""
+        progress = self.objective_progress[quest.id]
+        return all(done >= goal.count for done, goal in zip(progress, quest.goals))
+    
+    def _remove_listener(self, quest: Quest, index: int):
+        """Retirer un objectif de l'index d'événements"""
+        goal = quest.goals[index]
+        key = (goal.kind, goal.target)
+        listeners = self._listeners.get(key)
+        if listeners is not None:
+            listeners.pop((quest.id, index), None)
+            if not listeners:
+                del self._listeners[key]
+    
+    def _unregister(self, quest: Quest):
+        """Retirer tous les objectifs d'une quête de l'index d'événements"""
+        for index in range(len(quest.goals)):
+            self._remove_listener(quest, index)
+        self.ready_quests.discard(quest.id)
+    
+    def _advance(self, quest: Quest, index: int, amount: int) -> int:
+        """Faire avancer un objectif ; renvoie le nombre d'actions prises en compte"""
+        goal = quest.goals[index]
+        progress = self.objective_progress[quest.id]
+        added = min(amount, goal.count - progress[index])
+        if added <= 0:
+            return 0
+        progress[index] += added
+        self.quest_progress[quest.id] += added
         
+        if progress[index] >= goal.count:
+            self._remove_listener(quest, index)
+            if self._objectives_done(quest):
+                self.ready_quests.add(quest.id)
+        return added
+    
+    def notify(self, event_type: str, subject: str, amount: int = 1, zone: Optional[str] = None) -> List[str]:
+        """Signaler un événement de jeu (kill, collect, reach)
+        
+        Seuls les objectifs qui attendent cet événement sont touchés. Renvoie
+        les IDs des quêtes dont tous les objectifs viennent d'être atteints.
+        """
+        completed = []
+        for key in ((event_type, subject), (event_type, ANY)):
+            listeners = self._listeners.get(key)
+            if not listeners:
+                continue
+            for (quest_id, index), quest in list(listeners.items()):
+                goal = quest.goals[index]
+                if goal.zone is not None and goal.zone != zone:
+                    continue
+                was_ready = quest_id in self.ready_quests
+                if self._advance(quest, index, amount) and not was_ready and quest_id in self.ready_quests:
+                    completed.append(quest_id)
+        return completed
+    
     def update_quest_progress(self, quest_id: str, progress: int = 1):
-        """Mettre à jour le progrès d'une quête"""
-        if quest_id in self.quest_progress:
-            self.quest_progress[quest_id] += progress
-            
+        """Mettre à jour le progrès d'une quête (objectifs avancés dans l'ordre)"""
+        quest = self._active.get(quest_id)
+        if quest is None or quest_id not in self.quest_progress:
+            return
+        for index in range(len(quest.goals)):
+            if progress <= 0:
+                break
+            progress -= self._advance(quest, index, progress)
+    
     def check_quest_completion(self, quest_id: str) -> bool:
-        """Vérifier si une quête est terminée"""
-        for quest in self.active_quests:
-            if quest.id == quest_id:
-                # Logique simple : quête terminée après 3 actions
-                if self.quest_progress.get(quest_id, 0) >= 3:
-                    return True
-        return False
-        
+        """Vérifier si une quête est terminée (détecté lors des mises à jour)"""
+        return quest_id in self.ready_quests
+    
     def complete_quest(self, quest_id: str) -> Dict[str, Any] | None:
         """Terminer une quête et donner les récompenses"""
-        for quest in self.active_quests:
-            if quest.id == quest_id:
-                quest.is_completed = True
-                quest.is_active = False
-                self.active_quests.remove(quest)
-                self.completed_quests.append(quest)
-                
-                # Donner les récompenses
-                rewards = quest.rewards.copy()
-                
-                return {
-                    "quest": quest,
-                    "rewards": rewards,
-                    "message": f"Quête '{quest.title}' terminée !"
-                }
-        return None
+        quest = self._active.pop(quest_id, None)
+        if quest is None:
+            return None
+        quest.is_completed = True
+        quest.is_active = False
+        self._unregister(quest)
+        self.objective_progress.pop(quest_id, None)
+        self._completed[quest_id] = quest
+        unlocked = self._close(quest)
+        
+        # Donner les récompenses
+        rewards = quest.rewards.copy()
         
+        return {
+            "quest": quest,
+            "rewards": rewards,
+            "unlocked": unlocked,
+            "message": f"Quête '{quest.title}' terminée !"
+        }
+    
     def get_quest_status(self, quest_id: str) -> Dict[str, Any] | None:
         """Obtenir le statut d'une quête"""
-        for quest in self.active_quests:
-            if quest.id == quest_id:
-                progress = self.quest_progress.get(quest_id, 0)
-                return {
-                    "quest": quest,
-                    "progress": progress,
-                    "max_progress": 3,
-                    "percentage": (progress / 3) * 100
-                }
-        return None
-        
+        quest = self._active.get(quest_id)
+        if quest is None:
+            return None
+        progress = self.quest_progress.get(quest_id, 0)
+        max_progress = quest.max_progress
+        return {
+            "quest": quest,
+            "progress": progress,
+            "max_progress": max_progress,
+            "objectives": list(self.objective_progress.get(quest_id, [])),
+            "percentage": (progress / max_progress) * 100 if max_progress else 100.0
+        }
+    
     def save_quests(self):
         """Sauvegarder l'état des quêtes"""
         save_data = {
-            "active_quests": [quest.id for quest in self.active_quests],
-            "completed_quests": [quest.id for quest in self.completed_quests],
-            "quest_progress": self.quest_progress
+            "active_quests": list(self._active),
+            "completed_quests": list(self._completed),
+            "quest_progress": self.quest_progress,
+            "objective_progress": self.objective_progress,
+            "player_level": self.player_level,
+            "held_items": self.held_items
         }
         
         with open('quests_save.json', 'w') as f:
             json.dump(save_data, f)
-            
+    
     def load_quests_save(self):
         """Charger l'état des quêtes"""
         try:
             with open('quests_save.json', 'r') as f:
                 save_data = json.load(f)
-                
+            
             # Restaurer les quêtes actives
             for quest_id in save_data.get("active_quests", []):
-                for quest in self.available_quests:
-                    if quest.id == quest_id:
-                        quest.is_active = True
-                        self.active_quests.append(quest)
-                        break
-                        
+                quest = self.get_quest(quest_id)
+                if quest is not None:
+                    quest.is_active = True
+                    self._active[quest_id] = quest
+            
             # Restaurer les quêtes terminées
             for quest_id in save_data.get("completed_quests", []):
-                for quest in self.available_quests:
-                    if quest.id == quest_id:
-                        quest.is_completed = True
-                        self.completed_quests.append(quest)
-                        break
-                        
+                quest = self.get_quest(quest_id)
+                if quest is not None:
+                    quest.is_completed = True
+                    self._completed[quest_id] = quest
+            self.player_level = save_data.get("player_level", self.player_level)
+            self.held_items = save_data.get("held_items", {})
+            self.load_quests()
+            
             # Restaurer le progrès
             self.quest_progress = save_data.get("quest_progress", {})
-            
+            saved_objectives = save_data.get("objective_progress", {})
+            for quest in self._active.values():
+                self.quest_progress.setdefault(quest.id, 0)
+                progress = saved_objectives.get(quest.id)
+                if progress is None or len(progress) != len(quest.goals):
+                    # Ancienne sauvegarde : répartir le progrès global dans l'ordre des objectifs
+                    progress, remaining = [], self.quest_progress[quest.id]
+                    for goal in quest.goals:
+                        done = min(goal.count, remaining)
+                        progress.append(done)
+                        remaining -= done
+                self.objective_progress[quest.id] = progress
+                self._register(quest)
+        
         except FileNotFoundError:
             pass  # Pas de sauvegarde existante 
\ No newline at end of file
@@ -4,32 +4,116 @@
 Statistiques et analyse du RPG Aventure 3D
 """
 
+import atexit
 import json
+import os
+import threading
 import time
 from pathlib import Path
+from typing import Dict, List, Optional
+from config import config
+from achievements import AchievementEngine, get_achievement_rules
+from stats_log import StatsEventLog
+from stats_store import STATS_DB_FILE, SQLiteStatsStore, flatten
 from quest_system import QuestSystem
-from inventory_system import Inventory, Shop, ItemFactory
+from inventory_system import Inventory, ItemFactory, get_shop_catalog
 from ai_system import AISystem
 
 class GameStats:
-    """Classe pour collecter et analyser les statistiques du jeu"""
+    """Classe pour collecter et analyser les statistiques du jeu
     
-    def __init__(self):
-        self.stats_file = "game_stats.json"
+    Les compteurs restent en mémoire et sont marqués modifiés ; un thread
+    d'écriture les enregistre toutes les flush_interval secondes (remplacement
+    atomique du fichier), ainsi qu'à la fermeture et à la sortie du programme.
+    Les méthodes add_* ne font donc aucun accès disque.
+    
+    Chaque modification est aussi ajoutée au journal d'événements horodatés
+    (event_log), écrit par le même thread, pour suivre les sessions et les
+    tendances horaires.
+    
+    Avec le stockage "sqlite", les modifications sont accumulées en
+    incréments et appliquées à une base SQLite en mode WAL (compteurs
+    globaux et par session) au lieu de réécrire le fichier JSON ; plusieurs
+    processus peuvent alors enregistrer en même temps.
+    """
+    
+    def __init__(self, stats_file: str = "game_stats.json", flush_interval: Optional[float] = None,
+                 event_log: Optional[StatsEventLog] = None, backend: Optional[str] = None):
+        if flush_interval is None:
+            flush_interval = config.get('gameplay.stats_flush_interval', 5.0)
+        if backend is None:
+            backend = config.get('gameplay.stats_backend', "json")
+        if backend not in ("json", "sqlite"):
+            raise ValueError(f"Stockage des statistiques inconnu: {backend}")
+        self.stats_file = stats_file
+        self.flush_interval = flush_interval
+        self.event_log = event_log if event_log is not None else StatsEventLog()
+        self.store = SQLiteStatsStore(config.get('gameplay.stats_db_file', STATS_DB_FILE)) if backend == "sqlite" else None
+        self._deltas: Dict[str, float] = {}  # Incréments pas encore appliqués à la base
+        self._new_achievements: List[str] = []
         self.stats = self.load_stats()
+        self.writes = 0
+        self._dirty = False
+        self._lock = threading.Lock()  # Protège les compteurs et l'indicateur de modification
+        self._write_lock = threading.Lock()  # Une seule écriture du fichier à la fois
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._exit_hook = False  # close() enregistré pour la sortie du programme
+        # Succès débloqués automatiquement par les règles indexées par compteur
+        self.achievements = AchievementEngine(get_achievement_rules(), self.stats["achievements"])
+        for achievement_name in self.achievements.evaluate(flatten(self.stats)):
+            self._unlock(achievement_name)
+        
+    def __enter__(self) -> "GameStats":
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.close()
         
     def load_stats(self):
         """Charger les statistiques existantes"""
+        if self.store is not None:
+            return self._load_store()
         try:
             if Path(self.stats_file).exists():
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self._read_stats_file()
             else:
                 return self.get_default_stats()
         except Exception as e:
             print(f"Erreur lors du chargement des stats: {e}")
+            self._set_aside()
             return self.get_default_stats()
             
+    def _read_stats_file(self) -> dict:
+        """Lire le fichier de stats JSON (ValueError si son contenu n'est pas un objet)"""
+        with open(self.stats_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        if not isinstance(stats, dict):
+            raise ValueError("le contenu n'est pas un objet JSON")
+        return stats
+        
+    def _set_aside(self):
+        """Renommer un fichier de stats illisible, qui serait sinon écrasé par les valeurs par défaut"""
+        corrupt = f"{self.stats_file}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        try:
+            os.replace(self.stats_file, corrupt)
+            print(f"Fichier de stats illisible mis de côté: {corrupt}")
+        except OSError as e:
+            print(f"Impossible de mettre de côté le fichier de stats illisible: {e}")
+            
+    def _load_store(self):
+        """Charger les statistiques de la base (importées du fichier JSON si elle est vide)"""
+        if Path(self.stats_file).exists():
+            try:
+                previous = self._read_stats_file()
+            except Exception as e:
+                print(f"Fichier de stats illisible, non importé: {e}")
+                self._set_aside()
+            else:
+                achievements = previous.get("achievements", [])
+                self.store.import_totals(flatten(previous), achievements if isinstance(achievements, list) else [])
+        return self.store.load(self.get_default_stats())
+        
     def get_default_stats(self):
         """Obtenir les statistiques par défaut"""
         return {
@@ -57,78 +141,192 @@ class GameStats:
             "achievements": []
         }
         
+    def _start_writer(self):
+        """Démarrer le thread d'écriture à la première modification
+        
+        La fermeture est enregistrée pour la sortie du programme même sans
+        thread (flush_interval <= 0), pour ne perdre aucune modification.
+        """
+        if not self._exit_hook:
+            self._exit_hook = True
+            atexit.register(self.close)
+        if self._writer is None and self.flush_interval > 0:
+            self._writer = threading.Thread(target=self._run_writer, name="stats-writer", daemon=True)
+            self._writer.start()
+            
+    def _run_writer(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            
+    def _increment(self, *path, amount=1):
+        """Ajouter amount au compteur désigné par path et le marquer modifié"""
+        with self._lock:
+            counters = self.stats
+            for key in path[:-1]:
+                counters = counters[key]
+            value = counters[path[-1]] = counters.get(path[-1], 0) + amount
+            name = ".".join(path)
+            if self.store is not None:
+                self._deltas[name] = self._deltas.get(name, 0) + amount
+            for achievement_name in self.achievements.update(name, value):
+                self._unlock(achievement_name)
+            self._dirty = True
+        self._start_writer()
+        
+    def _record(self, kind: str, subject: str = "", amount=1):
+        """Ajouter un événement au journal (écrit avec la prochaine sauvegarde)"""
+        with self._lock:
+            self.event_log.record(kind, subject, amount)
+        self._start_writer()
+        
+    def flush(self):
+        """Écrire les statistiques et les événements s'ils ont changé depuis la dernière écriture"""
+        self._save(force=False)
+            
     def save_stats(self):
-        """Sauvegarder les statistiques"""
+        """Sauvegarder les statistiques immédiatement"""
+        self._save(force=True)
+        
+    def _save(self, force: bool):
+        with self._write_lock:
+            with self._lock:
+                events = self.event_log.take_pending()
+                content = None
+                deltas, achievements = self._deltas, self._new_achievements
+                if self.store is not None:
+                    self._deltas, self._new_achievements = {}, []
+                    self._dirty = False
+                elif self._dirty or force:
+                    content = json.dumps(self.stats, indent=4, ensure_ascii=False)
+                    self._dirty = False
+            if events:
+                try:
+                    self.event_log.write(events)
+                except Exception as e:
+                    print(f"Erreur lors de l'écriture du journal des stats: {e}")
+            if content is not None:
+                self._write(content)
+            if self.store is not None and (deltas or achievements):
+                self._apply(deltas, achievements)
+                
+    def _apply(self, deltas: Dict[str, float], achievements: List[str]):
+        """Appliquer des incréments à la base en une transaction"""
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=4, ensure_ascii=False)
+            self.store.apply(self.event_log.session_id, deltas, achievements)
+            self.writes += 1
         except Exception as e:
+            # Remettre les incréments en attente pour la prochaine écriture
+            with self._lock:
+                for name, amount in deltas.items():
+                    self._deltas[name] = self._deltas.get(name, 0) + amount
+                self._new_achievements[:0] = achievements
+                self._dirty = True
             print(f"Erreur lors de la sauvegarde des stats: {e}")
             
+    def _write(self, content: str):
+        """Remplacer le fichier de statistiques de façon atomique"""
+        temporary = self.stats_file + ".tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temporary, self.stats_file)
+            self.writes += 1
+        except Exception as e:
+            with self._lock:
+                self._dirty = True  # Réessayer à la prochaine écriture
+            print(f"Erreur lors de la sauvegarde des stats: {e}")
+            
+    def close(self):
+        """Arrêter le thread d'écriture et écrire les dernières modifications"""
+        self._stop.set()
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.join()
+        if self._exit_hook:
+            self._exit_hook = False
+            atexit.unregister(self.close)
+        self.flush()
+        try:
+            self.event_log.close()
+            self.event_log.compact()
+        except Exception as e:
+            print(f"Erreur lors du compactage du journal des stats: {e}")
+        if self.store is not None:
+            self.store.close()
+        
     def update_session_count(self):
         """Incrémenter le nombre de sessions"""
-        self.stats["game_sessions"] += 1
-        self.save_stats()
+        self._increment("game_sessions")
+        self._record("session")
         
     def add_playtime(self, minutes):
         """Ajouter du temps de jeu"""
-        self.stats["total_playtime"] += minutes
-        self.save_stats()
+        self._increment("total_playtime", amount=minutes)
+        self._record("playtime", amount=minutes)
         
     def add_quest_completed(self, quest_name):
         """Ajouter une quête terminée"""
-        self.stats["quests_completed"] += 1
-        self.save_stats()
+        self._increment("quests_completed")
+        self._record("quest", quest_name)
         
     def add_enemy_defeated(self, enemy_type):
         """Ajouter un ennemi vaincu"""
         if enemy_type in self.stats["enemies_defeated"]:
-            self.stats["enemies_defeated"][enemy_type] += 1
-        self.stats["enemies_defeated"]["total"] += 1
-        self.save_stats()
+            self._increment("enemies_defeated", enemy_type)
+        self._increment("enemies_defeated", "total")
+        self._record("kill", enemy_type)
         
     def add_item_collected(self, item_type):
         """Ajouter un objet collecté"""
         if item_type in self.stats["items_collected"]:
-            self.stats["items_collected"][item_type] += 1
-        self.stats["items_collected"]["total"] += 1
-        self.save_stats()
+            self._increment("items_collected", item_type)
+        self._increment("items_collected", "total")
+        self._record("pickup", item_type)
         
     def add_gold_earned(self, amount):
         """Ajouter de l'or gagné"""
-        self.stats["gold_earned"] += amount
-        self.save_stats()
+        self._increment("gold_earned", amount=amount)
+        self._record("gold_earned", amount=amount)
         
     def add_gold_spent(self, amount):
         """Ajouter de l'or dépensé"""
-        self.stats["gold_spent"] += amount
-        self.save_stats()
+        self._increment("gold_spent", amount=amount)
+        self._record("gold_spent", amount=amount)
         
     def add_experience(self, amount):
         """Ajouter de l'expérience"""
-        self.stats["experience_gained"] += amount
-        self.save_stats()
+        self._increment("experience_gained", amount=amount)
+        self._record("experience", amount=amount)
         
     def add_level(self):
         """Ajouter un niveau gagné"""
-        self.stats["levels_gained"] += 1
-        self.save_stats()
+        self._increment("levels_gained")
+        self._record("level")
         
     def add_death(self):
         """Ajouter une mort"""
-        self.stats["deaths"] += 1
-        self.save_stats()
+        self._increment("deaths")
+        self._record("death")
         
     def add_save(self):
         """Ajouter une sauvegarde"""
-        self.stats["saves_created"] += 1
-        self.save_stats()
+        self._increment("saves_created")
+        self._record("save")
         
     def add_achievement(self, achievement_name):
         """Ajouter un succès"""
-        if achievement_name not in self.stats["achievements"]:
-            self.stats["achievements"].append(achievement_name)
-            self.save_stats()
+        with self._lock:
+            if not self.achievements.unlock(achievement_name):
+                return
+            self._unlock(achievement_name)
+        self._start_writer()
+        
+    def _unlock(self, achievement_name):
+        """Enregistrer un succès que le moteur vient de débloquer (verrou tenu)"""
+        self.stats["achievements"].append(achievement_name)
+        self._new_achievements.append(achievement_name)
+        self.event_log.record("achievement", achievement_name)
+        self._dirty = True
             
     def get_summary(self):
         """Obtenir un résumé des statistiques"""
@@ -232,18 +430,18 @@ def analyze_game_systems():
     # Analyser le système de quêtes
     print("\n📜 SYSTÈME DE QUÊTES:")
     quest_system = QuestSystem()
-    print(f"  Quêtes disponibles: {len(quest_system.available_quests)}")
+    print(f"  Quêtes disponibles: {len(quest_system)}")
     print(f"  Quêtes actives: {len(quest_system.active_quests)}")
     print(f"  Quêtes terminées: {len(quest_system.completed_quests)}")
     
     # Analyser le système d'inventaire
     print("\n🎒 SYSTÈME D'INVENTAIRE:")
-    shop = Shop()
-    print(f"  Objets en boutique: {len(shop.available_items)}")
+    catalog = get_shop_catalog()
+    print(f"  Objets en boutique: {len(catalog)}")
     
-    weapon_count = len(shop.get_items_by_type("weapon"))
-    armor_count = len(shop.get_items_by_type("armor"))
-    potion_count = len(shop.get_items_by_type("potion"))
+    weapon_count = len(catalog.get_items_by_type("weapon"))
+    armor_count = len(catalog.get_items_by_type("armor"))
+    potion_count = len(catalog.get_items_by_type("potion"))
     
     print(f"  Armes disponibles: {weapon_count}")
     print(f"  Armures disponibles: {armor_count}")
@@ -265,7 +463,7 @@ def analyze_game_systems():
     if test_potion:
         print(f"  Potion créée: {test_potion.name} (Soin: {test_potion.stats['heal']})")
     if test_material:
-        print(f"  Matériau créé: {test_material.name} (Quantité: {test_material.stats['quantity']})")
+        print(f"  Matériau créé: {test_material.name} (Quantité: {test_material.quantity})")
 
 def main():
     """Fonction principale"""
@@ -293,6 +491,8 @@ def main():
     stats.add_achievement("Premier Combat")
     stats.add_achievement("Quêteur Débutant")
     
+    stats.close()
+    
     # Afficher les rapports
     stats.generate_report()
     
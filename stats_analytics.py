@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse de nombreuses statistiques de joueurs : fichiers game_stats.json et
+journaux d'événements (segments et totaux compactés) lus en parallèle par
+un pool de processus, distributions calculées avec NumPy
+
+Utilisation : python stats_analytics.py DOSSIER_OU_FICHIER... [--workers N] [--output rapport.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from stats_log import TOTALS_FILE, _parse_segment_name
+
+# Taille des morceaux de journal confiés à un processus
+CHUNK_BYTES = 32 << 20
+
+PERCENTILES = (50, 75, 90, 95, 99)
+
+REPORT_FILE = "stats_report.json"
+
+# Colonnes des accumulateurs de session : début, fin, ennemis, morts, niveaux
+KIND_COLUMNS = {"kill": 2, "death": 3, "level": 4}
+
+Task = Tuple[str, str, int, int]  # (nature, chemin, début, fin)
+SessionTotals = Dict[str, List[float]]
+
+def _read_chunk(path: str, start: int, end: int) -> bytes:
+    """Lignes d'un fichier commençant dans l'intervalle d'octets [start, end)"""
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # Fin de la ligne commencée dans le morceau précédent
+        position = f.tell()
+        if position >= end:
+            return b""
+        data = f.read(end - position)
+        if data and not data.endswith(b"\n"):
+            data += f.readline()
+        return data
+
+def _add_event(sessions: SessionTotals, timestamp, session, kind, amount):
+    """Ajouter un événement décodé aux totaux de sa session"""
+    totals = sessions.get(session)
+    if totals is None:
+        totals = sessions[session] = [timestamp, timestamp, 0, 0, 0]
+    else:
+        totals[0] = min(totals[0], timestamp)
+        totals[1] = max(totals[1], timestamp)
+    column = KIND_COLUMNS.get(kind)
+    if column is not None:
+        totals[column] += amount
+
+def _scan_events(path: str, start: int, end: int) -> SessionTotals:
+    """Totaux par session d'un morceau de segment
+    
+    Les lignes écrites par StatsEventLog ([horodatage,"session","type",...,quantité])
+    sont découpées sans décodage JSON complet ; les événements d'un segment
+    étant écrits dans l'ordre, seuls le premier et le dernier horodatage de
+    chaque session sont convertis. Les autres lignes passent par json.loads.
+    """
+    columns = {kind.encode(): column for kind, column in KIND_COLUMNS.items()}
+    found: Dict[bytes, list] = {}
+    others: SessionTotals = {}
+    for line in _read_chunk(path, start, end).split(b"\n"):
+        parts = line.split(b'"', 4)
+        if len(parts) == 5 and parts[2] == b"," and parts[0][:1] == b"[" and line.endswith(b"]"):
+            session = parts[1]
+            totals = found.get(session)
+            if totals is None:
+                totals = found[session] = [parts[0], parts[0], 0, 0, 0]
+            else:
+                totals[1] = parts[0]
+            column = columns.get(parts[3])
+            if column is not None:
+                rest = parts[4]
+                totals[column] += float(rest[rest.rindex(b",") + 1:-1])
+        elif line.strip():
+            try:
+                timestamp, session, kind, _, amount = json.loads(line)
+                _add_event(others, timestamp, session, kind, amount)
+            except (TypeError, ValueError):
+                continue  # Ligne interrompue
+    
+    sessions: SessionTotals = {}
+    for session, totals in found.items():
+        totals[0] = float(totals[0][1:-1])
+        totals[1] = float(totals[1][1:-1])
+        sessions[session.decode('utf-8', errors='replace')] = totals
+    _merge(sessions, others)
+    return sessions
+
+def _scan_totals(path: str) -> SessionTotals:
+    """Totaux par session d'un fichier de segments compactés"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    sessions: SessionTotals = {}
+    spans = data.get("spans", {})
+    for session, kinds in data.get("sessions", {}).items():
+        first, last = spans.get(session, (None, None))
+        totals = sessions[session] = [first, last, 0, 0, 0]
+        for kind, column in KIND_COLUMNS.items():
+            totals[column] = sum(kinds.get(kind, {}).values())
+    return sessions
+
+def _scan_stats(path: str) -> Optional[Tuple[float, float, float, float, float]]:
+    """Totaux à vie d'un fichier game_stats.json : sessions, minutes, ennemis, morts, niveaux"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return (data["game_sessions"], data["total_playtime"], data["enemies_defeated"]["total"],
+                data["deaths"], data["levels_gained"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None  # Pas un fichier de statistiques
+
+def _scan(task: Task):
+    """Traiter une tâche dans un processus du pool"""
+    kind, path, start, end = task
+    if kind == "events":
+        return kind, _scan_events(path, start, end)
+    if kind == "totals":
+        return kind, _scan_totals(path)
+    return kind, _scan_stats(path)
+
+def _compacted_numbers(directory: str) -> Dict[str, int]:
+    """Dernier segment replié de chaque session d'un dossier de journal (selon son totals.json)"""
+    try:
+        with open(os.path.join(directory, TOTALS_FILE), 'r', encoding='utf-8') as f:
+            return dict(json.load(f).get("compacted", {}))
+    except (OSError, ValueError, AttributeError, TypeError):
+        return {}
+
+def discover(paths: Iterable[str], chunk_bytes: int = CHUNK_BYTES) -> List[Task]:
+    """Tâches d'analyse des fichiers donnés (dossiers parcourus récursivement)
+    
+    Seuls les fichiers nommés comme des segments du journal sont lus comme
+    événements, sans ceux déjà repliés dans le totals.json de leur dossier
+    (qui peuvent subsister après un compactage interrompu). Les segments sont
+    découpés en morceaux de chunk_bytes, les plus gros en premier pour
+    équilibrer le pool.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names)
+        else:
+            files.append(path)
+    
+    tasks: List[Task] = []
+    compacted: Dict[str, Dict[str, int]] = {}  # Dossier -> session -> dernier segment replié
+    for path in files:
+        name = os.path.basename(path)
+        segment = _parse_segment_name(name)
+        if segment is not None:
+            directory = os.path.dirname(path)
+            if directory not in compacted:
+                compacted[directory] = _compacted_numbers(directory)
+            session, number, _ = segment
+            if number <= compacted[directory].get(session, 0):
+                continue
+            size = os.path.getsize(path)
+            for start in range(0, size, chunk_bytes):
+                tasks.append(("events", path, start, min(start + chunk_bytes, size)))
+        elif name == TOTALS_FILE:
+            tasks.append(("totals", path, 0, 0))
+        elif name.endswith(".json"):
+            tasks.append(("stats", path, 0, 0))
+    tasks.sort(key=lambda task: task[3] - task[2], reverse=True)
+    return tasks
+
+def _merge(sessions: SessionTotals, part: SessionTotals):
+    """Fusionner les totaux par session d'un morceau"""
+    for session, totals in part.items():
+        current = sessions.get(session)
+        if current is None:
+            sessions[session] = totals
+            continue
+        if totals[0] is not None:
+            current[0] = totals[0] if current[0] is None else min(current[0], totals[0])
+            current[1] = totals[1] if current[1] is None else max(current[1], totals[1])
+        for column in KIND_COLUMNS.values():
+            current[column] += totals[column]
+
+def distribution(values: np.ndarray) -> Dict[str, float]:
+    """Nombre, moyenne, extrêmes et percentiles d'une série"""
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return {"count": 0}
+    summary = {"count": int(len(values)), "mean": float(values.mean()),
+               "min": float(values.min()), "max": float(values.max())}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{percentile}"] = float(value)
+    return summary
+
+def _rates(minutes: np.ndarray, kills: np.ndarray, deaths: np.ndarray, levels: np.ndarray) -> Dict[str, Any]:
+    """Distributions de durée, d'ennemis par minute et de morts par niveau"""
+    timed = minutes > 0
+    return {
+        "session_minutes": distribution(minutes[timed]),
+        "kills_per_minute": distribution(kills[timed] / minutes[timed]),
+        "deaths_per_level": distribution(deaths / np.maximum(levels, 1)),
+    }
+
+def analyze(paths: Iterable[str], workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES) -> Dict[str, Any]:
+    """Analyser des fichiers de statistiques et de journaux en parallèle"""
+    started = time.perf_counter()
+    tasks = discover(paths, chunk_bytes)
+    sessions: SessionTotals = {}
+    players = []
+    
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_scan, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_scan, tasks)
+    try:
+        for kind, result in results:
+            if kind == "stats":
+                if result is not None:
+                    players.append(result)
+            else:
+                _merge(sessions, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    report: Dict[str, Any] = {"files": len({task[1] for task in tasks}),
+                              "bytes": sum(task[3] - task[2] for task in tasks)}
+    
+    rows = np.array([totals for totals in sessions.values() if totals[0] is not None],
+                    dtype=np.float64).reshape(-1, 5)
+    report["sessions"] = {"count": len(sessions),
+                          **_rates((rows[:, 1] - rows[:, 0]) / 60, rows[:, 2], rows[:, 3], rows[:, 4])}
+    
+    # Totaux à vie de chaque joueur
+    lifetime = np.array(players, dtype=np.float64).reshape(-1, 5)
+    played, minutes, kills, deaths, levels = lifetime.T
+    report["players"] = {
+        "count": len(players),
+        "session_minutes": distribution(minutes[played > 0] / played[played > 0]),
+        "kills_per_minute": distribution(kills[minutes > 0] / minutes[minutes > 0]),
+        "deaths_per_level": distribution(deaths / np.maximum(levels, 1)),
+    }
+    
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def print_report(report: Dict[str, Any]):
+    """Afficher le résumé d'une analyse"""
+    print("📈 ANALYSE MULTI-SESSIONS")
+    print("=" * 50)
+    print(f"Fichiers analysés: {report['files']} ({report['bytes'] / (1 << 20):.1f} Mo de journaux)")
+    print(f"Durée de l'analyse: {report['seconds']} s")
+    labels = {"session_minutes": "Durée (minutes)", "kills_per_minute": "Ennemis par minute",
+              "deaths_per_level": "Morts par niveau"}
+    for group, title in (("sessions", "Sessions"), ("players", "Joueurs")):
+        print(f"\n{title}: {report[group]['count']}")
+        for metric, label in labels.items():
+            summary = report[group][metric]
+            if not summary["count"]:
+                continue
+            percentiles = ", ".join(f"p{p}={summary[f'p{p}']:.2f}" for p in PERCENTILES)
+            print(f"  {label}: moyenne={summary['mean']:.2f}, {percentiles}")
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Analyser les statistiques de nombreuses sessions")
+    parser.add_argument("paths", nargs="+", help="fichiers ou dossiers de statistiques et de journaux")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (tous les cœurs par défaut)")
+    parser.add_argument("--output", default=REPORT_FILE, help="fichier du rapport JSON")
+    args = parser.parse_args()
+    
+    report = analyze(args.paths, args.workers)
+    print_report(report)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"\n✅ Rapport écrit dans '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal des événements de jeu en ajout seul, découpé en segments propres à
+chaque session : une ligne JSON compacte par événement, et un compacteur qui
+replie les segments fermés en totaux par session et par heure
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+STATS_LOG_DIR = "stats_log"
+SEGMENT_BYTES = 1 << 20  # Taille à partir de laquelle un nouveau segment est ouvert
+TOTALS_FILE = "totals.json"
+COMPACT_LOCK_FILE = "compact.lock"
+COMPACT_LOCK_STALE = 600.0  # Âge (s) au-delà duquel un verrou est celui d'un compactage interrompu
+
+# Segment : events-<session>-<numéro>.jsonl, suffixé .open tant que sa session y écrit
+OPEN_SUFFIX = ".open"
+
+def _segment_name(session: str, number: int, sealed: bool) -> str:
+    return f"events-{session}-{number:06d}{'' if sealed else OPEN_SUFFIX}.jsonl"
+
+def _parse_segment_name(name: str) -> Optional[Tuple[str, int, bool]]:
+    """(session, numéro, fermé) d'un nom de segment ; None pour un autre fichier"""
+    if not (name.startswith("events-") and name.endswith(".jsonl")):
+        return None
+    stem = name[len("events-"):-len(".jsonl")]
+    sealed = not stem.endswith(OPEN_SUFFIX)
+    if not sealed:
+        stem = stem[:-len(OPEN_SUFFIX)]
+    session, _, number = stem.rpartition("-")
+    if not session or not number.isdigit():
+        return None
+    return session, int(number), sealed
+
+def _hour(timestamp: float) -> str:
+    """Heure (UTC) d'un événement, clé des totaux horaires"""
+    return time.strftime("%Y-%m-%dT%H", time.gmtime(timestamp))
+
+def _add(totals: Dict[str, Any], kind: str, subject: str, amount: float):
+    by_subject = totals.setdefault(kind, {})
+    by_subject[subject] = by_subject.get(subject, 0) + amount
+
+class StatsEventLog:
+    """Journal segmenté des événements d'une ou plusieurs sessions
+    
+    record() ne fait qu'ajouter une ligne en mémoire ; flush() l'écrit à la
+    fin du segment courant. Le coût d'un événement ne dépend donc pas de la
+    taille de l'historique.
+    
+    Chaque session (donc chaque processus) écrit dans sa propre série de
+    segments et n'ajoute qu'à son segment ouvert ; un segment est fermé
+    quand il est plein ou à close(). compact() ne replie que des segments
+    fermés, sous un fichier verrou : plusieurs processus peuvent écrire et
+    compacter le même dossier sans perdre d'événements. Le segment ouvert
+    d'une session interrompue reste lu par events() mais n'est pas replié.
+    """
+    
+    def __init__(self, directory: str = STATS_LOG_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 session_id: Optional[str] = None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self._pending: List[str] = []
+        self._segment: Optional[int] = None  # Numéro du segment courant (ouvert à la première écriture)
+        self._segment_size = 0
+    
+    @property
+    def pending(self) -> int:
+        """Nombre d'événements pas encore écrits"""
+        return len(self._pending)
+    
+    def record(self, kind: str, subject: str = "", amount: float = 1, timestamp: Optional[float] = None):
+        """Ajouter un événement (kill, pickup, gold_earned, death...)"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._pending.append(json.dumps([round(timestamp, 3), self.session_id, kind, subject, amount],
+                                        separators=(',', ':'), ensure_ascii=False))
+    
+    def take_pending(self) -> List[str]:
+        """Retirer les lignes en attente (à écrire ensuite avec write())"""
+        lines, self._pending = self._pending, []
+        return lines
+    
+    def flush(self):
+        """Écrire les événements en attente"""
+        self.write(self.take_pending())
+    
+    def write(self, lines: List[str]):
+        """Ajouter des lignes à la fin du segment ouvert de la session"""
+        if not lines:
+            return
+        if self._segment is None:
+            self._open_segment()
+        elif self._segment_size >= self.segment_bytes:
+            self._seal()
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+        with open(self._segment_path(self._segment, sealed=False), 'a+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    data = b'\n' + data  # Terminer une ligne coupée par une écriture interrompue
+            f.write(data)
+        self._segment_size = size + len(data)
+    
+    def _open_segment(self):
+        """Reprendre le segment ouvert de la session, ou commencer après ses segments existants"""
+        os.makedirs(self.directory, exist_ok=True)
+        last = self._load_totals()["compacted"].get(self.session_id, 0)
+        for session, number, sealed, path in self._list_segments():
+            if session != self.session_id:
+                continue
+            if not sealed:
+                self._segment, self._segment_size = number, os.path.getsize(path)
+                return
+            last = max(last, number)
+        self._segment, self._segment_size = last + 1, 0
+    
+    def _seal(self):
+        """Fermer le segment courant (il pourra être replié) ; les écritures suivantes vont au suivant"""
+        if self._segment is None:
+            return
+        path = self._segment_path(self._segment, sealed=False)
+        if os.path.exists(path):
+            os.replace(path, self._segment_path(self._segment, sealed=True))
+        self._segment += 1
+        self._segment_size = 0
+    
+    def close(self):
+        """Écrire les événements en attente et fermer le segment de la session"""
+        self.flush()
+        self._seal()
+    
+    def _segment_path(self, number: int, sealed: bool) -> str:
+        return os.path.join(self.directory, _segment_name(self.session_id, number, sealed))
+    
+    def _list_segments(self) -> List[Tuple[str, int, bool, str]]:
+        """Tous les fichiers de segments : (session, numéro, fermé, chemin)"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            parsed = _parse_segment_name(name)
+            if parsed is not None:
+                found.append((*parsed, os.path.join(self.directory, name)))
+        return sorted(found)
+    
+    def segments(self, totals: Optional[Dict[str, Any]] = None) -> List[Tuple[str, int, bool, str]]:
+        """Segments pas encore repliés, par session puis du plus ancien au plus récent
+        
+        (session, numéro, fermé, chemin) ; les segments déjà repliés peuvent
+        subsister après une interruption du compactage et sont ignorés.
+        """
+        compacted = (totals if totals is not None else self._load_totals())["compacted"]
+        return [segment for segment in self._list_segments()
+                if segment[1] > compacted.get(segment[0], 0)]
+    
+    def events(self, segments: Optional[List[Tuple[str, int, bool, str]]] = None) -> Iterator[Dict[str, Any]]:
+        """Relire les événements des segments, session par session dans l'ordre d'écriture"""
+        for *_, path in self.segments() if segments is None else segments:
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue  # Replié et supprimé par un compactage concurrent
+            with f:
+                for line in f:
+                    try:
+                        timestamp, session, kind, subject, amount = json.loads(line)
+                    except ValueError:
+                        continue  # Ligne vide ou écriture interrompue
+                    yield {"time": timestamp, "session": session, "kind": kind,
+                           "subject": subject, "amount": amount}
+    
+    def _load_totals(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, TOTALS_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"compacted": {}, "sessions": {}, "hours": {}, "spans": {}}
+    
+    def _lock_compaction(self) -> Optional[str]:
+        """Prendre le verrou de compactage (fichier créé en exclusif) ; None s'il est déjà pris"""
+        path = os.path.join(self.directory, COMPACT_LOCK_FILE)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) < COMPACT_LOCK_STALE:
+                        return None
+                    os.remove(path)  # Verrou laissé par un compactage interrompu
+                except FileNotFoundError:
+                    pass
+        return None
+    
+    def compact(self) -> int:
+        """Replier les segments fermés dans les totaux par session et par heure
+        
+        Les segments ouverts (y compris celui de cette session) sont conservés
+        tels quels. Si un autre processus compacte déjà, rien n'est fait.
+        Renvoie le nombre de segments repliés.
+        """
+        self.flush()
+        if not os.path.isdir(self.directory):
+            return 0
+        lock = self._lock_compaction()
+        if lock is None:
+            return 0
+        try:
+            totals = self._load_totals()
+            compacted = totals["compacted"]
+            old, leftovers = [], []
+            for segment in self._list_segments():
+                session, number, sealed, _ = segment
+                if number <= compacted.get(session, 0):
+                    leftovers.append(segment)  # Déjà replié avant une interruption
+                elif sealed:
+                    old.append(segment)
+            if old:
+                self._fold(totals, self.events(old))
+                for session, number, _, _ in old:
+                    compacted[session] = max(compacted.get(session, 0), number)
+                    
+                # Les totaux sont remplacés avant la suppression des segments : une
+                # interruption entre les deux ne compte aucun événement deux fois
+                path = os.path.join(self.directory, TOTALS_FILE)
+                temporary = path + ".tmp"
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    json.dump(totals, f, separators=(',', ':'), ensure_ascii=False)
+                os.replace(temporary, path)
+            for *_, segment_path in old + leftovers:
+                os.remove(segment_path)
+            return len(old)
+        finally:
+            os.remove(lock)
+    
+    @staticmethod
+    def _fold(totals: Dict[str, Any], events: Iterator[Dict[str, Any]]):
+        """Ajouter des événements aux totaux par session et par heure
+        
+        spans garde le premier et le dernier horodatage de chaque session.
+        """
+        sessions = totals["sessions"]
+        hours = totals["hours"]
+        spans = totals.setdefault("spans", {})
+        for event in events:
+            kind, subject, amount = event["kind"], event["subject"], event["amount"]
+            session, timestamp = event["session"], event["time"]
+            _add(sessions.setdefault(session, {}), kind, subject, amount)
+            _add(hours.setdefault(_hour(timestamp), {}), kind, subject, amount)
+            span = spans.get(session)
+            if span is None:
+                spans[session] = [timestamp, timestamp]
+            else:
+                span[0] = min(span[0], timestamp)
+                span[1] = max(span[1], timestamp)
+    
+    def totals(self) -> Dict[str, Any]:
+        """Totaux par session et par heure, et durée des sessions (segments repliés et non repliés)"""
+        totals = self._load_totals()
+        self._fold(totals, self.events(self.segments(totals)))
+        return totals
+    
+    def session_totals(self, session_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Totaux d'une session (la session courante par défaut)"""
+        return self.totals()["sessions"].get(session_id or self.session_id, {})
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage SQLite (mode WAL) des statistiques : compteurs globaux et par
+session mis à jour par incréments, ce qui permet à plusieurs processus
+d'écrire en même temps sans perdre de mises à jour
+"""
+
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+STATS_DB_FILE = "game_stats.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value NUMERIC NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE TABLE IF NOT EXISTS session_counters (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id),
+    name TEXT NOT NULL,
+    value NUMERIC NOT NULL,
+    PRIMARY KEY (session_id, name)
+);
+CREATE INDEX IF NOT EXISTS session_counters_name ON session_counters (name);
+CREATE TABLE IF NOT EXISTS achievements (
+    name TEXT PRIMARY KEY,
+    unlocked REAL NOT NULL
+);
+"""
+
+def flatten(stats: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Compteurs d'un dictionnaire imbriqué, sous des noms pointés (enemies_defeated.total)"""
+    counters = {}
+    for key, value in stats.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            counters.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            counters[name] = value
+    return counters
+
+class SQLiteStatsStore:
+    """Base SQLite des statistiques
+    
+    Les incréments sont appliqués par des upserts additifs (value = value +
+    excluded.value) dans une transaction IMMEDIATE : deux processus qui
+    enregistrent en même temps s'ajoutent au lieu de s'écraser.
+    """
+    
+    def __init__(self, filename: str = STATS_DB_FILE, timeout: float = 30.0):
+        self.filename = filename
+        # Autocommit : les transactions sont ouvertes explicitement
+        self.connection = sqlite3.connect(filename, timeout=timeout, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+    
+    def close(self):
+        self.connection.close()
+    
+    def _transaction(self, apply):
+        """Exécuter apply(curseur) dans une transaction d'écriture"""
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            apply(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+    
+    def import_totals(self, counters: Dict[str, float], achievements: Iterable[str] = ()) -> bool:
+        """Importer des totaux existants si la base est vide (migration depuis le JSON)"""
+        imported = []
+        
+        def apply(cursor):
+            if cursor.execute("SELECT 1 FROM counters LIMIT 1").fetchone():
+                return
+            cursor.executemany("INSERT INTO counters (name, value) VALUES (?, ?)", counters.items())
+            now = time.time()
+            cursor.executemany("INSERT OR IGNORE INTO achievements (name, unlocked) VALUES (?, ?)",
+                               [(name, now) for name in achievements])
+            imported.append(True)
+        
+        self._transaction(apply)
+        return bool(imported)
+    
+    def apply(self, session_id: str, deltas: Dict[str, float], achievements: List[str] = ()):
+        """Ajouter des incréments aux compteurs globaux et à ceux d'une session"""
+        now = time.time()
+        
+        def apply(cursor):
+            cursor.execute(
+                "INSERT INTO sessions (session_id, started, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (session_id, now, now))
+            cursor.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                deltas.items())
+            cursor.executemany(
+                "INSERT INTO session_counters (session_id, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id, name) DO UPDATE SET value = value + excluded.value",
+                [(session_id, name, amount) for name, amount in deltas.items()])
+            cursor.executemany("INSERT OR IGNORE INTO achievements (name, unlocked) VALUES (?, ?)",
+                               [(name, now) for name in achievements])
+        
+        self._transaction(apply)
+    
+    def counters(self) -> Dict[str, float]:
+        """Compteurs globaux"""
+        return dict(self.connection.execute("SELECT name, value FROM counters"))
+    
+    def achievements(self) -> List[str]:
+        """Succès débloqués, dans l'ordre de déblocage"""
+        return [name for name, in self.connection.execute("SELECT name FROM achievements ORDER BY unlocked, rowid")]
+    
+    def load(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Reporter le contenu de la base dans un dictionnaire de statistiques"""
+        for name, value in self.counters().items():
+            *path, key = name.split(".")
+            counters = stats
+            for part in path:
+                counters = counters.setdefault(part, {})
+            counters[key] = value
+        stats["achievements"] = self.achievements()
+        return stats
+    
+    def session_totals(self, session_id: str) -> Dict[str, float]:
+        """Compteurs d'une session"""
+        return dict(self.connection.execute(
+            "SELECT name, value FROM session_counters WHERE session_id = ?", (session_id,)))
+    
+    def recent_sessions(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """Dernières sessions : (ID, début, dernière écriture)"""
+        return self.connection.execute(
+            "SELECT session_id, started, last_seen FROM sessions ORDER BY started DESC LIMIT ?",
+            (limit,)).fetchall()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal des échanges en ajout seul : une ligne JSON compacte par transaction,
+écrites par groupes pour limiter les accès disque
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TRADE_LEDGER_FILE = "trade_ledger.log"
+
+class TradeLedger:
+    """Journal des transactions de boutique avec validation groupée
+    
+    Les transactions sont mises en attente puis écrites (et synchronisées sur
+    disque) en une seule fois quand group_size transactions sont en attente,
+    quand la plus ancienne attend depuis max_delay secondes (vérifié par un
+    thread d'écriture, même si aucune transaction ne suit), ou à l'appel de
+    flush()/close(). Une transaction enregistrée peut donc être perdue en cas
+    d'arrêt brutal pendant au plus max_delay secondes.
+    """
+    
+    def __init__(self, filename: str = TRADE_LEDGER_FILE, group_size: int = 32, max_delay: float = 1.0):
+        self.filename = filename
+        self.group_size = group_size
+        self.max_delay = max_delay
+        self.writes = 0
+        self._pending: List[str] = []
+        self._oldest: Optional[float] = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._writer: Optional[threading.Thread] = None
+    
+    def __enter__(self) -> "TradeLedger":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @property
+    def pending(self) -> int:
+        """Nombre de transactions pas encore écrites"""
+        return len(self._pending)
+    
+    def record(self, merchant: str, gold_delta: int, lines: List[Tuple[str, int, int]]):
+        """Ajouter une transaction validée
+        
+        lines : (ID de l'objet, quantité (+ achat, - vente), montant en or).
+        """
+        line = json.dumps([round(time.time(), 3), merchant, gold_delta, lines],
+                          separators=(',', ':'), ensure_ascii=False)
+        with self._lock:
+            self._pending.append(line)
+            if self._closed or len(self._pending) >= self.group_size:
+                self._write_pending()
+            elif self._oldest is None:
+                self._oldest = time.monotonic()
+                self._start_writer()
+                self._wakeup.notify()
+    
+    def _start_writer(self):
+        """Démarrer le thread d'écriture à la première transaction"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="trade-ledger", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+    
+    def _write_loop(self):
+        """Thread d'écriture : vider le groupe quand la plus ancienne transaction a attendu max_delay"""
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._wakeup.wait()
+                    continue
+                remaining = self._oldest + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    continue
+                self._write_pending()
+    
+    def _write_pending(self):
+        """Écrire les transactions en attente en une seule écriture (verrou tenu)"""
+        if not self._pending:
+            return
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self._pending) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending.clear()
+        self._oldest = None
+        self.writes += 1
+    
+    def flush(self):
+        """Écrire les transactions en attente en une seule écriture"""
+        with self._lock:
+            self._write_pending()
+    
+    def close(self):
+        """Écrire les transactions restantes et arrêter le thread d'écriture
+        
+        Les transactions enregistrées ensuite sont écrites immédiatement.
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            self._write_pending()
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.join()
+            atexit.unregister(self.close)
+    
+    @staticmethod
+    def read(filename: str = TRADE_LEDGER_FILE) -> Iterator[Dict[str, Any]]:
+        """Relire le journal transaction par transaction"""
+        if not os.path.exists(filename):
+            return
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    timestamp, merchant, gold_delta, lines = json.loads(line)
+                except ValueError:
+                    continue  # Ligne vide ou écriture interrompue
+                yield {"time": timestamp, "merchant": merchant, "gold": gold_delta, "lines": lines}
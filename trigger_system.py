@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Volumes de déclenchement (sphères et boîtes) : événements d'entrée, de
+présence et de sortie pour le joueur et les agents, servis par une grille
+spatiale pour ne tester que les volumes proches
+"""
+
+import math
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from config import config
+
+ENTER = "enter"
+STAY = "stay"
+EXIT = "exit"
+
+def _as_tuple(position):
+    """Convertir une position (Vec3, liste, tuple) en triplet de flottants"""
+    return (float(position[0]), float(position[1]), float(position[2]))
+
+class TriggerEvent(NamedTuple):
+    """Événement d'un sujet (joueur, agent) vis-à-vis d'un volume"""
+    kind: str  # enter, stay, exit
+    subject: Hashable
+    trigger: str
+
+class TriggerVolume:
+    """Volume nommé : sphère (rayon) ou boîte alignée sur les axes (demi-dimensions)"""
+    
+    __slots__ = ("name", "shape", "center", "radius", "half_size")
+    
+    def __init__(self, name: str, shape: str, center, radius: float = 0.0, half_size=(0.0, 0.0, 0.0)):
+        if shape not in ("sphere", "box"):
+            raise ValueError(f"Forme de déclencheur inconnue: {shape}")
+        self.name = name
+        self.shape = shape
+        self.center = _as_tuple(center)
+        self.radius = float(radius)
+        self.half_size = _as_tuple(half_size)
+    
+    def contains(self, x: float, y: float, z: float) -> bool:
+        """Le point est-il dans le volume ?"""
+        cx, cy, cz = self.center
+        if self.shape == "sphere":
+            return (x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2 <= self.radius * self.radius
+        hx, hy, hz = self.half_size
+        return abs(x - cx) <= hx and abs(y - cy) <= hy and abs(z - cz) <= hz
+    
+    def extent(self) -> Tuple[float, float]:
+        """Demi-étendue horizontale (x, z) du volume"""
+        if self.shape == "sphere":
+            return self.radius, self.radius
+        return self.half_size[0], self.half_size[2]
+
+class TriggerSystem:
+    """Volumes de déclenchement indexés par une grille horizontale
+    
+    Chaque volume est inscrit dans toutes les cellules que couvre son emprise
+    au sol ; la mise à jour d'un sujet ne teste que les volumes de sa cellule
+    et ceux dans lesquels il se trouvait déjà.
+    """
+    
+    def __init__(self, cell_size: Optional[float] = None):
+        if cell_size is None:
+            cell_size = config.get('gameplay.trigger_cell_size', 8.0)
+        self.cell_size = float(cell_size)
+        self.volumes: Dict[str, TriggerVolume] = {}
+        self._cells: Dict[Tuple[int, int], List[TriggerVolume]] = {}
+        self._inside: Dict[Hashable, Dict[str, TriggerVolume]] = {}  # Sujet -> volumes occupés (ordre d'entrée)
+        self.tests_last_update = 0
+    
+    def _cell(self, x: float, z: float) -> Tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+    
+    def _covered_cells(self, volume: TriggerVolume):
+        """Cellules couvertes par l'emprise au sol d'un volume"""
+        ex, ez = volume.extent()
+        cx, _, cz = volume.center
+        min_x, min_z = self._cell(cx - ex, cz - ez)
+        max_x, max_z = self._cell(cx + ex, cz + ez)
+        for i in range(min_x, max_x + 1):
+            for j in range(min_z, max_z + 1):
+                yield (i, j)
+    
+    def add(self, volume: TriggerVolume) -> TriggerVolume:
+        """Ajouter un volume (remplace un volume de même nom)"""
+        if volume.name in self.volumes:
+            self.remove(volume.name)
+        self.volumes[volume.name] = volume
+        for cell in self._covered_cells(volume):
+            self._cells.setdefault(cell, []).append(volume)
+        return volume
+    
+    def add_sphere(self, name: str, center, radius: float) -> TriggerVolume:
+        """Ajouter une sphère de déclenchement"""
+        return self.add(TriggerVolume(name, "sphere", center, radius=radius))
+    
+    def add_box(self, name: str, center, size) -> TriggerVolume:
+        """Ajouter une boîte de déclenchement (centre, dimensions)"""
+        sx, sy, sz = _as_tuple(size)
+        return self.add(TriggerVolume(name, "box", center, half_size=(abs(sx) / 2, abs(sy) / 2, abs(sz) / 2)))
+    
+    def remove(self, name: str) -> List[TriggerEvent]:
+        """Retirer un volume ; les sujets qui s'y trouvaient en sortent"""
+        volume = self.volumes.pop(name, None)
+        if volume is None:
+            return []
+        for cell in self._covered_cells(volume):
+            bucket = self._cells[cell]
+            bucket.remove(volume)
+            if not bucket:
+                del self._cells[cell]
+        events = []
+        for subject, inside in self._inside.items():
+            if inside.pop(name, None) is not None:
+                events.append(TriggerEvent(EXIT, subject, name))
+        return events
+    
+    def update(self, subject: Hashable, position) -> List[TriggerEvent]:
+        """Mettre à jour la position d'un sujet et renvoyer ses événements"""
+        x, y, z = _as_tuple(position)
+        inside = self._inside.setdefault(subject, {})
+        candidates = self._cells.get(self._cell(x, z), ())
+        self.tests_last_update = len(candidates) + len(inside)
+        
+        events = []
+        # Volumes déjà occupés : présence ou sortie
+        for name, volume in list(inside.items()):
+            if volume.contains(x, y, z):
+                events.append(TriggerEvent(STAY, subject, name))
+            else:
+                del inside[name]
+                events.append(TriggerEvent(EXIT, subject, name))
+        # Volumes proches : entrée
+        for volume in candidates:
+            if volume.name not in inside and volume.contains(x, y, z):
+                inside[volume.name] = volume
+                events.append(TriggerEvent(ENTER, subject, volume.name))
+        return events
+    
+    def forget(self, subject: Hashable) -> List[TriggerEvent]:
+        """Oublier un sujet (détruit) ; il sort de tous ses volumes"""
+        inside = self._inside.pop(subject, {})
+        return [TriggerEvent(EXIT, subject, name) for name in inside]
+    
+    def zones_of(self, subject: Hashable) -> List[str]:
+        """Volumes occupés par un sujet, dans l'ordre d'entrée"""
+        return list(self._inside.get(subject, ()))
+    
+    def zone_of(self, subject: Hashable) -> Optional[str]:
+        """Volume occupé depuis le plus longtemps par un sujet"""
+        return next(iter(self._inside.get(subject, ())), None)
+    
+    def subjects_in(self, name: str) -> List[Hashable]:
+        """Sujets présents dans un volume"""
+        return [subject for subject, inside in self._inside.items() if name in inside]